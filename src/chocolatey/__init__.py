@@ -3,5 +3,15 @@
 
 from .__about__ import * ; del __about__  # type: ignore[name-defined]  # noqa
 
-from ._chocolatey     import * ; del _chocolatey      # type: ignore[name-defined]  # noqa
-from ._chocolatey_cmd import * ; del _chocolatey_cmd  # type: ignore[name-defined]  # noqa
+from ._chocolatey           import * ; del _chocolatey            # type: ignore[name-defined]  # noqa
+from ._chocolatey_cmd       import * ; del _chocolatey_cmd        # type: ignore[name-defined]  # noqa
+from ._async_chocolatey     import * ; del _async_chocolatey      # type: ignore[name-defined]  # noqa
+from ._async_chocolatey_cmd import * ; del _async_chocolatey_cmd  # type: ignore[name-defined]  # noqa
+from ._table                import * ; del _table                 # type: ignore[name-defined]  # noqa
+from ._installed            import * ; del _installed             # type: ignore[name-defined]  # noqa
+from ._cache                import * ; del _cache                 # type: ignore[name-defined]  # noqa
+from ._broker               import * ; del _broker                # type: ignore[name-defined]  # noqa
+from ._batch                import * ; del _batch                 # type: ignore[name-defined]  # noqa
+from ._nupkg                import * ; del _nupkg                 # type: ignore[name-defined]  # noqa
+from ._trace                import * ; del _trace                 # type: ignore[name-defined]  # noqa
+from ._metrics              import * ; del _metrics               # type: ignore[name-defined]  # noqa
@@ -0,0 +1,330 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Chocolatey API (asyncio)"""
+
+import typing
+from typing import Any
+from typing_extensions import Self
+
+from utlx import public
+from utlx import run
+
+from ._chocolatey import Chocolatey, StrPath, _Steps
+from ._chocolatey import Package, PackageOutdated, PackageInfo
+from ._chocolatey import Config, Source, Feature, ApiKey, Template
+from ._async_chocolatey_cmd import AsyncChocolateyCmd
+from ._trace import _traced
+
+
+@public
+class AsyncChocolatey:
+    """Chocolatey API (asyncio)
+
+    Coroutine counterparts of the Chocolatey query, package and
+    configuration methods. Arguments, results and errors are the same
+    as for Chocolatey: the arguments are mapped to the choco runs, and
+    their output parsed, by the same Chocolatey code. Every method accepts
+    `timeout` and is cancellable, in both cases the running choco process
+    is killed.
+
+    Left out are setup() (a one-time installer run, not a choco command),
+    the *_many(), *_iter() and batch() methods (threads, pipes and the
+    elevated helper of Chocolatey, to be awaited as a whole with
+    asyncio.to_thread()), and the options reading the lib directory or
+    config_file instead of running choco (from_lib, from_file,
+    skip_satisfied, as_table) together with the caches - the asyncio
+    counterparts only run choco.
+    """
+
+    source: str | None
+    cmd: AsyncChocolateyCmd
+
+    def __new__(cls, source: str | None = None) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.source = source
+        self.cmd = AsyncChocolateyCmd(self.source)
+        return self
+
+    ### High-level API ###
+
+    @_traced
+    async def version(self) -> str:
+        """Gets the Chocolatey version."""
+        return typing.cast(str, await self._run_steps(Chocolatey._version_steps()))
+
+    @_traced
+    async def help(self, *, command: str | None = None) -> str:  # noqa: A003
+        """Gets the help information for choco and choco commands."""
+        return typing.cast(str, await self._run_steps(Chocolatey._help_steps(command)))
+
+    @_traced
+    async def license(self, **kwargs: Any) -> str:  # noqa: A003
+        """Gets the information about the current Chocolatey CLI license [v2.5.0+]."""
+        return typing.cast(str, await self._run_steps(Chocolatey._text_steps("license",
+                                                                             kwargs)))
+
+    @_traced
+    async def support(self, **kwargs: Any) -> str:
+        """Provides support information [v2.5.0+]."""
+        return typing.cast(str, await self._run_steps(Chocolatey._text_steps("support",
+                                                                             kwargs)))
+
+    @_traced
+    async def installed(self, *filters: str, **kwargs: Any) -> dict[str, list[Package]]:
+        """Retrieves a list of locally installed packages."""
+        return typing.cast(dict[str, list[Package]],
+                           await self._run_steps(Chocolatey._installed_steps(filters, kwargs)))
+
+    @_traced
+    async def outdated(self, *, ignore_pinned: bool = True, ignore_unfound: bool = True,
+                       **kwargs: Any) -> dict[str, list[PackageOutdated]]:
+        """Retrieves information about packages that are outdated."""
+        return typing.cast(dict[str, list[PackageOutdated]],
+                           await self._run_steps(Chocolatey._outdated_steps(
+                               ignore_pinned, ignore_unfound, kwargs)))
+
+    @_traced
+    async def search(self, filter: str | bool = False, *,  # noqa: A002
+                     all_versions: bool = False, exact: bool = False,
+                     **kwargs: Any) -> dict[str, list[Package]]:
+        """Searches remote packages."""
+        self._omit_args(kwargs, "limit_output", "page", "page_size",
+                        "verbose", "detail", "detailed", "idonly", "id_only")
+        out  = "" ; page = 0
+        while True:
+            try:
+                arg = [filter] if filter is not False else []
+                output = await self.cmd.search(*arg, limit_output=True, page=page,
+                                               all_versions=all_versions, exact=exact,
+                                               **self._capture_output, **kwargs)
+            except run.CalledProcessError as exc:
+                self._handle_exception(exc)
+            if not output.stdout: break
+            out += output.stdout ; page += 1
+            if exact: break
+        return Chocolatey._packages(out, allow_multiple=all_versions)
+
+    @_traced
+    async def info(self, *, pkg_id: str, local_only: bool = False,
+                   single_run: bool = True, **kwargs: Any) -> PackageInfo | None:
+        """Retrieves package information."""
+        return typing.cast(PackageInfo | None,
+                           await self._run_steps(Chocolatey._info_steps(
+                               pkg_id, local_only, single_run, kwargs)))
+
+    @_traced
+    async def export(self, output_file_path: StrPath | bool = False, *,
+                     include_version_numbers: bool = True, **kwargs: Any) -> None:
+        """Exports list of currently installed packages."""
+        await self._run_steps(Chocolatey._change_steps(
+            "export", kwargs=kwargs, output_file_path=output_file_path,
+            include_version_numbers=include_version_numbers))
+
+    @_traced
+    async def install(self, *pkg_ids: str, yes: bool = True, **kwargs: Any) -> None:
+        """Installs packages using configured sources."""
+        await self._run_steps(Chocolatey._packages_steps("install", pkg_ids, kwargs, yes=yes))
+
+    @_traced
+    async def upgrade(self, *pkg_ids: str, install_if_not_installed: bool = True,
+                      yes: bool = True, **kwargs: Any) -> None:
+        """Upgrades packages from various sources."""
+        await self._run_steps(Chocolatey._packages_steps(
+            "upgrade", pkg_ids, kwargs,
+            install_if_not_installed=install_if_not_installed, yes=yes))
+
+    @_traced
+    async def uninstall(self, *pkg_ids: str, yes: bool = True, all_versions: bool = False,
+                        **kwargs: Any) -> None:
+        """Uninstalls packages."""
+        await self._run_steps(Chocolatey._packages_steps("uninstall", pkg_ids, kwargs,
+                                                         all_versions=all_versions, yes=yes))
+
+    @_traced
+    async def pinned(self, **kwargs: Any) -> dict[str, list[Package]]:
+        """Retrieves a list of packages suppress for upgrades."""
+        return typing.cast(dict[str, list[Package]],
+                           await self._run_steps(Chocolatey._pinned_steps(kwargs)))
+
+    @_traced
+    async def pin_add(self, *, pkg_id: str, **kwargs: Any) -> None:
+        """Suppress upgrades for a package."""
+        await self._run_steps(Chocolatey._change_steps("pin", "add", kwargs=kwargs,
+                                                       omit=("reason",),
+                                                       capture=False, name=pkg_id))
+
+    @_traced
+    async def pin_remove(self, *, pkg_id: str, **kwargs: Any) -> None:
+        """Remove suppressing of upgrades for a package."""
+        await self._run_steps(Chocolatey._change_steps("pin", "remove", kwargs=kwargs,
+                                                       capture=False, name=pkg_id))
+
+    @_traced
+    async def pack(self, nuspec_file_path: StrPath | bool = False, *,
+                   output_directory: StrPath | bool = False, **kwargs: Any) -> None:
+        """Packages nuspec, scripts, and other package resources into a nupkg file."""
+        await self._run_steps(Chocolatey._pack_steps(nuspec_file_path, output_directory,
+                                                     kwargs))
+
+    @_traced
+    async def push(self, nupkg_file_path: StrPath | bool = False, yes: bool = True,
+                   **kwargs: Any) -> None:  # pragma: no cover
+        """Pushes a compiled nupkg to a source."""
+        await self._run_steps(Chocolatey._push_steps(nupkg_file_path, yes, kwargs))
+
+    @_traced
+    async def new_package(self, *, pkg_id: str,
+                          properties: dict[str, str] | None = None,
+                          **kwargs: Any) -> None:
+        """Creates template files for creating a new Chocolatey package."""
+        await self._run_steps(Chocolatey._new_package_steps(pkg_id, properties, kwargs))
+
+    # Configuration - https://docs.chocolatey.org/en-us/configuration
+
+    @_traced
+    async def config(self, **kwargs: Any) -> dict[str, Config]:
+        """Retrieve config settings."""
+        return typing.cast(dict[str, Config],
+                           await self._run_steps(Chocolatey._list_steps("config", Config,
+                                                                        kwargs)))
+
+    @_traced
+    async def config_get(self, *, name: str, **kwargs: Any) -> str | bool:
+        """Get config value."""
+        return typing.cast(str | bool,
+                           await self._run_steps(Chocolatey._config_get_steps(name, kwargs)))
+
+    @_traced
+    async def config_set(self, *, name: str, value: Any, **kwargs: Any) -> None:
+        """Set config value."""
+        await self._run_steps(Chocolatey._config_set_steps(name, value, kwargs))
+
+    @_traced
+    async def config_unset(self, *, name: str, **kwargs: Any) -> None:
+        """Unset config."""
+        await self._run_steps(Chocolatey._change_steps("config", "unset", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def sources(self, **kwargs: Any) -> dict[str, Source]:
+        """Retrieve default sources."""
+        return typing.cast(dict[str, Source],
+                           await self._run_steps(Chocolatey._list_steps("source", Source,
+                                                                        kwargs)))
+
+    @_traced
+    async def source_add(self, *, name: str, source: str, **kwargs: Any) -> None:
+        """Add source."""
+        await self._run_steps(Chocolatey._change_steps("source", "add", kwargs=kwargs,
+                                                       name=name, source=source))
+
+    @_traced
+    async def source_enable(self, *, name: str, **kwargs: Any) -> None:
+        """Enable source."""
+        await self._run_steps(Chocolatey._change_steps("source", "enable", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def source_disable(self, *, name: str, **kwargs: Any) -> None:
+        """Disable source."""
+        await self._run_steps(Chocolatey._change_steps("source", "disable", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def source_remove(self, *, name: str, **kwargs: Any) -> None:
+        """Remove source."""
+        await self._run_steps(Chocolatey._change_steps("source", "remove", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def features(self, **kwargs: Any) -> dict[str, Feature]:
+        """Retrieve features."""
+        return typing.cast(dict[str, Feature],
+                           await self._run_steps(Chocolatey._list_steps("feature", Feature,
+                                                                        kwargs)))
+
+    @_traced
+    async def feature_get(self, *, name: str, **kwargs: Any) -> bool:
+        """Get feature value."""
+        return typing.cast(bool,
+                           await self._run_steps(Chocolatey._feature_get_steps(name, kwargs)))
+
+    @_traced
+    async def feature_enable(self, *, name: str, **kwargs: Any) -> None:
+        """Enable feature."""
+        await self._run_steps(Chocolatey._change_steps("feature", "enable", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def feature_disable(self, *, name: str, **kwargs: Any) -> None:
+        """Disable feature."""
+        await self._run_steps(Chocolatey._change_steps("feature", "disable", kwargs=kwargs,
+                                                       name=name))
+
+    @_traced
+    async def apikeys(self, **kwargs: Any) -> list[ApiKey]:
+        """Retrieve the list of API keys."""
+        return list((await self._run_steps(Chocolatey._list_steps("apikey", ApiKey,
+                                                                  kwargs))).values())
+
+    @_traced
+    async def apikey_add(self, *, source: str, api_key: str, **kwargs: Any) -> None:
+        """Add API key for source."""
+        await self._run_steps(Chocolatey._change_steps("apikey", "add", kwargs=kwargs,
+                                                       source=source, api_key=api_key))
+
+    @_traced
+    async def apikey_remove(self, *, source: str, **kwargs: Any) -> None:
+        """Remove API key for source."""
+        await self._run_steps(Chocolatey._change_steps("apikey", "remove", kwargs=kwargs,
+                                                       source=source))
+
+    @_traced
+    async def templates(self, **kwargs: Any) -> dict[str, Template]:
+        """Retrieve templates."""
+        return typing.cast(dict[str, Template],
+                           await self._run_steps(Chocolatey._list_steps("template", Template,
+                                                                        kwargs)))
+
+    @_traced
+    async def template_info(self, *, name: str, **kwargs: Any) -> Template:
+        """Retrieve template info."""
+        return typing.cast(Template,
+                           await self._run_steps(Chocolatey._template_info_steps(name, kwargs)))
+
+    @_traced
+    async def cache_list(self, **kwargs: Any) -> None:
+        """Displays information about the local HTTP caches used to store queries."""
+        await self._run_steps(Chocolatey._change_steps("cache", "list", kwargs=kwargs,
+                                                       capture=False))
+
+    @_traced
+    async def cache_remove(self, **kwargs: Any) -> None:
+        """Remove the local HTTP caches used to store queries."""
+        await self._run_steps(Chocolatey._change_steps("cache", "remove", kwargs=kwargs,
+                                                       capture=False))
+
+    # ----- internals ----- #
+
+    _capture_output = Chocolatey._capture_output
+    _omit_args      = Chocolatey._omit_args
+
+    async def _run_steps(self, steps: _Steps) -> Any:
+        # See Chocolatey._run_steps().
+        try:
+            command, args, kwargs = next(steps)
+            while True:
+                try:
+                    output = await getattr(self.cmd, command)(*args, **kwargs)
+                except run.CalledProcessError as exc:
+                    self._handle_exception(exc)
+                command, args, kwargs = steps.send(output)
+        except StopIteration as stop:
+            return stop.value
+
+    def _handle_exception(self, exc: BaseException, **kwargs: Any) -> None:
+        raise Chocolatey._text_exception(exc)  # pragma: no cover
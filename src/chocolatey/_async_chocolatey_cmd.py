@@ -0,0 +1,149 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Low-level asyncio Chocolatey API"""
+
+import typing
+from typing import TypeAlias, Any
+from collections.abc import Callable, Coroutine
+from functools import partialmethod, wraps
+import asyncio
+import locale
+
+from utlx import public
+from utlx import run
+
+from ._chocolatey_cmd import ChocolateyCmd
+
+AsyncCompletedProcessCallable: TypeAlias = Callable[...,
+                                    Coroutine[Any, Any, run.CompletedTextProcess]]
+
+
+async def _arun(*args: Any, check: bool = True, timeout: float | None = None,
+                input: str | bytes | None = None,  # noqa: A002
+                capture_output: bool = False, stdin: Any = None,
+                stdout: Any = None, stderr: Any = None,
+                cwd: Any = None, env: Any = None,
+                text: bool | None = None, universal_newlines: bool | None = None,
+                encoding: str | None = None,
+                errors: str | None = None) -> run.CompletedProcess:
+    """Runs the command described by `args` through asyncio.
+
+    The asyncio counterpart of `utlx.run`. If the timeout expires or the
+    awaiting task is cancelled, the child process is killed and reaped
+    before the exception propagates.
+    """
+    cmd = [str(arg) for arg in args]
+    if capture_output:
+        stdout = stderr = run.PIPE
+    if input is not None:
+        stdin = run.PIPE
+    text_mode = bool(text or universal_newlines or encoding or errors)
+    if isinstance(input, str):
+        input = input.encode(encoding or locale.getpreferredencoding(False),  # noqa: A001
+                             errors or "strict")
+    proc = await asyncio.create_subprocess_exec(*cmd, stdin=stdin,
+                                                stdout=stdout, stderr=stderr,
+                                                cwd=cwd, env=env)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(input), timeout)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+        raise run.TimeoutExpired(cmd, typing.cast(float, timeout)) from None
+    except BaseException:
+        await _kill(proc)
+        raise
+    returncode = typing.cast(int, proc.returncode)
+    output: run.CompletedProcess
+    if text_mode:
+        output = run.CompletedProcess(cmd, returncode,
+                                      _decode(out, encoding, errors),
+                                      _decode(err, encoding, errors))
+    else:
+        output = run.CompletedProcess(cmd, returncode, out, err)
+    if check and returncode:
+        raise run.CalledProcessError(returncode, cmd, output.stdout, output.stderr)
+    return output
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is not None:
+        return
+    try:
+        proc.kill()
+    except ProcessLookupError:  # pragma: no cover
+        return
+    await asyncio.shield(proc.wait())
+
+
+def _decode(data: bytes | None, encoding: str | None, errors: str | None) -> str | None:
+    if data is None:
+        return None
+    text = data.decode(encoding or locale.getpreferredencoding(False), errors or "strict")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _coroutine(method: Callable[..., Any]) -> Any:
+    """Turn a ChocolateyCmd command into a coroutine function."""
+    @wraps(method)
+    async def wrapper(self: AsyncChocolateyCmd, *args: Any,
+                      **kwargs: Any) -> run.CompletedTextProcess:
+        return typing.cast(run.CompletedTextProcess,
+                           await method(self, *args, **kwargs))
+    return wrapper
+
+
+@public
+class AsyncChocolateyCmd(ChocolateyCmd):
+    """Chocolatey commands (asyncio)
+
+    Same commands and arguments as ChocolateyCmd, but every command is
+    a coroutine running choco as an asyncio subprocess. The `timeout`
+    argument and cancellation of the awaiting task both kill the choco
+    process.
+    """
+
+    ## Low-level Chocolatey API ##
+
+    choco     = _coroutine(ChocolateyCmd.choco)
+    help      = _coroutine(ChocolateyCmd.help)     # noqa: A003
+    license   = _coroutine(ChocolateyCmd.license)  # noqa: A003
+    support   = _coroutine(ChocolateyCmd.support)
+    apikey    = _coroutine(ChocolateyCmd.apikey)
+    setapikey = apikey  # alias for apikey
+    cache     = _coroutine(ChocolateyCmd.cache)
+    config    = _coroutine(ChocolateyCmd.config)
+    export    = _coroutine(ChocolateyCmd.export)
+    feature   = _coroutine(ChocolateyCmd.feature)
+    features  = feature  # alias for feature
+    search    = _coroutine(ChocolateyCmd.search)
+    find      = search  # alias for search
+    info      = _coroutine(ChocolateyCmd.info)
+    list      = _coroutine(ChocolateyCmd.list)     # noqa: A003
+    outdated  = _coroutine(ChocolateyCmd.outdated)
+    install   = _coroutine(ChocolateyCmd.install)
+    upgrade   = _coroutine(ChocolateyCmd.upgrade)
+    uninstall = _coroutine(ChocolateyCmd.uninstall)
+    new       = _coroutine(ChocolateyCmd.new)
+    pack      = _coroutine(ChocolateyCmd.pack)
+    pin       = _coroutine(ChocolateyCmd.pin)
+    push      = _coroutine(ChocolateyCmd.push)
+    source    = _coroutine(ChocolateyCmd.source)
+    sources   = source  # alias for source
+    template  = _coroutine(ChocolateyCmd.template)
+    templates = template  # alias for template
+
+    # ----- internals ----- #
+
+    async def _broker_run(self, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(super()._broker_run, *args, **kwargs)
+
+    _cmd = typing.cast(AsyncCompletedProcessCallable,  # type: ignore[assignment]
+                       partialmethod(vars(ChocolateyCmd)["_run_wrapper"],
+                                     _arun, ChocolateyCmd._CHOCOLATEY_EXE))
+    _cmd_launched = typing.cast(AsyncCompletedProcessCallable,  # type: ignore[assignment]
+                       partialmethod(vars(ChocolateyCmd)["_run_wrapper"],
+                                     _arun, ChocolateyCmd._LAUNCHER_EXE,
+                                     ChocolateyCmd._CHOCOLATEY_EXE, _elevated_run=True))
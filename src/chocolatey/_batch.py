@@ -0,0 +1,220 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Batches of changes of the Chocolatey settings"""
+
+from typing import Any
+from typing_extensions import Self
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from functools import wraps
+import copy
+import sys
+import json
+import hmac
+import subprocess
+
+from utlx import public
+
+from ._chocolatey_cmd import ChocolateyCmd, _signature
+from ._chocolatey import Chocolatey
+from ._trace import _traced, _untraced
+
+# The choco commands of the operations, the only ones run by the helper.
+_SUBCOMMANDS = frozenset({"config", "source", "feature", "pin", "apikey"})
+# The options of secrets, not queued (they would be written to the file of the helper).
+_SECRET_OPTIONS = frozenset({"api_key", "apikey", "key", "password",
+                             "cert_password", "certpassword"})
+
+
+@public
+@dataclass(slots=True)
+class BatchResult:
+    """Result of an operation of a ChocolateyBatch."""
+    operation: str  # name of the Chocolatey method, e.g. "config_set"
+    kwargs: dict[str, Any]
+    args: list[str] = field(default_factory=list)  # the choco command line
+    returncode: int | None = None  # None if not run
+    stdout: str = ""
+    stderr: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the operation has run successfully."""
+        return self.returncode == 0
+
+
+def _operation(method: Callable[..., None]) -> Any:
+    """Turn a Chocolatey method changing a setting into a queued operation."""
+    @wraps(method)
+    def wrapper(self: ChocolateyBatch, **kwargs: Any) -> None:
+        self._add(method, kwargs)
+    return wrapper
+
+
+@public
+class ChocolateyBatch:
+    """Changes of the Chocolatey settings, run together.
+
+    Returned by Chocolatey.batch(). Has the methods of Chocolatey changing
+    config, sources, features, pins and API keys, with the same arguments.
+    They are checked and queued, and run at the end of the with statement
+    (unless it ends by an exception) or by run(): in the order queued, all
+    in one elevated process (see ChocolateyCmd) if the current process does
+    not run elevated. A failed operation does not stop the next ones; see
+    results. The cached results of Chocolatey are dropped once, at the end.
+
+    The operations passing secrets are not queued (Chocolatey.ValueError),
+    since the elevated process gets them in a file: there is no apikey_add()
+    and source_add() takes no password or cert_password.
+    """
+
+    results: list[BatchResult]
+    _choco: Chocolatey
+    _recorder: Chocolatey
+    _queue: list[tuple[BatchResult, tuple[tuple[Any, ...], dict[str, Any]], Any]]
+    _recorded: list[tuple[tuple[Any, ...], dict[str, Any]]]
+
+    def __new__(cls, choco: Chocolatey) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.results = []
+        self._choco = choco
+        self._queue = []
+        self._recorded = []
+        # A copy of choco recording the commands instead of running them.
+        self._recorder = copy.copy(choco)
+        self._recorder.cache = self._recorder.persistent_cache = None
+        self._recorder.cmd = recorder_cmd = copy.copy(choco.cmd)
+        recorder_cmd._cmd = self._record  # type: ignore[method-assign]
+        recorder_cmd._elevated_runner = self._record
+        return self
+
+    config_set      = _operation(Chocolatey.config_set)
+    config_unset    = _operation(Chocolatey.config_unset)
+    source_add      = _operation(Chocolatey.source_add)
+    source_enable   = _operation(Chocolatey.source_enable)
+    source_disable  = _operation(Chocolatey.source_disable)
+    source_remove   = _operation(Chocolatey.source_remove)
+    feature_enable  = _operation(Chocolatey.feature_enable)
+    feature_disable = _operation(Chocolatey.feature_disable)
+    pin_add         = _operation(Chocolatey.pin_add)
+    pin_remove      = _operation(Chocolatey.pin_remove)
+    apikey_remove   = _operation(Chocolatey.apikey_remove)
+
+    def __len__(self) -> int:
+        """Number of the queued operations."""
+        return len(self._queue)
+
+    @_traced
+    def run(self) -> list[BatchResult]:
+        """Runs the queued operations and returns their results."""
+        queue, self._queue = self._queue, []
+        if not queue: return []
+        try:
+            outputs = self._choco.cmd._run_batch([command for _, command, _ in queue])
+        finally:
+            methods = {name for _, _, invalidates in queue for name in invalidates}
+            for cache in (self._choco.cache, self._choco.persistent_cache):
+                if cache is not None:
+                    cache.invalidate(*sorted(methods))
+        results = []
+        for (result, _, _), output in zip(queue, outputs):
+            if output is not None:
+                result.args = [str(arg) for arg in output.args]
+                result.returncode = output.returncode
+                result.stdout = output.stdout or ""
+                result.stderr = output.stderr or ""
+            results.append(result)
+        self.results += results
+        return results
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        """Results of the operations run unsuccessfully (or not run)."""
+        return [result for result in self.results if not result.ok]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.run()
+        else:
+            self._queue.clear()
+
+    # ----- internals ----- #
+
+    def _add(self, method: Callable[..., None], kwargs: dict[str, Any]) -> None:
+        self._recorded.clear()
+        with _untraced():
+            method(self._recorder, **kwargs)
+        command, = self._recorded
+        secrets = sorted(name for name, value in command[1].items()
+                         if name in _SECRET_OPTIONS and value not in (None, False))
+        if secrets:
+            raise Chocolatey.ValueError(f"{method.__name__}() with {', '.join(secrets)} "
+                                        "cannot be batched.")
+        self._queue.append((BatchResult(method.__name__, kwargs), command,
+                            getattr(method, "_invalidates", ())))
+
+    def _record(self, *args: Any, **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        self._recorded.append((args, kwargs))
+        return subprocess.CompletedProcess(list(args), 0, "", "")
+
+
+# ----- the helper ----- #
+
+def _choco_command() -> list[str]:
+    # The command line part of choco itself in the commands of a batch.
+    return [str(ChocolateyCmd._CHOCOLATEY_EXE)]
+
+
+def main(argv: Sequence[str] = sys.argv[1:]) -> int:
+    """Runs the choco commands of a batch file, adding their results to it.
+
+    The file is signed with the key given by --key (see _run_batch() of
+    ChocolateyCmd) and is not run if changed, e.g. by another process while
+    the elevation is prompted for. Of the commands only the choco commands
+    of the ChocolateyBatch operations are run; the results are signed too.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog=f"python -m {__name__}")
+    parser.add_argument("path")
+    parser.add_argument("--key", required=True)
+    args = parser.parse_args(argv)
+    with open(args.path, encoding="utf-8") as file:
+        batch = json.load(file)
+    commands = batch.get("commands")
+    if not hmac.compare_digest(str(batch.get("signature", "")),
+                               _signature(args.key, commands)):
+        print(f"Batch file {args.path} has been changed, not run.", file=sys.stderr)
+        return 2
+    choco = _choco_command()
+    results: list[dict[str, Any]] = []
+    try:
+        for command in commands:
+            name = command[len(choco)] if len(command) > len(choco) else None
+            if command[:len(choco)] != choco or name not in _SUBCOMMANDS:
+                results.append(dict(returncode=-1, stdout="",
+                                    stderr=f"Not a batch command: {command!r}"))
+                continue
+            try:
+                output = subprocess.run(command, capture_output=True, text=True)
+            except OSError as exc:
+                results.append(dict(returncode=-1, stdout="", stderr=str(exc)))
+            else:
+                results.append(dict(returncode=output.returncode,
+                                    stdout=output.stdout, stderr=output.stderr))
+    finally:
+        batch["results"] = results
+        batch["results_signature"] = _signature(args.key, results)
+        with open(args.path, "w", encoding="utf-8") as file:
+            json.dump(batch, file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
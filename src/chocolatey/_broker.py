@@ -0,0 +1,276 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Elevated broker - a helper process running the commands of a session"""
+
+from typing import TypeAlias, Any
+from typing_extensions import Self
+from collections.abc import Sequence
+from os import PathLike
+import typing
+import sys
+import io
+import locale
+import json
+import base64
+import socket
+import secrets
+import subprocess
+import threading
+import weakref
+import time
+
+from utlx import public
+from utlx import run
+
+StrPath: TypeAlias = str | PathLike[str]
+
+
+@public
+class ElevatedBroker:
+    """A long-lived helper process running commands on behalf of its client.
+
+    The helper is started (once, on the first command) by the command
+    argv - by default the launcher of ChocolateyCmd running this module
+    elevated - with `--port PORT --token TOKEN` appended. It connects back
+    to the client on the localhost port, authenticates with the token and
+    runs the commands sent to it one by one, as JSON lines. The helper
+    exits once the broker is closed (or garbage collected, or the client
+    process ends).
+
+    run() takes the arguments of utlx.run() and returns (or raises) what
+    run() would have.
+    """
+
+    command: list[str]
+    connect_timeout: float
+    _popen: subprocess.Popen[bytes] | None
+    _conn: socket.socket | None
+    _reader: io.BufferedReader | None
+    _lock: threading.Lock
+    _finalizer: weakref.finalize[..., ElevatedBroker] | None
+
+    _exit_grace = 5.0  # seconds to connect once the started command has exited
+
+    def __new__(cls, command: Sequence[StrPath] | None = None, *,
+                connect_timeout: float = 60.0) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        if command is None:
+            from ._chocolatey_cmd import ChocolateyCmd
+            command = [ChocolateyCmd._LAUNCHER_EXE, *_python_module(__name__)]
+        self.command = [str(arg) for arg in command]
+        self.connect_timeout = connect_timeout
+        self._popen  = None
+        self._conn   = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._finalizer = None
+        return self
+
+    @property
+    def running(self) -> bool:
+        """Whether the helper is started and connected."""
+        return self._conn is not None
+
+    def run(self, *args: Any, wait: bool = True, check: bool = True,
+            timeout: float | None = None,
+            input: str | bytes | None = None,  # noqa: A002
+            capture_output: bool = False, stdout: Any = None, stderr: Any = None,
+            cwd: StrPath | None = None,
+            text: bool | None = None, universal_newlines: bool | None = None,
+            encoding: str | None = None, errors: str | None = None,
+            **kwargs: Any) -> run.CompletedProcess:
+        """Runs the command described by args in the helper.
+
+        The other arguments of run() (e.g. env, shell, stdin, stream)
+        are not supported (TypeError).
+        """
+        if not wait:
+            raise ValueError("The broker runs the commands to completion (wait=True)")
+        unsupported = [key for key, val in kwargs.items() if val is not None and val is not False]
+        if unsupported:
+            raise TypeError(f"The broker does not support {', '.join(unsupported)}")
+        cmd = [str(arg) for arg in args]
+        text_mode = bool(text or universal_newlines or encoding or errors)
+        if isinstance(input, str):
+            input = input.encode(encoding or locale.getpreferredencoding(False),  # noqa: A001
+                                 errors or "strict")
+        request = dict(args=cmd, cwd=None if cwd is None else str(cwd), timeout=timeout,
+                       input=None if input is None else _b64encode(input))
+        with self._lock:
+            if self._conn is None:
+                self._start()
+            try:
+                reply = self._request(request)
+            except (OSError, ValueError) as exc:
+                self._close()
+                raise ConnectionError(f"The broker has failed: {exc}") from exc
+        if "error" in reply:
+            raise OSError(reply["error"])
+        if reply.get("timeout"):
+            raise run.TimeoutExpired(cmd, typing.cast(float, timeout))
+        out = err = None
+        if capture_output or stdout == run.PIPE:
+            out = _b64decode(reply["stdout"])
+        if capture_output or stderr == run.PIPE:
+            err = _b64decode(reply["stderr"])
+        output: run.CompletedProcess
+        if text_mode:
+            output = run.CompletedProcess(cmd, reply["returncode"],
+                                          _decode(out, encoding, errors),
+                                          _decode(err, encoding, errors))
+        else:
+            output = run.CompletedProcess(cmd, reply["returncode"], out, err)
+        if check and output.returncode:
+            raise run.CalledProcessError(output.returncode, cmd,
+                                         output.stdout, output.stderr)
+        return output
+
+    def close(self) -> None:
+        """Ends the session - the helper exits."""
+        with self._lock:
+            self._close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ----- internals ----- #
+
+    def _start(self) -> None:
+        token = secrets.token_hex(16)
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            port = server.getsockname()[1]
+            popen = subprocess.Popen([*self.command, "--port", str(port), "--token", token])
+            end_time = time.monotonic() + self.connect_timeout
+            server.settimeout(0.1)
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except TimeoutError:
+                    # The launcher may exit once the helper is started,
+                    # but not with an error (e.g. the elevation declined).
+                    if popen.poll() is not None:
+                        if popen.returncode:
+                            raise ConnectionError("The broker has exited with "
+                                                  f"{popen.returncode}") from None
+                        end_time = min(end_time, time.monotonic() + self._exit_grace)
+                    if time.monotonic() < end_time: continue
+                    _stop(popen, None)
+                    raise ConnectionError("The broker has not connected") from None
+                conn.settimeout(self.connect_timeout)
+                reader = conn.makefile("rb")
+                try:
+                    hello = json.loads(reader.readline() or b"null")
+                except (OSError, ValueError):
+                    hello = None
+                if isinstance(hello, dict) and secrets.compare_digest(
+                        str(hello.get("token", "")), token):
+                    break
+                reader.close() ; conn.close()
+        conn.settimeout(None)
+        self._popen, self._conn, self._reader = popen, conn, reader
+        self._finalizer = weakref.finalize(self, _stop, popen, conn)
+
+    def _request(self, request: dict[str, Any]) -> dict[str, Any]:
+        assert self._conn is not None and self._reader is not None
+        self._conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ValueError("connection closed")
+        reply: dict[str, Any] = json.loads(line)
+        return reply
+
+    def _close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+        if self._reader is not None:
+            self._reader.close()
+        self._popen = self._conn = self._reader = None
+        self._finalizer = None
+
+
+def _stop(popen: subprocess.Popen[bytes], conn: socket.socket | None) -> None:
+    # Asks the helper to exit (by closing the connection) and reaps the process.
+    if conn is not None:
+        try:
+            conn.sendall(b'{"exit": true}\n')
+        except OSError:
+            pass
+        conn.close()
+    try:
+        popen.wait(5)
+    except subprocess.TimeoutExpired:
+        popen.kill()
+        popen.wait()
+
+
+def _python_module(module: str) -> list[str]:
+    # The command line running module by this Python, not importing from
+    # the current directory (as the elevated helpers must not): -P, or in
+    # Python 3.10 with the directory removed from sys.path first.
+    if sys.version_info >= (3, 11):
+        return [sys.executable, "-P", "-m", module]
+    return [sys.executable, "-c", "import sys, runpy; del sys.path[0]; "  # pragma: no cover
+            f"runpy.run_module({module!r}, run_name='__main__', alter_sys=True)"]
+
+
+def _decode(data: bytes | None, encoding: str | None, errors: str | None) -> str | None:
+    # As the text mode of subprocess (with universal newlines).
+    if data is None:
+        return None
+    return io.TextIOWrapper(io.BytesIO(data), encoding or locale.getpreferredencoding(False),
+                            errors or "strict").read()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data)
+
+
+# ----- the helper ----- #
+
+def _serve(port: int, token: str) -> None:
+    with socket.create_connection(("127.0.0.1", port)) as conn, \
+         conn.makefile("rb") as reader:
+        conn.sendall(json.dumps(dict(token=token)).encode("utf-8") + b"\n")
+        for line in reader:
+            request = json.loads(line)
+            if request.get("exit"): break
+            conn.sendall(json.dumps(_execute(request)).encode("utf-8") + b"\n")
+
+
+def _execute(request: dict[str, Any]) -> dict[str, Any]:
+    input = request.get("input")  # noqa: A001
+    try:
+        output = subprocess.run(request["args"], cwd=request.get("cwd"),
+                                input=None if input is None else _b64decode(input),
+                                capture_output=True, timeout=request.get("timeout"))
+    except subprocess.TimeoutExpired:
+        return dict(timeout=True)
+    except OSError as exc:
+        return dict(error=str(exc))
+    return dict(returncode=output.returncode,
+                stdout=_b64encode(output.stdout), stderr=_b64encode(output.stderr))
+
+
+def main(argv: Sequence[str] = sys.argv[1:]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog=f"python -m {__name__}")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--token", required=True)
+    args = parser.parse_args(argv)
+    _serve(args.port, args.token)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
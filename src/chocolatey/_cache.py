@@ -0,0 +1,313 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Chocolatey query caches"""
+
+from typing import Any, TypeVar
+from typing_extensions import Self
+from collections.abc import Callable, Mapping
+from collections import OrderedDict
+from contextlib import closing
+from functools import wraps
+from os import PathLike
+from pathlib import Path
+import threading
+import sqlite3
+import pickle
+import time
+import copy
+
+from utlx import public
+import platformdirs
+
+from ._trace import _annotate
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@public
+class QueryCache:
+    """In-process cache of the read-only Chocolatey queries.
+
+    Entries are kept for the TTL of their method (ttls, falling back to ttl,
+    in seconds) and the least recently used ones are evicted past maxsize
+    entries. hits and misses count the lookups.
+    """
+
+    DEFAULT_TTLS: Mapping[str, float] = {
+        "installed": 60.0,
+        "outdated":  300.0,
+        "pinned":    60.0,
+        "config":    300.0,
+        "sources":   300.0,
+        "features":  300.0,
+        "apikeys":   300.0,
+        "templates": 600.0,
+    }
+
+    ttl: float
+    ttls: dict[str, float]
+    maxsize: int
+    hits: int
+    misses: int
+    _entries: OrderedDict[tuple[Any, ...], tuple[float, Any]]
+    _lock: threading.Lock
+
+    def __new__(cls, *, ttl: float = 60.0, ttls: Mapping[str, float] | None = None,
+                maxsize: int = 256) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.ttl     = ttl
+        self.ttls    = {**cls.DEFAULT_TTLS, **(ttls or {})}
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        return self
+
+    def __len__(self) -> int:
+        """Number of cached entries (expired ones included)."""
+        return len(self._entries)
+
+    def get(self, key: tuple[Any, ...]) -> tuple[bool, Any]:
+        """Returns (True, value) if key is cached and not expired, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple[Any, ...], value: Any, method: str) -> None:
+        """Caches value under key for the TTL of method."""
+        ttl = self.ttls.get(method, self.ttl)
+        if ttl <= 0: return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *methods: str) -> None:
+        """Drops the entries of methods (of all entries if none is given)."""
+        with self._lock:
+            if not methods:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in methods]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+@public
+class PersistentCache:
+    """On-disk cache of the remote Chocolatey queries, shared by processes.
+
+    Results younger than max_age seconds are fresh. For stale_while_revalidate
+    seconds more they are still returned, but refreshed in the background
+    (by one process at a time). The parsed results are kept pickled in a
+    SQLite database in WAL mode, so several processes can read and write it
+    at once. hits, stale_hits and misses count the lookups of this instance.
+    """
+
+    DEFAULT_PATH = platformdirs.user_cache_path("py-chocolatey",
+                                                appauthor=False)/"queries.sqlite"
+
+    # A background refresh not completed in this time may be taken over.
+    _REFRESH_TIMEOUT = 600.0
+    # Part of the keys; to be changed with the (pickled) result classes.
+    _FORMAT = 5
+
+    path: Path
+    max_age: float
+    stale_while_revalidate: float
+    hits: int
+    stale_hits: int
+    misses: int
+    _lock: threading.Lock
+    _refreshes: set[threading.Thread]
+
+    def __new__(cls, path: str | PathLike[str] | None = None, *,
+                max_age: float = 3600.0, stale_while_revalidate: float = 0.0) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.path = Path(path) if path is not None else cls.DEFAULT_PATH
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.hits = self.stale_hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._refreshes = set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                       "key TEXT PRIMARY KEY, method TEXT NOT NULL, "
+                       "stored REAL NOT NULL, refreshing REAL, value BLOB NOT NULL)")
+        return self
+
+    def get(self, key: str) -> tuple[str | None, Any]:
+        """Returns ("fresh" | "stale", value) if key is cached, else (None, None)."""
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT stored, value FROM entries WHERE key = ?",
+                             (key,)).fetchone()
+        age = None if row is None else time.time() - row[0]
+        with self._lock:
+            if age is not None and age < self.max_age:
+                self.hits += 1
+                return "fresh", pickle.loads(row[1])
+            if age is not None and age < self.max_age + self.stale_while_revalidate:
+                self.stale_hits += 1
+                return "stale", pickle.loads(row[1])
+            self.misses += 1
+            return None, None
+
+    def put(self, key: str, value: Any, method: str) -> None:
+        """Caches value of method under key."""
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, NULL, ?)",
+                       (key, method, time.time(), data))
+
+    def refresh(self, key: str, fetch: Callable[[], Any], method: str) -> bool:
+        """Refreshes the stale key with fetch() in a background thread.
+
+        Returns False if the key is being refreshed already (possibly
+        by another process).
+        """
+        now = time.time()
+        with closing(self._connect()) as db:
+            claimed = db.execute("UPDATE entries SET refreshing = ? WHERE key = ? "
+                                 "AND (refreshing IS NULL OR refreshing < ?)",
+                                 (now, key, now - self._REFRESH_TIMEOUT)).rowcount
+        if not claimed: return False
+
+        def target() -> None:
+            try:
+                self.put(key, fetch(), method)
+            except Exception:
+                with closing(self._connect()) as db:
+                    db.execute("UPDATE entries SET refreshing = NULL WHERE key = ?", (key,))
+            finally:
+                with self._lock:
+                    self._refreshes.discard(thread)
+
+        thread = threading.Thread(target=target, daemon=True)
+        with self._lock:
+            self._refreshes.add(thread)
+        thread.start()
+        return True
+
+    def join(self, timeout: float | None = None) -> None:
+        """Waits for the background refreshes started by this instance."""
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                thread = next(iter(self._refreshes), None)
+            if thread is None: break
+            thread.join(None if end_time is None else max(end_time - time.monotonic(), 0))
+            if end_time is not None and time.monotonic() >= end_time: break
+
+    def invalidate(self, *methods: str) -> None:
+        """Drops the entries of methods (of all entries if none is given)."""
+        with closing(self._connect()) as db:
+            if not methods:
+                db.execute("DELETE FROM entries")
+            else:
+                db.execute("DELETE FROM entries WHERE method IN "
+                           f"({', '.join('?' * len(methods))})", methods)
+
+    def prune(self) -> None:
+        """Drops the entries too old to be returned."""
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM entries WHERE stored < ?",
+                       (time.time() - self.max_age - self.stale_while_revalidate,))
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        self.invalidate()
+        with self._lock:
+            self.hits = self.stale_hits = self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; writers wait for each other up to the timeout.
+        return sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+
+
+def _cached(method: _F) -> _F:
+    """Caches the results of a query method in self.cache (if set)."""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        cache: QueryCache | None = self.cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+        key = (name, self.source, repr(args), repr(sorted(kwargs.items())))
+        hit, value = cache.get(key)
+        _annotate(memory_cache="hit" if hit else "miss")
+        if hit: return value
+        value = method(self, *args, **kwargs)
+        cache.put(key, value, name)
+        return value
+    return wrapper  # type: ignore[return-value]
+
+
+def _persisted(method: _F) -> _F:
+    """Caches the results of a query method in self.persistent_cache (if set).
+
+    The key covers the choco version, the feeds of the source (its URLs, not
+    its name), and the arguments. The queries of the local packages
+    (local_only=True) are not cached: they change with every install,
+    upgrade and uninstall.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        cache: PersistentCache | None = self.persistent_cache
+        if cache is None or kwargs.get("local_only"):
+            return method(self, *args, **kwargs)
+        source = kwargs.get("source", self.source)
+        if source is None or isinstance(source, str):
+            source = self._source_feeds(source)
+        key = repr((cache._FORMAT, name, self._choco_version(), source, args,
+                    sorted(item for item in kwargs.items() if item[0] != "source")))
+        state, value = cache.get(key)
+        _annotate(persistent_cache=state or "miss")
+        if state == "stale":
+            cache.refresh(key, lambda: method(self, *args, **kwargs), name)
+        if state is not None: return value
+        value = method(self, *args, **kwargs)
+        if not getattr(value, "truncated", False):
+            cache.put(key, value, name)
+        return value
+    return wrapper  # type: ignore[return-value]
+
+
+def _invalidates(*methods: str) -> Callable[[_F], _F]:
+    """Drops the cached results of methods once the decorated method has run."""
+    def decorator(method: _F) -> _F:
+        @wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # also on failure, which may have left partial changes
+                for cache in (self.cache, self.persistent_cache):
+                    if cache is not None:
+                        cache.invalidate(*methods)
+        wrapper._invalidates = methods  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+    return decorator
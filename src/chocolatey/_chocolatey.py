@@ -6,17 +6,24 @@ from __future__ import annotations
 """Chocolatey API"""
 
 import typing
-from typing import TypeAlias, Any
+from typing import TypeAlias, ClassVar, Any
 from typing_extensions import Self
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence, Iterable, Iterator, Generator
+from contextlib import closing
 from os import PathLike
-from dataclasses import dataclass
-from collections import defaultdict
+from dataclasses import dataclass, field, fields, MISSING
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import builtins
+import contextvars
+import os
+import locale
+import threading
+import time
 import tempfile
 import shutil
-import textwrap
+import subprocess
 # import enum
 # from rich import print
 
@@ -26,13 +33,40 @@ from utlx import run
 from nocasedict import NocaseDict
 import regex as re
 
-from ._chocolatey_cmd import ChocolateyCmd
+from ._chocolatey_cmd import ChocolateyCmd, ChocolateyProcess
+from ._broker import ElevatedBroker
+from ._table import PackageTable, version_key, _normalized_version
+from ._nuspec import _read_nuspec
+from ._config_file import _ConfigFile
+from ._cache import QueryCache, PersistentCache, _cached, _persisted, _invalidates
+from ._trace import _traced, _parser
+if typing.TYPE_CHECKING:
+    from ._batch import ChocolateyBatch
 
 StrPath: TypeAlias = str | PathLike[str]
+# A page request of Chocolatey._search_pages(): (offset, size, start time, process).
+_PageRequest: TypeAlias = tuple[int, int, float, ChocolateyProcess]
+# A choco run of a Chocolatey._*_steps() generator: (ChocolateyCmd method, args, kwargs).
+_Step: TypeAlias = tuple[str, tuple[Any, ...], dict[str, Any]]
+_Steps: TypeAlias = Generator[_Step, Any, Any]
+
+
+class _Converted:
+    """Base of the result classes with fields converted from their string values.
+
+    The values are converted eagerly, by __post_init__(), so the slots hold
+    the bool, None and (small) int singletons instead of the strings parsed.
+    _converters are the same conversions, for the columns of a PackageTable.
+    """
+
+    __slots__ = ()
+
+    # field name: conversion of its string value
+    _converters: ClassVar[dict[str, Callable[[str, Any], Any]]] = {}
 
 
 @public
-@dataclass
+@dataclass(slots=True)
 class version_info:
     major:  int = 0
     minor:  int = 0
@@ -41,40 +75,53 @@ class version_info:
 
 
 @public
-@dataclass
+@dataclass(slots=True)
 class Package:
     id: str  # noqa: A003
     version: str
 
 
 @public
-@dataclass
-class PackageOutdated(Package):
+@dataclass(slots=True)
+class PackageOutdated(Package, _Converted):
     available_version: str | None = None
     pinned: bool = False
 
+    _converters = dict(pinned=lambda name, value: _str2bool(name, value))
+
     def __post_init__(self) -> None:
         """Post-init"""
         self.pinned = _str2bool("pinned", self.pinned)
 
 
 @public
-@dataclass
+@dataclass(slots=True)
 class PackageInfo(Package):
     description: str = ""
     title: str = ""
     summary: str = ""
     # additional
     published: str = ""
+    downloads: int | None = None
+    version_downloads: int | None = None
+    package_url: str = ""
+    package_source: str = ""
+    tags: list[str] = field(default_factory=list)
+    software_site: str = ""
+    software_license: str = ""
+    dependencies: dict[str, str] = field(default_factory=dict)
 
 
 @public
-@dataclass
-class Config:
+@dataclass(slots=True)
+class Config(_Converted):
     name: str
     value: str | bool | None = None
     description: str = ""
 
+    _converters = dict(value=lambda name, value: _str2bool(name, _str2none(name, value),
+                                                           with_check=False))
+
     def __post_init__(self) -> None:
         """Post-init"""
         self.value = _str2none("value", self.value)
@@ -82,8 +129,8 @@ class Config:
 
 
 @public
-@dataclass
-class Source:
+@dataclass(slots=True)
+class Source(_Converted):
     name: str
     value: str = ""
     disabled: bool = False
@@ -94,6 +141,14 @@ class Source:
     self_service: bool = False
     admin_only: bool = False
 
+    _converters = dict(disabled=lambda name, value: _str2bool(name, value),
+                       user=lambda name, value: _str2none(name, value),
+                       password=lambda name, value: _str2none(name, value),
+                       priority=lambda name, value: _str2int(name, value),
+                       bypass_proxy=lambda name, value: _str2bool(name, value),
+                       self_service=lambda name, value: _str2bool(name, value),
+                       admin_only=lambda name, value: _str2bool(name, value))
+
     def __post_init__(self) -> None:
         """Post-init"""
         self.disabled     = _str2bool("disabled", self.disabled)
@@ -106,13 +161,16 @@ class Source:
 
 
 @public
-@dataclass
-class Feature:
+@dataclass(slots=True)
+class Feature(_Converted):
     name: str
     enabled: bool = False
     description: str = ""
     # set_explicitly: bool = False
 
+    _converters = dict(enabled=lambda name, value: _str2bool(name, value,
+                                                             literals=("enabled", "disabled")))
+
     def __post_init__(self) -> None:
         """Post-init"""
         self.enabled = _str2bool("enabled", self.enabled,
@@ -120,19 +178,111 @@ class Feature:
 
 
 @public
-@dataclass
+@dataclass(slots=True)
 class ApiKey:
     source: str
     info: str
 
 
 @public
-@dataclass
+@dataclass(slots=True)
 class Template:
     name: str
     version: str
 
 
+@public
+@dataclass(slots=True)
+class PackageResult:
+    """Result of install_many(), upgrade_many() or uninstall_many() for a package."""
+    pkg_id: str
+    returncode: int
+    message: str = ""  # the failure reported by choco
+    skipped: bool = False  # already satisfied (skip_satisfied=True)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the package has been processed successfully."""
+        return self.returncode == 0
+
+
+@public
+class SearchResult(dict[str, Any]):
+    """Found packages by id (as returned by search()).
+
+    truncated is True if the search was stopped by its limit or deadline
+    before reaching the end of the results.
+    """
+
+    truncated: bool = False
+
+
+@public
+class PageSizeTuner:
+    """Adaptive --page-size of paged choco queries.
+
+    Grows the page size while the full pages come back faster than half of
+    target_latency (and under half of max_payload bytes), shrinks it when a
+    page takes longer than target_latency (or exceeds max_payload), always
+    within [min_page_size, max_page_size]. A page size smaller than the one
+    requested, seen in the middle of the results, is taken as the limit of
+    the feed and lowers max_page_size.
+    """
+
+    page_size: int
+    min_page_size: int
+    max_page_size: int
+    target_latency: float
+    max_payload: int
+    _lock: threading.Lock
+
+    def __new__(cls, page_size: int = 25, *,
+                min_page_size: int = 10, max_page_size: int = 1000,
+                target_latency: float = 2.0, max_payload: int = 1 << 20) -> Self:
+        """Constructor"""
+        if not 1 <= min_page_size <= max_page_size:
+            raise ValueError("invalid page size bounds")
+        self = super().__new__(cls)
+        self.min_page_size  = min_page_size
+        self.max_page_size  = max_page_size
+        self.target_latency = target_latency
+        self.max_payload    = max_payload
+        self.page_size = self._clamp(page_size)
+        self._lock = threading.Lock()
+        return self
+
+    def size_at(self, offset: int) -> int:
+        """Page size to request the results starting at offset with.
+
+        choco pages by page index, so the size has to divide the offset;
+        this is the greatest such one not above the current page size.
+        """
+        page_size = self.page_size
+        if offset == 0: return page_size
+        return next(size for size in range(page_size, 0, -1) if offset % size == 0)
+
+    def update(self, page_size: int, count: int,
+               latency: float, payload: int) -> None:
+        """Takes the measures of a page of count results requested with page_size."""
+        with self._lock:
+            # Only full pages of the current size tell about the feed.
+            if page_size != self.page_size or count < page_size: return
+            if latency > self.target_latency or payload > self.max_payload:
+                self.page_size = self._clamp(page_size // 2)
+            elif latency < self.target_latency / 2 and payload * 2 <= self.max_payload:
+                self.page_size = self._clamp(page_size * 2)
+
+    def limit(self, page_size: int) -> None:
+        """Lowers max_page_size to the page size limit of the feed."""
+        with self._lock:
+            self.max_page_size = max(page_size, 1)
+            self.min_page_size = min(self.min_page_size, self.max_page_size)
+            self.page_size = self._clamp(self.page_size)
+
+    def _clamp(self, page_size: int) -> int:
+        return max(self.min_page_size, min(page_size, self.max_page_size))
+
+
 @public
 class Chocolatey:
     """Chocolatey API"""
@@ -141,16 +291,69 @@ class Chocolatey:
 
     _SETUP_DIR = module_path()/"choco-setup"
 
+    # Adaptive page sizes of search(page_size="auto"), by source.
+    _page_size_tuners: dict[str | None, PageSizeTuner] = {}
+    _page_size_tuners_lock = threading.Lock()
+
     source: str | None
     cmd: ChocolateyCmd
-
-    def __new__(cls, source: str | None = None) -> Self:
-        """Constructor"""
+    install_root: Path
+    config_file: Path
+    cache: QueryCache | None = None
+    persistent_cache: PersistentCache | None = None
+    _version: str | None = None
+    _config_reader: _ConfigFile | None = None
+
+    def __new__(cls, source: str | None = None, *,
+                cache: QueryCache | bool | None = None,
+                persistent_cache: PersistentCache | bool | None = None,
+                install_root: StrPath | None = None,
+                config_file: StrPath | None = None,
+                broker: ElevatedBroker | bool | None = None) -> Self:
+        """Constructor
+
+        install_root is the Chocolatey installation directory, read by
+        installed(from_lib=True) and info(local_only=True, from_lib=True)
+        (%ChocolateyInstall% by default).
+
+        config_file is the chocolatey.config read by config(), sources(),
+        features(), config_get() and feature_get() with from_file=True
+        (install_root/config/chocolatey.config by default).
+
+        cache=True (or a QueryCache) caches the results of the read-only
+        queries (installed(), outdated(), pinned(), config(), sources(),
+        features(), apikeys() and templates()); the methods changing them
+        drop the cached ones.
+
+        persistent_cache=True (or a PersistentCache) caches the results of
+        search(), info() and outdated() on disk, for all processes.
+
+        broker=True (or an ElevatedBroker) runs the commands requiring
+        elevation in one elevated helper process for the session
+        (see ChocolateyCmd); close() ends the session.
+        """
         self = super().__new__(cls)
         self.source = source
-        self.cmd = ChocolateyCmd(self.source)
+        self.cmd = ChocolateyCmd(self.source, broker=broker)
+        self.install_root = (Path(install_root) if install_root is not None
+                             else self._default_install_root())
+        self.config_file = (Path(config_file) if config_file is not None
+                            else self.install_root/"config/chocolatey.config")
+        self.cache = QueryCache() if cache is True else (cache or None)
+        self.persistent_cache = (PersistentCache() if persistent_cache is True
+                                 else (persistent_cache or None))
+        return self
+
+    def close(self) -> None:
+        """Ends the session of the broker (if any)."""
+        self.cmd.close()
+
+    def __enter__(self) -> Self:
         return self
 
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     ### High-level API ###
 
     @classmethod
@@ -165,14 +368,10 @@ class Chocolatey:
                 cls._SETUP_DIR/"install.ps1", "-ChocolateyDownloadUrl", zip_file)
 
     @property
+    @_traced
     def version(self) -> str:
         """Gets the Chocolatey version."""
-        try:
-            output = self.cmd.choco(version=True, limit_output=True,
-                                    source=False, **self._capture_output)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return output.stdout.strip()
+        return typing.cast(str, self._run_steps(self._version_steps()))
 
     @property
     def version_info(self) -> version_info:
@@ -181,429 +380,589 @@ class Chocolatey:
         parts[len(parts):] =  (4 - len(parts)) * [0]
         return version_info(*parts)
 
+    @_traced
     def help(self, *, command: str | None = None) -> str:  # noqa: A003
         """Gets the help information for choco and choco commands."""
-        try:
-            if not command:
-                output = self.cmd.help(limit_output=True,
-                                       **self._capture_output)
-            else:
-                output = self.cmd.choco(command, help=True,
-                                        limit_output=True,
-                                        **self._capture_output)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return output.stdout.lstrip().replace("\r\n", "\n").replace("\r", "\n")
+        return typing.cast(str, self._run_steps(self._help_steps(command)))
 
+    @_traced
     def license(self, **kwargs: Any) -> str:  # noqa: A003
         """Gets the information about the current Chocolatey CLI license [v2.5.0+]."""
-        self._omit_args(kwargs, "limit_output")
-        try:
-            output = self.cmd.license(limit_output=True,
-                                      **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return output.stdout.lstrip().replace("\r\n", "\n").replace("\r", "\n")
+        return typing.cast(str, self._run_steps(self._text_steps("license", kwargs)))
 
+    @_traced
     def support(self, **kwargs: Any) -> str:
         """Provides support information [v2.5.0+]."""
-        self._omit_args(kwargs, "limit_output")
-        try:
-            output = self.cmd.support(limit_output=True,
-                                      **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return output.stdout.lstrip().replace("\r\n", "\n").replace("\r", "\n")
+        return typing.cast(str, self._run_steps(self._text_steps("support", kwargs)))
 
     # run_silent = partial(subprocess.run, stdout=open(os.devnull, 'wb'))
     # FIXME: look at python_vagrant to achieve hide of out and/or err stream
 
-    def installed(self, *filters: str, **kwargs: Any) -> dict[str, list[Package]]:
-        """Retrieves a list of locally installed packages."""
+    @_traced
+    @_cached
+    def installed(self, *filters: str, as_table: bool = False, from_lib: bool = False,
+                  **kwargs: Any) -> dict[str, list[Package]] | PackageTable:
+        """Retrieves a list of locally installed packages.
+
+        With as_table=True the packages are returned as a PackageTable.
+
+        With from_lib=True the packages are read from the manifests (.nuspec)
+        in the lib directory of install_root, without running choco; filters
+        match ids by substring. choco is still run if other options are
+        given or there is no lib directory.
+        """
+        def from_lib_dir() -> dict[str, list[Package]] | PackageTable:
+            out = "".join(f"{pkg_info.id}|{pkg_info.version}\n"
+                          for pkg_info in self._lib_packages(*filters))
+            return self._table(out) if as_table else self._packages(out)
+
+        offline = from_lib_dir if from_lib and (self.install_root/"lib").is_dir() else None
+        return typing.cast(dict[str, list[Package]] | PackageTable,
+                           self._run_steps(self._installed_steps(filters, kwargs,
+                                                                 as_table=as_table,
+                                                                 offline=offline)))
+
+    @_traced
+    def installed_iter(self, *filters: str, **kwargs: Any) -> Iterator[Package]:
+        """Retrieves the locally installed packages, yielding them as choco lists them.
+
+        The output of choco is parsed line by line as it is read (see
+        ChocolateyCmd stream=True), in the order choco lists the packages,
+        so only the current line is held in memory. Closing the iterator
+        early kills choco.
+        """
         self._omit_args(kwargs, "all_versions",  # Removed from choco list since v2.0.0
                         "limit_output", "local_only",
                         "verbose", "detail", "detailed", "idonly", "id_only")
-        try:
-            output = self.cmd.list(*filters, limit_output=True,
-                                   local_only=True, source=False,
-                                   **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._packages(output.stdout)
+        lines = typing.cast(Generator[str, None, None],
+                            self.cmd.list(*filters, limit_output=True, local_only=True,
+                                          source=False, stream=True, **kwargs))
+        with closing(lines):
+            try:
+                yield from self._iter_lines(lines)
+            except run.CalledProcessError as exc:
+                self._handle_exception(exc)
 
+    @_traced
+    @_cached
+    @_persisted
     def outdated(self, *, ignore_pinned: bool = True, ignore_unfound: bool = True,
-                 **kwargs: Any) -> dict[str, list[PackageOutdated]]:
-        """Retrieves information about packages that are outdated."""
+                 as_table: bool = False,
+                 **kwargs: Any) -> dict[str, list[PackageOutdated]] | PackageTable:
+        """Retrieves information about packages that are outdated.
+
+        With as_table=True the packages are returned as a PackageTable.
+        """
+        return typing.cast(dict[str, list[PackageOutdated]] | PackageTable,
+                           self._run_steps(self._outdated_steps(ignore_pinned, ignore_unfound,
+                                                                kwargs, as_table=as_table)))
+
+    @_traced
+    def outdated_iter(self, *, ignore_pinned: bool = True, ignore_unfound: bool = True,
+                      **kwargs: Any) -> Iterator[PackageOutdated]:
+        """Retrieves the outdated packages, yielding them as choco lists them.
+
+        See installed_iter().
+        """
         self._omit_args(kwargs, "limit_output",
                         "verbose", "detail", "detailed", "idonly", "id_only")
-        try:
-            output = self.cmd.outdated(limit_output=True,
-                                       ignore_pinned=ignore_pinned,
-                                       ignore_unfound=ignore_unfound,
-                                       **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        packages = self._packages(output.stdout, klass=PackageOutdated)
-        for pkg_id, val in list(packages.items()):
-            pkgs = [val] if isinstance(val, PackageOutdated) else val
-            for idx, pkg in enumerate(pkgs[:]):
-                if pkg.version == pkg.available_version: del pkgs[idx]
-            if not pkgs: del packages[pkg_id]
-        return packages
+        lines = typing.cast(Generator[str, None, None],
+                            self.cmd.outdated(limit_output=True,
+                                              ignore_pinned=ignore_pinned,
+                                              ignore_unfound=ignore_unfound,
+                                              stream=True, **kwargs))
+        with closing(lines):
+            try:
+                for package in self._iter_lines(lines, klass=PackageOutdated):
+                    if package.version != package.available_version:
+                        yield package
+            except run.CalledProcessError as exc:
+                self._handle_exception(exc)
 
+    @_traced
+    @_persisted
     def search(self, filter: str | bool = False, *,  # noqa: A002
                all_versions: bool = False, exact: bool = False,
-               **kwargs: Any) -> dict[str, list[Package]]:
-        """Searches remote packages."""
-        self._omit_args(kwargs, "limit_output", "page", "page_size",
+               prefetch: int = 1, limit: int | None = None,
+               deadline: float | None = None,
+               page_size: int | str | PageSizeTuner | None = None,
+               as_table: bool = False,
+               **kwargs: Any) -> SearchResult | PackageTable:
+        """Searches remote packages.
+
+        The result pages are requested one by one until an empty one. With
+        prefetch > 1 up to `prefetch` page requests are kept in flight; the
+        requests started past the first empty page are killed.
+
+        limit caps the number of returned packages (versions, if all_versions)
+        and deadline the time (in seconds) spent on the search. Once either is
+        reached no further page is requested, the running choco processes are
+        killed and the packages found so far are returned. The truncated flag
+        of the result is set on the deadline, or on the limit if more packages
+        are known to remain: past the limit in the last page, after a full page
+        (of an int page_size) or in a next page already fetched.
+
+        page_size is the --page-size of the requests (choco's default if None).
+        With page_size="auto" it is adapted to the latency and payload size of
+        the pages and the value reached is kept for the later searches on the
+        same source; a PageSizeTuner can be passed instead to tune it with its
+        own bounds.
+
+        With as_table=True the packages are returned as a PackageTable (with
+        the truncated flag too).
+        """
+        self._omit_args(kwargs, "limit_output", "page",
                         "verbose", "detail", "detailed", "idonly", "id_only")
-        out  = "" ; page = 0
-        while True:
+        end_time = None if deadline is None else time.monotonic() + deadline
+        pages: list[str] = [] ; count = 0 ; truncated = False
+        pending: deque[_PageRequest] = deque()
+        with closing(self._search_pages(filter, all_versions=all_versions, exact=exact,
+                                        prefetch=prefetch, end_time=end_time,
+                                        page_size=page_size, pending=pending,
+                                        **kwargs)) as page_iter:
             try:
-                arg = [filter] if filter is not False else []
-                output = self.cmd.search(*arg, limit_output=True, page=page,
-                                         all_versions=all_versions, exact=exact,
-                                         **self._capture_output, **kwargs)
-            except run.CalledProcessError as exc:
-                self._handle_exception(exc)
-            if not output.stdout: break
-            out += output.stdout ; page += 1
-            if exact: break
-        return self._packages(out, allow_multiple=all_versions)
-
+                for out in page_iter:
+                    if limit is None:
+                        pages.append(out)
+                        continue
+                    page_lines = out.strip().splitlines()
+                    lines = page_lines[:limit - count]
+                    pages.append("\n".join(lines) + "\n")
+                    count += len(lines)
+                    if count >= limit:
+                        # Only if more packages are known to remain; the next
+                        # page is not requested (nor waited for) to tell.
+                        truncated = (len(lines) < len(page_lines)
+                                     or (isinstance(page_size, int)
+                                         and len(page_lines) >= page_size)
+                                     or self._page_fetched(pending))
+                        break
+            except Chocolatey.TimeoutError:
+                truncated = True
+        if as_table:
+            table = self._table("".join(pages))
+            table.truncated = truncated
+            return table
+        result = SearchResult(self._packages("".join(pages), allow_multiple=all_versions))
+        result.truncated = truncated
+        return result
+
+    @_traced
+    def search_iter(self, filter: str | bool = False, *,  # noqa: A002
+                    all_versions: bool = False, exact: bool = False,
+                    prefetch: int = 1, sort: bool = False,
+                    page_size: int | str | PageSizeTuner | None = None,
+                    **kwargs: Any) -> Iterator[Package]:
+        """Searches remote packages, yielding them page by page.
+
+        Only the current page is held in memory; with sort=True the packages
+        of each page are sorted by id. The pages are fetched as the iteration
+        advances, so breaking out of it stops further page requests (and kills
+        the prefetched ones). page_size is as for search().
+        """
+        self._omit_args(kwargs, "limit_output", "page",
+                        "verbose", "detail", "detailed", "idonly", "id_only")
+        with closing(self._search_pages(filter, all_versions=all_versions, exact=exact,
+                                        prefetch=prefetch, page_size=page_size,
+                                        **kwargs)) as pages:
+            for out in pages:
+                yield from self._iter_packages(out, sort=sort)
+
+    @_traced
+    @_persisted
     def info(self, *, pkg_id: str, local_only: bool = False,
+             single_run: bool = True, from_lib: bool = False,
              **kwargs: Any) -> PackageInfo | None:
-        """Retrieves package information."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.info(pkg_id, limit_output=True,
-                                   local_only=local_only,
-                                   **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        # if not found, returns None
-        if not output.stdout.strip():
-            return None  # pragma: no cover
-        packages = self._packages(output.stdout, klass=PackageInfo)
-        if not packages:
-            return None  # pragma: no cover
-        pkg_info = list(packages.values())[0]
-        try:
-            output = self.cmd.info(pkg_id,
-                                   local_only=local_only,
-                                   **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._info(output.stdout, pkg_info)
+        """Retrieves package information.
+
+        With single_run (the default) the package id and version are taken
+        from the header of the verbose output, so choco is run only once.
+        The --limit-output run is still made if the header is not recognized.
+
+        With local_only and from_lib the information is read from the
+        package manifest (.nuspec) in the lib directory, as by installed().
+        Only the manifest fields are set then (no published date and
+        download counts), but dependencies are.
+        """
+        offline = None
+        if local_only and from_lib and (self.install_root/"lib").is_dir():
+            offline = lambda: self._lib_package(pkg_id)
+        return typing.cast(PackageInfo | None,
+                           self._run_steps(self._info_steps(pkg_id, local_only, single_run,
+                                                            kwargs, offline=offline)))
+
+    @_traced
+    def info_many(self, pkg_ids: Iterable[str], *, max_workers: int | None = None,
+                  local_only: bool = False,
+                  **kwargs: Any) -> dict[str, PackageInfo | None]:
+        """Retrieves information of many packages concurrently.
+
+        Runs info() on a pool of at most max_workers threads. The result
+        is ordered as pkg_ids. A package that is not found or whose lookup
+        fails maps to None - one failing lookup does not stop the others.
+        """
+        pkg_ids = list(dict.fromkeys(pkg_ids))
+        infos = dict(self.info_iter(pkg_ids, max_workers=max_workers,
+                                    local_only=local_only, **kwargs))
+        return {pkg_id: infos[pkg_id] for pkg_id in pkg_ids}
+
+    @_traced
+    def info_iter(self, pkg_ids: Iterable[str], *, max_workers: int | None = None,
+                  local_only: bool = False,
+                  **kwargs: Any) -> Iterator[tuple[str, PackageInfo | None]]:
+        """Retrieves information of many packages concurrently.
+
+        Like info_many(), but yields (pkg_id, PackageInfo | None) pairs
+        in completion order, as soon as each lookup finishes. Closing the
+        iterator early cancels the lookups not started yet.
+        """
+        def info(pkg_id: str) -> PackageInfo | None:
+            try:
+                return self.info(pkg_id=pkg_id, local_only=local_only, **kwargs)
+            except Exception:
+                return None
 
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {executor.submit(contextvars.copy_context().run, info, pkg_id): pkg_id
+                       for pkg_id in dict.fromkeys(pkg_ids)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @_traced
     def export(self, output_file_path: StrPath | bool = False, *,
                include_version_numbers: bool = True, **kwargs: Any) -> None:
         """Exports list of currently installed packages."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.export(output_file_path=output_file_path,
-                            include_version_numbers=include_version_numbers,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-
-    def install(self, *pkg_ids: str, yes: bool = True, **kwargs: Any) -> None:
-        """Installs packages using configured sources."""
-        if not pkg_ids:
-            raise Chocolatey.TypeError("install() "
-                                       "missing at least 1 required positional argument")
-        self._omit_args(kwargs, "yes")  # , "verbose")
-        try:
-            self.cmd.install(*pkg_ids, yes=yes, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-
+        self._run_steps(self._change_steps("export", kwargs=kwargs,
+                                           output_file_path=output_file_path,
+                                           include_version_numbers=include_version_numbers))
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
+    def install(self, *pkg_ids: str, yes: bool = True, skip_satisfied: bool = False,
+                **kwargs: Any) -> list[str]:
+        """Installs packages using configured sources.
+
+        With skip_satisfied=True the packages already installed (in the
+        requested version, if any) are not passed to choco - which is not
+        run at all if none is left. The installed packages are read from
+        the lib directory if available (see installed(from_lib=True)).
+        Returns the skipped package ids.
+        """
+        self._check_pkg_ids("install", pkg_ids)
+        skipped: list[str] = []
+        if skip_satisfied:
+            satisfied = self._satisfied("install", [(pkg_id, kwargs) for pkg_id in pkg_ids])
+            skipped = [pkg_id for pkg_id in pkg_ids if pkg_id.casefold() in satisfied]
+            pkg_ids = tuple(pkg_id for pkg_id in pkg_ids if pkg_id.casefold() not in satisfied)
+            if not pkg_ids: return skipped
+        self._run_steps(self._packages_steps("install", pkg_ids, kwargs, yes=yes))
+        return skipped
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
     def upgrade(self, *pkg_ids: str, install_if_not_installed: bool = True,
-                yes: bool = True, **kwargs: Any) -> None:
-        """Upgrades packages from various sources."""
-        if not pkg_ids:
-            raise Chocolatey.TypeError("upgrade() "
-                                       "missing at least 1 required positional argument")
-        self._omit_args(kwargs, "install_if_not_installed", "yes")  # , "verbose")
-        try:
-            self.cmd.upgrade(*pkg_ids,
-                             install_if_not_installed=install_if_not_installed,
-                             yes=yes, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-
+                yes: bool = True, skip_satisfied: bool = False,
+                **kwargs: Any) -> list[str]:
+        """Upgrades packages from various sources.
+
+        With skip_satisfied=True the packages already installed in the
+        requested version or, if none, not outdated (see outdated(), run
+        only then) are not passed to choco - see install().
+        Returns the skipped package ids.
+        """
+        self._check_pkg_ids("upgrade", pkg_ids)
+        skipped: list[str] = []
+        if skip_satisfied:
+            satisfied = self._satisfied("upgrade", [(pkg_id, kwargs) for pkg_id in pkg_ids])
+            skipped = [pkg_id for pkg_id in pkg_ids if pkg_id.casefold() in satisfied]
+            pkg_ids = tuple(pkg_id for pkg_id in pkg_ids if pkg_id.casefold() not in satisfied)
+            if not pkg_ids: return skipped
+        self._run_steps(self._packages_steps(
+            "upgrade", pkg_ids, kwargs,
+            install_if_not_installed=install_if_not_installed, yes=yes))
+        return skipped
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
     def uninstall(self, *pkg_ids: str, yes: bool = True, all_versions: bool = False,
                   **kwargs: Any) -> None:
         """Uninstalls packages."""
-        if not pkg_ids:
-            raise Chocolatey.TypeError("uninstall() "
-                                       "missing at least 1 required positional argument")
+        self._run_steps(self._packages_steps("uninstall", pkg_ids, kwargs,
+                                             all_versions=all_versions, yes=yes))
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
+    def install_many(self, pkg_ids: Iterable[str | tuple[str, dict[str, Any]]], *,
+                     yes: bool = True, argv_budget: int | None = None,
+                     skip_satisfied: bool = False,
+                     **kwargs: Any) -> dict[str, PackageResult]:
+        """Installs many packages, in as few choco runs as their command lines allow.
+
+        The packages (ids, or (id, options) pairs for the packages needing
+        own options, e.g. ("git", dict(version="2.47.1"))) are grouped by
+        their options and packed into command lines of at most argv_budget
+        characters (self.argv_budget by default). Returns the results by
+        package id - a failing choco run does not stop the next ones.
+
+        skip_satisfied=True skips the packages as install() does; their
+        results are marked as skipped.
+        """
         self._omit_args(kwargs, "yes")  # , "verbose")
-        try:
-            self.cmd.uninstall(*pkg_ids, all_versions=all_versions,
-                               yes=yes, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        return self._run_many("install", pkg_ids, argv_budget, skip_satisfied,
+                              yes=yes, **kwargs)
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
+    def upgrade_many(self, pkg_ids: Iterable[str | tuple[str, dict[str, Any]]], *,
+                     install_if_not_installed: bool = True, yes: bool = True,
+                     argv_budget: int | None = None, skip_satisfied: bool = False,
+                     **kwargs: Any) -> dict[str, PackageResult]:
+        """Upgrades many packages, in as few choco runs as possible (see install_many())."""
+        self._omit_args(kwargs, "install_if_not_installed", "yes")  # , "verbose")
+        return self._run_many("upgrade", pkg_ids, argv_budget, skip_satisfied,
+                              install_if_not_installed=install_if_not_installed,
+                              yes=yes, **kwargs)
+
+    @_traced
+    @_invalidates("installed", "outdated", "pinned")
+    def uninstall_many(self, pkg_ids: Iterable[str | tuple[str, dict[str, Any]]], *,
+                       yes: bool = True, all_versions: bool = False,
+                       argv_budget: int | None = None,
+                       **kwargs: Any) -> dict[str, PackageResult]:
+        """Uninstalls many packages, in as few choco runs as possible (see install_many())."""
+        self._omit_args(kwargs, "yes")  # , "verbose")
+        return self._run_many("uninstall", pkg_ids, argv_budget, False,
+                              all_versions=all_versions, yes=yes, **kwargs)
 
+    @_traced
+    @_cached
     def pinned(self, **kwargs: Any) -> dict[str, list[Package]]:
         """Retrieves a list of packages suppress for upgrades."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.pin("list", limit_output=True,
-                                  **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._packages(output.stdout)
+        return typing.cast(dict[str, list[Package]], self._run_steps(self._pinned_steps(kwargs)))
 
+    @_traced
+    @_invalidates("pinned", "outdated")
     def pin_add(self, *, pkg_id: str, **kwargs: Any) -> None:
         """Suppress upgrades for a package."""
-        self._omit_args(kwargs, "reason")  # , "verbose") # --reason don't work
-        try:
-            self.cmd.pin("add", name=pkg_id,
-                         # reason=reason if reason is False else f'"{reason}"',
-                         **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("pin", "add", kwargs=kwargs,
+                                           omit=("reason",),  # --reason don't work
+                                           capture=False, name=pkg_id))
 
+    @_traced
+    @_invalidates("pinned", "outdated")
     def pin_remove(self, *, pkg_id: str, **kwargs: Any) -> None:
         """Remove suppressing of upgrades for a package."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.pin("remove", name=pkg_id, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("pin", "remove", kwargs=kwargs, capture=False,
+                                           name=pkg_id))
 
+    @_traced
     def pack(self, nuspec_file_path: StrPath | bool = False, *,
              output_directory: StrPath | bool = False, **kwargs: Any) -> None:
         """Packages nuspec, scripts, and other package resources into a nupkg file."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            arg = [nuspec_file_path] if nuspec_file_path is not False else []
-            self.cmd.pack(*arg, output_directory=output_directory, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._pack_steps(nuspec_file_path, output_directory, kwargs))
 
+    @_traced
     def push(self, nupkg_file_path: StrPath | bool = False, yes: bool = True,
              **kwargs: Any) -> None:  # pragma: no cover
         """Pushes a compiled nupkg to a source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            arg = [nupkg_file_path] if nupkg_file_path is not False else []
-            self.cmd.push(*arg, yes=yes, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._push_steps(nupkg_file_path, yes, kwargs))
 
+    @_traced
     def new_package(self, *, pkg_id: str,
                     properties: dict[str, str] | None = None,
                     **kwargs: Any) -> None:
         """Creates template files for creating a new Chocolatey package."""
-        # <name> [<options/switches>] [<property=value> <propertyN=valueN>]
-        self._omit_args(kwargs)  # , "verbose")
-        props = ([] if properties is None else
-                 [f'"{prop}={value}"' for prop, value in properties.items()])
-        try:
-            self.cmd.new(pkg_id, *props, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._new_package_steps(pkg_id, properties, kwargs))
 
     # Configuration - https://docs.chocolatey.org/en-us/configuration
 
-    def config(self, **kwargs: Any) -> dict[str, Config]:
-        """Retrieve config settings."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.config("list", limit_output=True,
-                                     **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._config(output.stdout, klass=Config)
+    @_traced
+    @_cached
+    def config(self, *, from_file: bool = False, **kwargs: Any) -> dict[str, Config]:
+        """Retrieve config settings.
 
-    def config_get(self, *, name: str, **kwargs: Any) -> str | bool:
+        With from_file=True they are read from config_file, without running
+        choco (which is still run if the file is missing or not recognized,
+        or other options are given). The same applies to sources(),
+        features(), config_get() and feature_get().
+        """
+        sections = self._config_sections() if from_file else None
+        offline = None
+        if sections is not None:
+            offline = lambda: self._sorted_configs(
+                Config(item["key"], item["value"], item.get("description", ""))
+                for item in sections["config"])
+        return typing.cast(dict[str, Config],
+                           self._run_steps(self._list_steps("config", Config, kwargs,
+                                                            offline=offline)))
+
+    @_traced
+    def config_get(self, *, name: str, from_file: bool = False,
+                   **kwargs: Any) -> str | bool:
         """Get config value."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            output = self.cmd.config("get", name=name, limit_output=True,
-                                     **self._capture_output, **kwargs)
-            value = output.stdout
-            if value and value[-1] == "\n": value = value[:-1]
-            if value and value[-1] == "\r": value = value[:-1]
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return typing.cast(str | bool, _str2bool("stdout", value,
-                                                 with_check=False))
-
+        sections = self._config_sections() if from_file else None
+        values = [item["value"] for item in (sections or {}).get("config", [])
+                  if item["key"].casefold() == name.casefold()]
+        offline = None
+        if values:
+            offline = lambda: _str2bool("stdout", values[0], with_check=False)
+        return typing.cast(str | bool,
+                           self._run_steps(self._config_get_steps(name, kwargs,
+                                                                  offline=offline)))
+
+    @_traced
+    @_invalidates("config")
     def config_set(self, *, name: str, value: Any, **kwargs: Any) -> None:
         """Set config value."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            if value is None or value == "":
-                self.cmd.config("unset", name=name,
-                                **self._capture_output, **kwargs)
-            else:
-                self.cmd.config("set", name=name, value=_bool2str(name, value),
-                                **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._config_set_steps(name, value, kwargs))
 
+    @_traced
+    @_invalidates("config")
     def config_unset(self, *, name: str, **kwargs: Any) -> None:
         """Unset config."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.config("unset", name=name,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("config", "unset", kwargs=kwargs, name=name))
 
-    def sources(self, **kwargs: Any) -> dict[str, Source]:
+    @_traced
+    @_cached
+    def sources(self, *, from_file: bool = False, **kwargs: Any) -> dict[str, Source]:
         """Retrieve default sources."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.source("list", limit_output=True,
-                                     **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._config(output.stdout, klass=Source)
-
+        sections = self._config_sections() if from_file else None
+        offline = None
+        if sections is not None:
+            # The password, encrypted in the file, is not read.
+            offline = lambda: self._sorted_configs(
+                Source(name=item["id"], value=item["value"],
+                       disabled=_str2bool("disabled", item.get("disabled", "false")),
+                       user=_str2none("user", item.get("user", "")),
+                       priority=_str2int("priority", item.get("priority", "0")),
+                       bypass_proxy=_str2bool("bypass_proxy", item.get("bypassProxy", "false")),
+                       self_service=_str2bool("self_service", item.get("selfService", "false")),
+                       admin_only=_str2bool("admin_only", item.get("adminOnly", "false")))
+                for item in sections["sources"])
+        return typing.cast(dict[str, Source],
+                           self._run_steps(self._list_steps("source", Source, kwargs,
+                                                            offline=offline)))
+
+    @_traced
+    @_invalidates("sources", "search", "info", "outdated")
     def source_add(self, *, name: str, source: str, **kwargs: Any) -> None:
         """Add source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.source("add", name=name, source=source,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("source", "add", kwargs=kwargs,
+                                           name=name, source=source))
 
+    @_traced
+    @_invalidates("sources", "search", "info", "outdated")
     def source_enable(self, *, name: str, **kwargs: Any) -> None:
         """Enable source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.source("enable", name=name,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("source", "enable", kwargs=kwargs, name=name))
 
+    @_traced
+    @_invalidates("sources", "search", "info", "outdated")
     def source_disable(self, *, name: str, **kwargs: Any) -> None:
         """Disable source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.source("disable", name=name,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("source", "disable", kwargs=kwargs, name=name))
 
+    @_traced
+    @_invalidates("sources", "search", "info", "outdated")
     def source_remove(self, *, name: str, **kwargs: Any) -> None:
         """Remove source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.source("remove", name=name,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("source", "remove", kwargs=kwargs, name=name))
 
-    def features(self, **kwargs: Any) -> dict[str, Feature]:
+    @_traced
+    @_cached
+    def features(self, *, from_file: bool = False, **kwargs: Any) -> dict[str, Feature]:
         """Retrieve features."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.feature("list", limit_output=True,
-                                      **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._config(output.stdout, klass=Feature)
-
-    def feature_get(self, *, name: str, **kwargs: Any) -> bool:
+        sections = self._config_sections() if from_file else None
+        offline = None
+        if sections is not None:
+            offline = lambda: self._sorted_configs(
+                Feature(item["name"], _str2bool("enabled", item["enabled"]),
+                        item.get("description", ""))
+                for item in sections["features"])
+        return typing.cast(dict[str, Feature],
+                           self._run_steps(self._list_steps("feature", Feature, kwargs,
+                                                            offline=offline)))
+
+    @_traced
+    def feature_get(self, *, name: str, from_file: bool = False, **kwargs: Any) -> bool:
         """Get feature value."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            output = self.cmd.feature("get", name=name, limit_output=True,
-                                      **self._capture_output, **kwargs)
-            value = output.stdout.strip()
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return typing.cast(bool, _str2bool("stdout", value,
-                                           literals=("enabled", "disabled")))
-
+        sections = self._config_sections() if from_file else None
+        values = [item["enabled"] for item in (sections or {}).get("features", [])
+                  if item["name"].casefold() == name.casefold()]
+        offline = None
+        if values:
+            offline = lambda: _str2bool("enabled", values[0])
+        return typing.cast(bool, self._run_steps(self._feature_get_steps(name, kwargs,
+                                                                         offline=offline)))
+
+    @_traced
+    @_invalidates("features")
     def feature_enable(self, *, name: str, **kwargs: Any) -> None:
         """Enable feature."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.feature("enable", name=name,
-                             **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("feature", "enable", kwargs=kwargs, name=name))
 
+    @_traced
+    @_invalidates("features")
     def feature_disable(self, *, name: str, **kwargs: Any) -> None:
         """Disable feature."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.feature("disable", name=name,
-                             **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("feature", "disable", kwargs=kwargs, name=name))
 
+    @_traced
+    @_cached
     def apikeys(self, **kwargs: Any) -> list[ApiKey]:
         """Retrieve the list of API keys."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.apikey("list", limit_output=True,
-                                     **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return list(self._config(output.stdout, klass=ApiKey).values())
+        return list(self._run_steps(self._list_steps("apikey", ApiKey, kwargs)).values())
 
+    @_traced
+    @_invalidates("apikeys")
     def apikey_add(self, *, source: str, api_key: str, **kwargs: Any) -> None:
         """Add API key for source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.apikey("add", source=source, api_key=api_key,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("apikey", "add", kwargs=kwargs,
+                                           source=source, api_key=api_key))
 
+    @_traced
+    @_invalidates("apikeys")
     def apikey_remove(self, *, source: str, **kwargs: Any) -> None:
         """Remove API key for source."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.apikey("remove", source=source,
-                            **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("apikey", "remove", kwargs=kwargs, source=source))
+
+    def batch(self) -> ChocolateyBatch:
+        """Changes of config, sources, features, pins and API keys run together.
+
+        with choco.batch() as batch:
+            batch.config_set(name=..., value=...)
+            batch.feature_enable(name=...)
+        batch.results  # per operation
 
+        See ChocolateyBatch.
+        """
+        from ._batch import ChocolateyBatch
+        return ChocolateyBatch(self)
+
+    @_traced
+    @_cached
     def templates(self, **kwargs: Any) -> dict[str, Template]:
         """Retrieve templates."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.template("list", limit_output=True,
-                                       **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        return self._config(output.stdout, klass=Template)
+        return typing.cast(dict[str, Template],
+                           self._run_steps(self._list_steps("template", Template, kwargs)))
 
+    @_traced
     def template_info(self, *, name: str, **kwargs: Any) -> Template:
         """Retrieve template info."""
-        self._omit_args(kwargs, "limit_output", "verbose")
-        try:
-            output = self.cmd.template("info", name=name, limit_output=True,
-                                       **self._capture_output, **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
-        templates: dict[str, Template] = self._config(output.stdout, klass=Template)
-        return list(templates.values())[0]
+        return typing.cast(Template, self._run_steps(self._template_info_steps(name, kwargs)))
 
+    @_traced
     def cache_list(self, **kwargs: Any) -> None:
         """Displays information about the local HTTP caches used to store queries."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.cache("list", **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("cache", "list", kwargs=kwargs, capture=False))
 
+    @_traced
     def cache_remove(self, **kwargs: Any) -> None:
         """Remove the local HTTP caches used to store queries."""
-        self._omit_args(kwargs)  # , "verbose")
-        try:
-            self.cmd.cache("remove", **kwargs)
-        except run.CalledProcessError as exc:
-            self._handle_exception(exc)
+        self._run_steps(self._change_steps("cache", "remove", kwargs=kwargs, capture=False))
 
     # ----- internals ----- #
 
@@ -615,82 +974,745 @@ class Chocolatey:
     # err_cm=None,
 
     _capture_output = dict(text=True, capture_output=True)
+    # For the --limit-output listings, parsed from the bytes (see _columns()).
+    _capture_bytes  = dict(capture_output=True)
+
+    # Characters of a command line (the limit of Windows is 32767).
+    argv_budget: int = 32_000
+
+    # The choco runs of the methods, shared with AsyncChocolatey: a _*_steps()
+    # generator maps the arguments of a method to the choco runs it yields
+    # (see _choco()) and parses their outputs, sent back by _run_steps() (or
+    # its coroutine counterpart), into the result of the method. offline,
+    # if given, gets the result without running choco if no other options
+    # are left.
+
+    def _run_steps(self, steps: _Steps) -> Any:
+        try:
+            command, args, kwargs = next(steps)
+            while True:
+                try:
+                    output = getattr(self.cmd, command)(*args, **kwargs)
+                except run.CalledProcessError as exc:
+                    self._handle_exception(exc)
+                command, args, kwargs = steps.send(output)
+        except StopIteration as stop:
+            return stop.value
+
+    @classmethod
+    def _check_pkg_ids(cls, command: str, pkg_ids: Sequence[str]) -> None:
+        if not pkg_ids:
+            raise Chocolatey.TypeError(f"{command}() "
+                                       "missing at least 1 required positional argument")
+
+    @classmethod
+    def _version_steps(cls) -> _Steps:
+        output = yield _choco("choco", version=True, limit_output=True,
+                              source=False, **cls._capture_output)
+        return output.stdout.strip()
+
+    @classmethod
+    def _help_steps(cls, command: str | None) -> _Steps:
+        if not command:
+            output = yield _choco("help", limit_output=True,
+                                  **cls._capture_output)
+        else:
+            output = yield _choco("choco", command, help=True,
+                                  limit_output=True,
+                                  **cls._capture_output)
+        return output.stdout.lstrip().replace("\r\n", "\n").replace("\r", "\n")
+
+    @classmethod
+    def _text_steps(cls, command: str, kwargs: dict[str, Any]) -> _Steps:
+        cls._omit_args(kwargs, "limit_output")
+        output = yield _choco(command, limit_output=True,
+                              **cls._capture_output, **kwargs)
+        return output.stdout.lstrip().replace("\r\n", "\n").replace("\r", "\n")
+
+    @classmethod
+    def _installed_steps(cls, filters: tuple[str, ...], kwargs: dict[str, Any], *,
+                         as_table: bool = False,
+                         offline: Callable[[], Any] | None = None) -> _Steps:
+        cls._omit_args(kwargs, "all_versions",  # Removed from choco list since v2.0.0
+                       "limit_output", "local_only",
+                       "verbose", "detail", "detailed", "idonly", "id_only")
+        if offline is not None and not kwargs:
+            return offline()
+        output = yield _choco("list", *filters, limit_output=True,
+                              local_only=True, source=False,
+                              **cls._capture_bytes, **kwargs)
+        if as_table: return cls._table(output.stdout)
+        return cls._packages(output.stdout)
+
+    @classmethod
+    def _outdated_steps(cls, ignore_pinned: bool, ignore_unfound: bool,
+                        kwargs: dict[str, Any], *, as_table: bool = False) -> _Steps:
+        cls._omit_args(kwargs, "limit_output",
+                       "verbose", "detail", "detailed", "idonly", "id_only")
+        output = yield _choco("outdated", limit_output=True,
+                              ignore_pinned=ignore_pinned,
+                              ignore_unfound=ignore_unfound,
+                              **cls._capture_bytes, **kwargs)
+        if as_table: return cls._outdated_table(output.stdout)
+        return cls._outdated(output.stdout)
+
+    @classmethod
+    def _info_steps(cls, pkg_id: str, local_only: bool, single_run: bool,
+                    kwargs: dict[str, Any], *,
+                    offline: Callable[[], Any] | None = None) -> _Steps:
+        cls._omit_args(kwargs, "limit_output", "verbose")
+        if offline is not None and not kwargs:
+            return offline()
+        verbose_out = None
+        if single_run:
+            output = yield _choco("info", pkg_id,
+                                  local_only=local_only,
+                                  **cls._capture_output, **kwargs)
+            verbose_out = output.stdout
+            pkg_info = cls._info_header(verbose_out, pkg_id)
+            if pkg_info is not None:
+                return cls._info(verbose_out, pkg_info)
+            # if not found, returns None
+            if cls._info_not_found(verbose_out):
+                return None
+        output = yield _choco("info", pkg_id, limit_output=True,
+                              local_only=local_only,
+                              **cls._capture_output, **kwargs)
+        # if not found, returns None
+        if not output.stdout.strip():
+            return None  # pragma: no cover
+        packages = cls._packages(output.stdout, klass=PackageInfo)
+        if not packages:
+            return None  # pragma: no cover
+        pkg_info = list(packages.values())[0]
+        if verbose_out is None:
+            output = yield _choco("info", pkg_id,
+                                  local_only=local_only,
+                                  **cls._capture_output, **kwargs)
+            verbose_out = output.stdout
+        return cls._info(verbose_out, pkg_info)
+
+    @classmethod
+    def _packages_steps(cls, command: str, pkg_ids: tuple[str, ...],
+                        kwargs: dict[str, Any], **options: Any) -> _Steps:
+        cls._check_pkg_ids(command, pkg_ids)
+        cls._omit_args(kwargs, *options)  # , "verbose")
+        yield _choco(command, *pkg_ids, **options, **kwargs)
+
+    @classmethod
+    def _pinned_steps(cls, kwargs: dict[str, Any]) -> _Steps:
+        cls._omit_args(kwargs, "limit_output", "verbose")
+        output = yield _choco("pin", "list", limit_output=True,
+                              **cls._capture_bytes, **kwargs)
+        return cls._packages(output.stdout)
+
+    @classmethod
+    def _pack_steps(cls, nuspec_file_path: StrPath | bool, output_directory: StrPath | bool,
+                    kwargs: dict[str, Any]) -> _Steps:
+        cls._omit_args(kwargs)  # , "verbose")
+        arg = [nuspec_file_path] if nuspec_file_path is not False else []
+        yield _choco("pack", *arg, output_directory=output_directory, **kwargs)
+
+    @classmethod
+    def _push_steps(cls, nupkg_file_path: StrPath | bool, yes: bool,
+                    kwargs: dict[str, Any]) -> _Steps:  # pragma: no cover
+        cls._omit_args(kwargs)  # , "verbose")
+        arg = [nupkg_file_path] if nupkg_file_path is not False else []
+        yield _choco("push", *arg, yes=yes, **kwargs)
+
+    @classmethod
+    def _new_package_steps(cls, pkg_id: str, properties: dict[str, str] | None,
+                           kwargs: dict[str, Any]) -> _Steps:
+        # <name> [<options/switches>] [<property=value> <propertyN=valueN>]
+        cls._omit_args(kwargs)  # , "verbose")
+        props = ([] if properties is None else
+                 [f'"{prop}={value}"' for prop, value in properties.items()])
+        yield _choco("new", pkg_id, *props, **kwargs)
+
+    @classmethod
+    def _list_steps(cls, command: str, klass: type, kwargs: dict[str, Any], *,
+                    offline: Callable[[], Any] | None = None) -> _Steps:
+        # The config, source, feature, apikey and template listings.
+        cls._omit_args(kwargs, "limit_output", "verbose")
+        if offline is not None and not kwargs:
+            return offline()
+        output = yield _choco(command, "list", limit_output=True,
+                              **cls._capture_bytes, **kwargs)
+        return cls._config(output.stdout, klass=klass)
+
+    @classmethod
+    def _config_get_steps(cls, name: str, kwargs: dict[str, Any], *,
+                          offline: Callable[[], Any] | None = None) -> _Steps:
+        cls._omit_args(kwargs)  # , "verbose")
+        if offline is not None and not kwargs:
+            return offline()
+        output = yield _choco("config", "get", name=name, limit_output=True,
+                              **cls._capture_output, **kwargs)
+        value = output.stdout
+        if value and value[-1] == "\n": value = value[:-1]
+        if value and value[-1] == "\r": value = value[:-1]
+        return _str2bool("stdout", value, with_check=False)
+
+    @classmethod
+    def _config_set_steps(cls, name: str, value: Any, kwargs: dict[str, Any]) -> _Steps:
+        cls._omit_args(kwargs)  # , "verbose")
+        if value is None or value == "":
+            yield _choco("config", "unset", name=name,
+                         **cls._capture_output, **kwargs)
+        else:
+            yield _choco("config", "set", name=name, value=_bool2str(name, value),
+                         **cls._capture_output, **kwargs)
 
-    def _packages(self, out: str, *, klass: type = Package,
+    @classmethod
+    def _feature_get_steps(cls, name: str, kwargs: dict[str, Any], *,
+                           offline: Callable[[], Any] | None = None) -> _Steps:
+        cls._omit_args(kwargs)  # , "verbose")
+        if offline is not None and not kwargs:
+            return offline()
+        output = yield _choco("feature", "get", name=name, limit_output=True,
+                              **cls._capture_output, **kwargs)
+        value = output.stdout.strip()
+        return _str2bool("stdout", value, literals=("enabled", "disabled"))
+
+    @classmethod
+    def _template_info_steps(cls, name: str, kwargs: dict[str, Any]) -> _Steps:
+        cls._omit_args(kwargs, "limit_output", "verbose")
+        output = yield _choco("template", "info", name=name, limit_output=True,
+                              **cls._capture_bytes, **kwargs)
+        templates: dict[str, Template] = cls._config(output.stdout, klass=Template)
+        return list(templates.values())[0]
+
+    @classmethod
+    def _change_steps(cls, command: str, *args: Any, kwargs: dict[str, Any],
+                      omit: tuple[str, ...] = (), capture: bool = True,
+                      **options: Any) -> _Steps:
+        # The commands run only for their effect (export, pin, cache and
+        # the changes of config, sources, features and API keys).
+        cls._omit_args(kwargs, *omit)  # , "verbose")
+        capture_output = cls._capture_output if capture else {}
+        yield _choco(command, *args, **options, **capture_output, **kwargs)
+
+    def _run_many(self, command: str,
+                  pkg_ids: Iterable[str | tuple[str, dict[str, Any]]],
+                  argv_budget: int | None, skip_satisfied: bool,
+                  **kwargs: Any) -> dict[str, PackageResult]:
+        if argv_budget is None: argv_budget = self.argv_budget
+        packages = [(item, {}) if isinstance(item, str) else item for item in pkg_ids]
+        results: dict[str, PackageResult] = {}
+        if skip_satisfied:
+            satisfied = self._satisfied(command, [(pkg_id, {**kwargs, **options})
+                                                  for pkg_id, options in packages])
+            results.update((pkg_id, PackageResult(pkg_id, 0, skipped=True))
+                           for pkg_id, _ in packages if pkg_id.casefold() in satisfied)
+            packages = [package for package in packages if package[0] not in results]
+        groups: dict[str, tuple[dict[str, Any], list[str]]] = {}
+        for pkg_id, options in packages:
+            group_key = repr(sorted(options.items()))
+            groups.setdefault(group_key, (options, []))[1].append(pkg_id)
+        for options, group_ids in groups.values():
+            options = {**kwargs, **options}
+            budget = argv_budget - len(subprocess.list2cmdline(
+                self.cmd._command_line(command, **options)))
+            for chunk in self._chunks(list(dict.fromkeys(group_ids)), budget):
+                try:
+                    getattr(self.cmd, command)(*chunk, **self._capture_output, **options)
+                except run.CalledProcessError as exc:
+                    results.update(self._failures(chunk, exc))
+                else:
+                    results.update((pkg_id, PackageResult(pkg_id, 0)) for pkg_id in chunk)
+        return results
+
+    def _satisfied(self, command: str,
+                   packages: list[tuple[str, dict[str, Any]]]) -> set[str]:
+        # The (casefolded) ids of the packages, with their options, already
+        # satisfying the install or upgrade command.
+        installed = self.installed(as_table=True, from_lib=True)
+        outdated: dict[str, list[PackageOutdated]] | PackageTable | None = None
+        satisfied: set[str] = set()
+        for pkg_id, options in packages:
+            if options.get("force") or pkg_id not in installed: continue
+            version = options.get("version")
+            if version:
+                if not any(version_key(package.version) == version_key(str(version))
+                           for package in installed[pkg_id]): continue
+            elif command == "upgrade":
+                if outdated is None: outdated = self.outdated(as_table=True)
+                if pkg_id in outdated: continue
+            satisfied.add(pkg_id.casefold())
+        return satisfied
+
+    @staticmethod
+    def _chunks(pkg_ids: list[str], budget: int) -> Iterator[list[str]]:
+        # Consecutive ids, each chunk filled up to budget characters
+        # (a too long id in a chunk of its own).
+        chunk: list[str] = []
+        size = 0
+        for pkg_id in pkg_ids:
+            length = len(subprocess.list2cmdline([pkg_id])) + 1
+            if chunk and size + length > budget:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(pkg_id)
+            size += length
+        if chunk: yield chunk
+
+    _failure_line = re.compile(r"[\t ]*-[\t ]+(?P<id>\S+)"
+                               r"(?:[\t ]+\(exited[\t ]+(?P<code>-?\d+)\))?"
+                               r"[\t ]+-[\t ]+(?P<message>.*)")
+
+    @classmethod
+    def _failures(cls, pkg_ids: list[str],
+                  exc: subprocess.CalledProcessError) -> dict[str, PackageResult]:
+        # Results of a failed choco run, by its "Failures" summary:
+        #   Failures
+        #    - <pkg_id> (exited <code>) - <message>
+        # All the packages failed if it is missing.
+        failures: dict[str, PackageResult] = {}
+        in_failures = False
+        for line in (exc.stdout or "").splitlines():
+            if line.strip() == "Failures":
+                in_failures = True
+            elif in_failures:
+                match = cls._failure_line.match(line)
+                if match is None: break
+                failures[match["id"].casefold()] = PackageResult(
+                    match["id"], int(match["code"] or exc.returncode), match["message"])
+        if not in_failures:
+            message = (exc.stderr or exc.stdout or "").strip()
+            return {pkg_id: PackageResult(pkg_id, exc.returncode, message)
+                    for pkg_id in pkg_ids}
+        return {pkg_id: failures.get(pkg_id.casefold()) or PackageResult(pkg_id, 0)
+                for pkg_id in pkg_ids}
+
+    def _search_pages(self, filter: str | bool, *,  # noqa: A002
+                      all_versions: bool, exact: bool, prefetch: int,
+                      end_time: float | None = None,
+                      page_size: int | str | PageSizeTuner | None = None,
+                      pending: deque[_PageRequest] | None = None,
+                      **kwargs: Any) -> Generator[str, None, None]:
+        # Yields the non-empty result pages in page order.
+        # Raises Chocolatey.TimeoutError once time.monotonic() passes end_time.
+        # pending (if given) holds the requests of the pages past the yielded one.
+        arg = [filter] if filter is not False else []
+        prefetch = 1 if exact else max(prefetch, 1)
+        tuner: PageSizeTuner | None = None
+        if page_size == "auto":
+            tuner = self._page_size_tuner(kwargs.get("source", self.source))
+        elif isinstance(page_size, PageSizeTuner):
+            tuner = page_size
+        elif isinstance(page_size, str):
+            raise ValueError(f"Invalid page_size: {page_size!r}")
+        # A request is (offset, size, start time, process), offset and size
+        # counted in pages if the size is fixed, in results if it is tuned.
+        if pending is None: pending = deque()
+        offset = 0
+        short_page = 0  # size of the last short page (if tuned)
+        try:
+            while True:
+                timeout = None
+                if end_time is not None:
+                    timeout = end_time - time.monotonic()
+                    if timeout <= 0:
+                        raise Chocolatey.TimeoutError("search deadline exceeded")
+                while len(pending) < prefetch:
+                    if tuner is None:
+                        size = 1
+                        page_args = dict(page=offset)
+                        if page_size is not None:
+                            page_args.update(page_size=typing.cast(int, page_size))
+                    else:
+                        size = tuner.size_at(offset)
+                        page_args = dict(page=offset // size, page_size=size)
+                    pending.append((offset, size, time.monotonic(),
+                                    typing.cast(ChocolateyProcess,
+                                    self.cmd.search(*arg, limit_output=True,
+                                                    all_versions=all_versions, exact=exact,
+                                                    wait=False, **page_args,
+                                                    **self._capture_output, **kwargs))))
+                    offset += size
+                page_offset, size, start_time, process = pending.popleft()
+                try:
+                    output = process.result(timeout)
+                except run.TimeoutExpired:
+                    if end_time is None or time.monotonic() < end_time: raise
+                    raise Chocolatey.TimeoutError("search deadline exceeded") from None
+                except run.CalledProcessError as exc:
+                    self._handle_exception(exc)
+                if not output.stdout: break
+                if tuner is not None:
+                    count = len(output.stdout.splitlines())
+                    tuner.update(size, count, time.monotonic() - start_time,
+                                 len(output.stdout))
+                    if short_page:
+                        # The page before was not the last one.
+                        tuner.limit(short_page)
+                        short_page = 0
+                    if count < size:
+                        # The last page or the feed's limit of the page size;
+                        # continue right after its results.
+                        short_page = count
+                        for _, _, _, process in pending:
+                            process.kill()
+                        pending.clear()
+                        offset = page_offset + count
+                yield output.stdout
+                if exact: break
+        finally:
+            for _, _, _, process in pending:
+                process.kill()
+
+    @staticmethod
+    def _page_fetched(pending: deque[_PageRequest]) -> bool:
+        # Whether the next page of _search_pages() has already been fetched
+        # (its choco process has exited) and is not empty.
+        if not pending: return False
+        process = pending[0][3]
+        if process.popen.poll() is None: return False
+        try:
+            return bool(process.result().stdout)
+        except run.CalledProcessError:
+            return False
+
+    def _lib_packages(self, *filters: str) -> Iterator[PackageInfo]:
+        # The (valid) packages in install_root/lib whose ids contain the filters.
+        filters = tuple(pkg_filter.casefold() for pkg_filter in filters)
+        for pkg_dir in (self.install_root/"lib").iterdir():
+            if not all(pkg_filter in pkg_dir.name.casefold() for pkg_filter in filters):
+                continue
+            pkg_info = self._lib_nuspec(pkg_dir)
+            if pkg_info is not None:
+                yield pkg_info
+
+    def _lib_package(self, pkg_id: str) -> PackageInfo | None:
+        # The package in install_root/lib of pkg_id (case-insensitively).
+        lib_dir = self.install_root/"lib"
+        pkg_dir = lib_dir/pkg_id
+        if not pkg_dir.is_dir():
+            pkg_dir = next((path for path in lib_dir.iterdir()
+                            if path.name.casefold() == pkg_id.casefold()), pkg_dir)
+        return self._lib_nuspec(pkg_dir)
+
+    @classmethod
+    def _lib_nuspec(cls, pkg_dir: Path) -> PackageInfo | None:
+        # The package of a lib/<id> directory (None if it has no valid manifest).
+        nuspec = pkg_dir/f"{pkg_dir.name}.nuspec"
+        if not nuspec.is_file():
+            nuspec = next(pkg_dir.glob("*.nuspec"), nuspec) if pkg_dir.is_dir() else nuspec
+        try:
+            metadata = _read_nuspec(nuspec)
+        except (OSError, ValueError):
+            return None
+        return cls._nuspec_info(metadata)
+
+    @staticmethod
+    def _nuspec_info(metadata: dict[str, Any]) -> PackageInfo:
+        # The package of the metadata of its manifest (see _read_nuspec()),
+        # with the version as choco prints it.
+        return PackageInfo(metadata["id"], _normalized_version(metadata["version"]),
+                           description=metadata["description"],
+                           title=metadata["title"],
+                           summary=metadata["summary"],
+                           package_source=metadata["packageSourceUrl"],
+                           tags=metadata["tags"].split(),
+                           software_site=metadata["projectUrl"],
+                           software_license=metadata["licenseUrl"],
+                           dependencies=metadata["dependencies"])
+
+    def _config_sections(self) -> dict[str, list[dict[str, str]]] | None:
+        # The sections of config_file (None if missing or not recognized).
+        if self._config_reader is None or self._config_reader.path != self.config_file:
+            self._config_reader = _ConfigFile(self.config_file)
+        return self._config_reader.read()
+
+    @classmethod
+    def _sorted_configs(cls, configs: Iterable[Any]) -> dict[str, Any]:
+        # By name, ordered as by _config().
+        return {config.name: config for config in sorted(configs,
+                key=lambda config: f"{config.name}|".casefold())}
+
+    @classmethod
+    def _default_install_root(cls) -> Path:
+        install_root = os.environ.get("ChocolateyInstall")
+        if install_root: return Path(install_root)
+        return ChocolateyCmd._CHOCOLATEY_EXE.parent.parent
+
+    def _choco_version(self) -> str:
+        # The Chocolatey version, got once per instance; read from the manifest
+        # of the chocolatey package in install_root/lib, choco is run only
+        # if it is missing.
+        if self._version is None:
+            try:
+                metadata = _read_nuspec(self.install_root/"lib/chocolatey/chocolatey.nuspec")
+            except (OSError, ValueError):
+                self._version = self.version
+            else:
+                self._version = _normalized_version(metadata["version"])
+        return self._version
+
+    def _source_feeds(self, source: str | None) -> tuple[str, ...]:
+        # The feeds (URLs or paths) searched with the source option: those of
+        # the names and the feeds given in it (separated by ';'), or of the
+        # enabled sources if None. The sources are read from config_file
+        # (sources() if it is missing).
+        sections = self._config_sections()
+        if sections is not None:
+            sources = {item["id"].casefold():
+                       (item["value"], _str2bool("disabled", item.get("disabled", "false")))
+                       for item in sections["sources"]}
+        else:
+            sources = {name.casefold(): (item.value, item.disabled)
+                       for name, item in self.sources().items()}
+        if source is None:
+            return tuple(sorted(value for value, disabled in sources.values() if not disabled))
+        return tuple(sorted(sources.get(name.casefold(), (name, False))[0]
+                            for name in source.split(";") if name))
+
+    @classmethod
+    def _page_size_tuner(cls, source: str | None) -> PageSizeTuner:
+        with cls._page_size_tuners_lock:
+            tuner = cls._page_size_tuners.get(source)
+            if tuner is None:
+                tuner = cls._page_size_tuners[source] = PageSizeTuner()
+            return tuner
+
+    @classmethod
+    @_parser
+    def _packages(cls, out: str | bytes, *, klass: type = Package,
                   allow_multiple: bool | None = None) -> dict[str, Any]:
-        lines = [line.strip() for line in out.strip().splitlines()]
-        lines.sort(key=str.casefold)
+        if isinstance(out, bytes):
+            multiple = cls._allow_multiple if allow_multiple is None else allow_multiple
+            by_id: dict[str, Any] = {}
+            for columns in cls._columns(out):
+                if columns is None:
+                    out = cls._decode(out)
+                    break
+                if multiple:
+                    for package in map(klass, *columns):
+                        by_id.setdefault(package.id, []).append(package)
+                else:
+                    by_id.update(zip(columns[0], map(klass, *columns)))
+            else:
+                return by_id
         packages = defaultdict(list)
-        for line in lines:
-            # print("LINE:", line)
-            package = klass(*line.split("|"))
+        for package in cls._iter_packages(out, klass=klass, sort=True):
             # print("PKG: ", package)
-            if self._allow_multiple if allow_multiple is None else allow_multiple:
+            if cls._allow_multiple if allow_multiple is None else allow_multiple:
                 packages[package.id].append(package)
             else:
                 packages[package.id] = package
         return dict(packages)
 
     @classmethod
+    def _iter_packages(cls, out: str, *, klass: type = Package,
+                       sort: bool = False) -> Iterator[Any]:
+        lines = [line.strip() for line in out.strip().splitlines()]
+        if sort: lines.sort(key=str.casefold)
+        for line in lines:
+            # print("LINE:", line)
+            yield klass(*line.split("|"))
+
+    # The ASCII characters stripped by str.strip().
+    _whitespace = b" \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f"
+    # Lines split into fields at once by _columns().
+    _columns_block: int = 1024
+
+    @classmethod
+    def _columns(cls, out: bytes) -> Iterator[list[list[str]] | None]:
+        # The fields of the lines of a (binary) --limit-output output, sorted
+        # as by _iter_packages(), by column: [[ids...], [versions...], ...],
+        # for blocks of the lines. The output is decoded at once and every
+        # block is split into fields by one str.split() - the ends of the
+        # lines are marked by the "\n" fields between them - instead of a
+        # strip() and a split() per line. Ends by None if the output needs
+        # the per line parsing: it is not ASCII, its lines differ in the
+        # number of fields (e.g. blank lines) or might need stripping
+        # (whitespace in the first or the last fields).
+        if not out.isascii():
+            yield None
+            return
+        lines = out.decode("ascii").strip().splitlines()
+        if out.islower():
+            lines.sort()
+        else:
+            lines.sort(key=str.lower)
+        width = lines[0].count("|") + 1 if lines else 1
+        stride = width + 1
+        for start in range(0, len(lines), cls._columns_block):
+            block = lines[start:start + cls._columns_block]
+            fields = "|\n|".join(block).split("|")
+            if (len(fields) != stride * len(block) - 1
+                    or fields[width::stride].count("\n") != len(block) - 1):
+                yield None
+                return
+            columns = [fields[idx::stride] for idx in range(width)]
+            edges = ("".join(columns[0]) + "".join(columns[-1])).encode("ascii")
+            if len(edges.translate(None, cls._whitespace)) != len(edges):
+                yield None
+                return
+            yield columns
+
+    @staticmethod
+    def _decode(out: bytes) -> str:
+        # As the output captured with text=True.
+        text = out.decode(locale.getpreferredencoding(False))
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    @classmethod
+    def _iter_lines(cls, lines: Iterable[str], *, klass: type = Package) -> Iterator[Any]:
+        # As _iter_packages(), for the lines of a streamed output, unsorted.
+        for line in lines:
+            line = line.strip()
+            if line: yield klass(*line.split("|"))
+
+    @classmethod
+    @_parser
+    def _table(cls, out: str | bytes, *, klass: type = Package) -> PackageTable:
+        by_column: list[list[str]] | None = None
+        if isinstance(out, bytes):
+            by_column = []
+            for block in cls._columns(out):
+                if block is None:
+                    by_column = None
+                    out = cls._decode(out)
+                    break
+                if not by_column: by_column = [[] for _ in block]
+                for values_so_far, values in zip(by_column, block):
+                    values_so_far += values
+        if by_column is None:
+            lines = [line.strip() for line in typing.cast(str, out).strip().splitlines()]
+            lines.sort(key=str.casefold)
+            rows = [line.split("|") for line in lines]
+        size = len(by_column[0]) if by_column else 0
+        columns: dict[str, list[Any]] = {}
+        for idx, fld in enumerate(fields(klass)):
+            default: Any = fld.default
+            if fld.default_factory is not MISSING:
+                default = fld.default_factory()
+            if by_column is not None:
+                column = by_column[idx] if idx < len(by_column) else size * [default]
+            else:
+                column = [row[idx] if idx < len(row) else default for row in rows]
+            convert = getattr(klass, "_converters", {}).get(fld.name)
+            if convert is not None:
+                column = [convert(fld.name, value)
+                          if isinstance(value, str) else value for value in column]
+            columns[fld.name] = column
+        return PackageTable(klass, columns)
+
+    @classmethod
+    @_parser
+    def _outdated_table(cls, out: str | bytes) -> PackageTable:
+        table = cls._table(out, klass=PackageOutdated)
+        return table._select([version != available_version for version, available_version
+                              in zip(table.versions, table.columns["available_version"])])
+
+    @classmethod
+    @_parser
+    def _outdated(cls, out: str | bytes) -> dict[str, Any]:
+        packages = cls._packages(out, klass=PackageOutdated)
+        for pkg_id, val in list(packages.items()):
+            pkgs = [val] if isinstance(val, PackageOutdated) else val
+            for idx, pkg in enumerate(pkgs[:]):
+                if pkg.version == pkg.available_version: del pkgs[idx]
+            if not pkgs: del packages[pkg_id]
+        return packages
+
+    @classmethod
+    @_parser
     def _info(cls, out: str,
               pkg_info: PackageInfo | None) -> PackageInfo | None:
         # if not found, returns None
         if not out.strip() or pkg_info is None:
             return None  # pragma: no cover
 
-        out = out.replace("\r\n", "\n").replace("\r", "\n")
+        # The lines between the 'Chocolatey vX.Y.Z' and '<id> <version> ...'
+        # header lines and the 'N packages found.' footer line.
+        lines: list[str] = []
+        header_lines = 0
+        for line in out.splitlines():
+            line = line.rstrip()
+            if header_lines < 2:
+                header_lines += bool(line)
+            elif cls._info_footer.match(line):
+                break
+            else:
+                lines.append(line)
+        else:
+            return pkg_info  # pragma: no cover
+        indent = min((len(line) - len(line.lstrip()) for line in lines if line),
+                     default=0)
+
+        # 'Key: value' items, possibly several in a line ('|' separated);
+        # more indented (or empty) lines continue the value of the last one.
+        info: NocaseDict = NocaseDict()
+        key: str | None = None
+        value: list[str] = []
+        for line in lines:
+            line = line[indent:]
+            if not line or line[0] in " \t":
+                if key is not None: value.append(line)
+                continue
+            if key is not None:
+                info[key] = "\n".join(value).rstrip("\n")
+            key = None
+            for item in line.split("|"):
+                if key is not None:
+                    info[key] = value[0]
+                    key = None
+                item = item.strip()
+                if item.startswith("Package url") and not item.startswith("Package url:"):
+                    # 'Package url' or 'Package url <url>'
+                    key, value = "Package url", [item[len("Package url"):].strip()]
+                    continue
+                name, sep, val = item.partition(":")
+                if sep: key, value = name.strip(), [val.strip()]
+        if key is not None:
+            info[key] = "\n".join(value).rstrip("\n")
+
+        pkg_info.description = info.get("Description", "")
+        pkg_info.title       = info.get("Title", "")
+        pkg_info.summary     = info.get("Summary", "")
+        # additional
+        pkg_info.published         = info.get("Published", "")
+        pkg_info.downloads         = _na2int(info.get("Number of Downloads", ""))
+        pkg_info.version_downloads = _na2int(info.get("Downloads for this version", ""))
+        pkg_info.package_url       = _na2str(info.get("Package url", ""))
+        pkg_info.package_source    = _na2str(info.get("Chocolatey Package Source", ""))
+        pkg_info.tags              = info.get("Tags", "").split()
+        pkg_info.software_site     = _na2str(info.get("Software Site", ""))
+        pkg_info.software_license  = _na2str(info.get("Software License", ""))
+        return pkg_info
 
-        # pre-parse
-        out = re.sub(r"[\t ]*\|", "\n", out)
-        out = re.sub(r"\n[\t ]*Package url[\t ]*\n", "\n Package url: n/a\n", out)
-        # parse
+    _info_footer = re.compile(r"[\t ]*\d+[\t ]+packages[\t ]+(found|installed)[\t ]*\.")
+
+    @classmethod
+    def _info_header(cls, out: str, pkg_id: str) -> PackageInfo | None:
+        # The '<id> <version> [Approved]' header line of the verbose info output.
+        out = out.replace("\r\n", "\n").replace("\r", "\n")
         info_header_pattern = r"\s*Chocolatey[\t ]+v.+?([\t ]*\n)+" + \
-                              rf"\s*{pkg_info.id}[\t ]+{pkg_info.version}([\t ]+\[\w+\])?" + \
-                              r"([\t ]*\n)+"
-        info_pattern        = r"(?P<info>(.*\n)*)"
-        info_footer_pattern = r"\n(?P<pkgs_found>\d+)" + \
-                              r"[\t ]+packages[\t ]+(found|installed)[\t ]*\.([\t ]*\n)*"
-        match = re.match(info_header_pattern
-                         + info_pattern
-                         + info_footer_pattern, out)
-        if not match: return pkg_info  # pragma: no cover
-        info_text = textwrap.dedent(match.captures("info")[0])
-        if not info_text.endswith("\n"): info_text += "\n"
-
-        info_key_pattern   = r"(?P<info_key>[^\t :]+([\t ]+[^\t :]+)*)"
-        info_value_pattern = r"(?P<info_value>.*(\n([\t ]+.*)?)*)"
-        info_item_pattern  = rf"{info_key_pattern}[\t ]*:[\t ]*{info_value_pattern}"
-        info_items_pattern = rf"(?P<info_items>({info_item_pattern}\n)+)"
-
-        match = re.match(info_items_pattern, info_text)
-        if not match: return pkg_info  # pragma: no cover
-        info = NocaseDict(zip(match.captures("info_key"),
-                              match.captures("info_value")))
-        # print("============================")
-        # print(dict(info))
-        # print("============================")
-        pkg_info.description = info.pop("Description", "")
-        pkg_info.title       = info.pop("Title", "")
-        pkg_info.summary     = info.pop("Summary", "")
-        # additional
-        pkg_info.published   = info.pop("Published", "")
+                              rf"\s*(?P<id>(?i:{re.escape(pkg_id)}))" + \
+                              r"[\t ]+(?P<version>[^\s|]+)[^\n]*\n"
+        match = re.match(info_header_pattern, out)
+        if not match: return None
+        return PackageInfo(match["id"], match["version"])
 
-        # TODO:
-        """
-        Exist in package with empty metadata (only required fields set).
-        ----------------------------------------------------------------
-        Number of Downloads: n/a
-        Downloads for this version: n/a
-        Package url
-        Chocolatey Package Source: n/a
-        Tags:
-        Software Site: n/a
-        Software License: n/a
-        """
-        return pkg_info
+    @classmethod
+    def _info_not_found(cls, out: str) -> bool:
+        return bool(re.search(r"^[\t ]*0[\t ]+packages[\t ]+(found|installed)",
+                              out, flags=re.MULTILINE))
 
     @classmethod
-    def _config(cls, out: str, *, klass: type) -> dict[str, Any]:
+    @_parser
+    def _config(cls, out: str | bytes, *, klass: type) -> dict[str, Any]:
+        if isinstance(out, bytes):
+            configs: dict[str, Any] = {}
+            for columns in cls._columns(out):
+                if columns is None:
+                    out = cls._decode(out)
+                    break
+                configs.update(zip(columns[0], map(klass, *columns)))
+            else:
+                return configs
         lines = [line.strip() for line in out.strip().splitlines()]
         lines.sort(key=str.casefold)
         configs = {}
@@ -704,8 +1726,17 @@ class Chocolatey:
         for omit in unnecessary:
             kwargs.pop(omit, None)
 
+    @classmethod
+    def _text_exception(cls, exc: BaseException) -> BaseException:
+        # exc with the output of choco captured as bytes (_capture_bytes)
+        # decoded, as if captured as text.
+        if isinstance(exc, run.CalledProcessError):
+            if isinstance(exc.stdout, bytes): exc.stdout = cls._decode(exc.stdout)
+            if isinstance(exc.stderr, bytes): exc.stderr = cls._decode(exc.stderr)
+        return exc
+
     def _handle_exception(self, exc: BaseException, **kwargs: Any) -> None:
-        raise exc  # pragma: no cover
+        raise self._text_exception(exc)  # pragma: no cover
         # raise Chocolatey.RuntimeError(???)
 
     class Error(Exception):
@@ -720,6 +1751,13 @@ class Chocolatey:
     class RuntimeError(builtins.RuntimeError, Error):  # noqa: A001
         """Chocolatey runtime error."""
 
+    class TimeoutError(builtins.TimeoutError, Error):  # noqa: A001
+        """Chocolatey timeout error."""
+
+
+def _choco(command: str, *args: Any, **kwargs: Any) -> _Step:
+    return command, args, kwargs
+
 
 def _bool2str(name: str, value: Any, *,
               literals: Sequence[str] = ("true", "false")) -> Any:
@@ -750,3 +1788,11 @@ def _str2int(name: str, value: Any, *, with_check: bool = True) -> Any:
 
 def _str2none(name: str, value: Any) -> Any:
     return None if isinstance(value, str) and not value else value
+
+
+def _na2str(value: str) -> str:
+    return "" if value == "n/a" else value
+
+
+def _na2int(value: str) -> int | None:
+    return int(value) if value.isdigit() else None
@@ -6,34 +6,263 @@ from __future__ import annotations
 """Low-level Chocolatey API"""
 
 import typing
-from typing import TypeAlias, Any
+from typing import TypeAlias, Any, IO
 from typing_extensions import Self
-from collections.abc import Callable
-from functools import partialmethod
+from collections.abc import Callable, Iterator
+from functools import partial, partialmethod
+import subprocess
+import threading
+import builtins
+import copy
+import os
+import json
+import tempfile
+import secrets
+import hashlib
+import hmac
 
 from utlx import public
 from utlx import module_path
 from utlx import run
 import platformdirs
 
+from ._broker import ElevatedBroker, _python_module
+from ._trace import Span, _command, _claim, _end, _nbytes
+
 CompletedProcessCallable: TypeAlias = Callable[..., run.CompletedTextProcess]
 
 
+@public
+class ChocolateyProcess:
+    """A choco process started with wait=False.
+
+    Takes the same arguments as run(), but does not wait for the process.
+    result() waits for it and returns (or raises) what run() would have.
+    """
+
+    args: list[str]
+    popen: subprocess.Popen[Any]
+    _check: bool
+    _timeout: float | None
+    _input: str | bytes | None
+    _span: Span | None  # the command span (if traced) ended by the process
+
+    def __new__(cls, *args: Any, check: bool = True, timeout: float | None = None,
+                input: str | bytes | None = None,  # noqa: A002
+                capture_output: bool = False, **kwargs: Any) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        if capture_output:
+            kwargs["stdout"] = kwargs["stderr"] = run.PIPE
+        if input is not None:
+            kwargs["stdin"] = run.PIPE
+        self.args     = [str(arg) for arg in args]
+        self._check   = check
+        self._timeout = timeout
+        self._input   = input
+        self._span    = _claim()
+        self.popen    = subprocess.Popen(self.args, **kwargs)
+        return self
+
+    def result(self, timeout: float | None = None) -> run.CompletedTextProcess:
+        """Waits for the process to complete and returns its run.CompletedProcess.
+
+        timeout limits the wait in addition to the run() timeout, if any.
+        On timeout the process is killed and run.TimeoutExpired is raised.
+        """
+        if timeout is None or (self._timeout is not None and self._timeout < timeout):
+            timeout = self._timeout
+        try:
+            stdout, stderr = self.popen.communicate(self._input, timeout=timeout)
+        except run.TimeoutExpired as exc:
+            self._end_span(exc)
+            self.kill()
+            raise
+        output = subprocess.CompletedProcess(self.args, self.popen.returncode,
+                                             stdout, stderr)
+        self._end_span(returncode=output.returncode,
+                       stdout_bytes=_nbytes(stdout), stderr_bytes=_nbytes(stderr))
+        if self._check and output.returncode:
+            raise run.CalledProcessError(output.returncode, self.args,
+                                         output.stdout, output.stderr)
+        return output
+
+    def lines(self) -> Iterator[str]:
+        """Yields the lines of stdout (a text pipe) as the process writes them.
+
+        Meanwhile stderr (if a pipe) is collected. Once stdout ends the process
+        is waited for, and the result() checks apply (run.CalledProcessError
+        without stdout). Closing the iterator early, or the run() timeout
+        expiring, kills the process.
+        """
+        popen = self.popen
+        if popen.stdout is None:
+            raise ValueError("lines() requires stdout=PIPE")
+        stderr: list[Any] = []
+        threads = []
+        if popen.stderr is not None:
+            stderr_pipe = popen.stderr
+            threads.append(threading.Thread(target=lambda: stderr.append(stderr_pipe.read()),
+                                            daemon=True))
+        if popen.stdin is not None:
+            threads.append(threading.Thread(target=self._write_input, daemon=True))
+        expired = threading.Event()
+
+        def expire() -> None:
+            expired.set()
+            popen.kill()
+
+        timer = None
+        if self._timeout is not None:
+            timer = threading.Timer(self._timeout, expire)
+            timer.start()
+        for thread in threads: thread.start()
+        stdout_bytes = 0
+        try:
+            for line in popen.stdout:
+                if self._span is not None: stdout_bytes += typing.cast(int, _nbytes(line))
+                yield line
+            popen.wait()
+            for thread in threads: thread.join()
+        except BaseException as exc:
+            self._end_span(exc)
+            self.kill()
+            raise
+        finally:
+            if timer is not None: timer.cancel()
+        if expired.is_set():
+            timeout_exc = run.TimeoutExpired(self.args, typing.cast(float, self._timeout))
+            self._end_span(timeout_exc)
+            raise timeout_exc
+        self._end_span(returncode=popen.returncode, stdout_bytes=stdout_bytes,
+                       stderr_bytes=_nbytes(stderr[0]) if stderr else None)
+        if self._check and popen.returncode:
+            raise run.CalledProcessError(popen.returncode, self.args,
+                                         None, stderr[0] if stderr else None)
+
+    def _write_input(self) -> None:
+        stdin = typing.cast(IO[Any], self.popen.stdin)
+        try:
+            if self._input is not None: stdin.write(self._input)
+            stdin.close()
+        except OSError:  # pragma: no cover
+            pass
+
+    def kill(self) -> None:
+        """Kills the process if it is still running."""
+        if self.popen.poll() is None:
+            self.popen.kill()
+        self.popen.wait()
+        for stream in (self.popen.stdin, self.popen.stdout, self.popen.stderr):
+            if stream is not None: stream.close()
+        self._end_span(returncode=self.popen.returncode)
+
+    def _end_span(self, exc: BaseException | None = None, **attributes: Any) -> None:
+        if self._span is not None:
+            _end(self._span, exc, **attributes)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.kill()
+
+
+def _run(*args: Any, wait: bool = True, stream: bool = False, **kwargs: Any) -> Any:
+    if stream:
+        kwargs.setdefault("stdout", run.PIPE)
+        kwargs.setdefault("stderr", run.PIPE)
+        if not any(kwargs.get(key) for key in ("text", "universal_newlines",
+                                                "encoding", "errors")):
+            kwargs["text"] = True
+        return ChocolateyProcess(*args, **kwargs).lines()
+    return run(*args, **kwargs) if wait else ChocolateyProcess(*args, **kwargs)
+
+
+def _deferred(fun: Callable[..., Iterator[str]], *args: Any, **kwargs: Any) -> Iterator[str]:
+    # A stream starting choco on the first next(): closing the iterator
+    # before leaves no process (and pipes) behind.
+    yield from fun(*args, **kwargs)
+
+
+def _argv(*args: Any, **kwargs: Any) -> list[str]:
+    return [str(arg) for arg in args]
+
+
+def _signature(key: str, data: Any) -> str:
+    # HMAC of the JSON data exchanged with the batch helper.
+    return hmac.new(key.encode("utf-8"), json.dumps(data, sort_keys=True).encode("utf-8"),
+                    hashlib.sha256).hexdigest()
+
+
 @public
 class ChocolateyCmd:
-    """Chocolatey commands"""
+    """Chocolatey commands
+
+    Every command runs choco and returns its run.CompletedProcess. With
+    wait=False it returns a ChocolateyProcess for the started choco instead,
+    and with stream=True - an iterator of the lines of its output, read as
+    choco writes them (see ChocolateyProcess.lines()).
+    """
 
     _CHOCOLATEY_EXE = platformdirs.site_data_path()/"chocolatey/bin/choco.exe"
     _LAUNCHER_EXE   = module_path()/"exe-bin/launcher.exe"
 
     _source: str | None
+    broker: ElevatedBroker | None
+    _elevated: bool | None
+    _elevated_runner: CompletedProcessCallable | None
 
-    def __new__(cls, source: str | None = None) -> Self:
-        """Constructor"""
+    def __new__(cls, source: str | None = None, *, elevated: bool | None = None,
+                broker: ElevatedBroker | bool | None = None) -> Self:
+        """Constructor
+
+        elevated sets whether the current process runs elevated instead of
+        probing it (on the first command requiring elevation).
+
+        broker=True (or an ElevatedBroker) runs the commands requiring
+        elevation, if the current process does not run elevated, in one
+        elevated helper process for the session instead of a launcher per
+        command. close() (or the with statement) ends the session.
+        """
         self = super().__new__(cls)
         self._source = source
+        self.broker = ElevatedBroker() if broker is True else (broker or None)
+        self._elevated = elevated
+        self._elevated_runner = None
+        return self
+
+    def close(self) -> None:
+        """Ends the session of the broker (if any)."""
+        if self.broker is not None:
+            self.broker.close()
+
+    def __enter__(self) -> Self:
         return self
 
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def elevated(self) -> bool:
+        """Whether the current process runs elevated.
+
+        Probed once per instance (see refresh()); the commands requiring
+        elevation are run through the launcher if it does not.
+        """
+        if self._elevated is None:
+            self._elevated = self._in_elevated
+        return self._elevated
+
+    @elevated.setter
+    def elevated(self, elevated: bool | None) -> None:
+        self._elevated = elevated
+        self._elevated_runner = None
+
+    def refresh(self) -> None:
+        """Drops the elevation state, to probe it again when next needed."""
+        self.elevated = None
+
     ## Low-level Chocolatey API ##
 
     def choco(self, *args: Any, **kwargs: Any) -> run.CompletedTextProcess:
@@ -152,19 +381,35 @@ class ChocolateyCmd:
     _common_args = ["--accept-license", "--no-progress"]
 
     @classmethod
-    def _run_wrapper(cls, run_fun: CompletedProcessCallable, *args: Any,
-                     __format: str = "--{}", **kwargs: Any) -> run.CompletedTextProcess:
+    def _run_wrapper(cls, run_fun: Callable[..., Any], *args: Any,
+                     __format: str = "--{}", _elevated_run: bool = False,
+                     **kwargs: Any) -> run.CompletedTextProcess:
         normal_args = [arg for arg in args if arg is not None]
         allowed_kwargs, reserved_kwargs = run.split_kwargs(kwargs, cls._run_reserved_kwargs)
         allowed_args = sum(([__format.format(key.replace("_", "-")
                                              + ("" if val is True else f"={val}"))]
                             for key, val in allowed_kwargs.items() if val is not False),
                            []) + cls._common_args
-        return run_fun(*normal_args, *allowed_args, **reserved_kwargs)
+        if run_fun is _argv:  # only the command line (a list of str)
+            return typing.cast(run.CompletedTextProcess,
+                               run_fun(*normal_args, *allowed_args, **reserved_kwargs))
+        # The executables (choco, the launcher) are given as paths.
+        command = next((str(arg) for arg in normal_args
+                        if not isinstance(arg, os.PathLike)), "choco")
+        source = allowed_kwargs.get("source")
+        source = str(source).strip('"') if source not in (None, False) else None
+        argv = [*normal_args, *allowed_args]
+        if reserved_kwargs.get("stream"):
+            return typing.cast(run.CompletedTextProcess,
+                               _deferred(_command, command, run_fun, argv, reserved_kwargs,
+                                         elevated=_elevated_run, source=source))
+        return typing.cast(run.CompletedTextProcess,
+                           _command(command, run_fun, argv, reserved_kwargs,
+                                    elevated=_elevated_run, source=source))
 
     _run_reserved_kwargs = {"stdin", "input", "stdout", "stderr", "capture_output",
                             "shell", "cwd", "timeout", "check", "encoding", "errors",
-                            "text", "env", "universal_newlines"}
+                            "text", "env", "universal_newlines", "wait", "stream"}
 
     @property
     def _in_elevated(self) -> bool:
@@ -206,9 +451,81 @@ class ChocolateyCmd:
 
     @property
     def _cmd_elevated(self) -> CompletedProcessCallable:
-        return self._cmd if self._in_elevated else self._cmd_launched
+        runner = self._elevated_runner
+        if runner is None:
+            if self.elevated:
+                runner = self._cmd
+            elif self.broker is not None:
+                runner = partial(self._run_wrapper, self._broker_run, self._CHOCOLATEY_EXE,
+                                 _elevated_run=True)
+            else:
+                runner = self._cmd_launched
+            self._elevated_runner = runner
+        return runner
+
+    def _broker_run(self, *args: Any, **kwargs: Any) -> Any:
+        return typing.cast(ElevatedBroker, self.broker).run(*args, **kwargs)
+
+    def _run_batch(self, commands: builtins.list[tuple[tuple[Any, ...], dict[str, Any]]]) \
+            -> builtins.list[run.CompletedTextProcess | None]:
+        """Runs the (args, kwargs) commands requiring elevation, not checked.
+
+        If the current process does not run elevated and there is no broker,
+        they are all run by one helper (python -m chocolatey._batch) started
+        through the launcher. The commands and their results are passed in
+        a file signed with a key given on the command line of the helper, so
+        neither is taken if changed by another process. The results of the
+        commands not run (if the helper has failed, or has not been started)
+        are None.
+        """
+        options = dict(check=False, capture_output=True, text=True)
+        if self.elevated or self.broker is not None:
+            return [self._cmd_elevated(*args, **{**kwargs, **options})
+                    for args, kwargs in commands]
+        argvs = [self._batch_argv(*args, **kwargs) for args, kwargs in commands]
+        key = secrets.token_hex(32)
+        fd, path = tempfile.mkstemp(prefix="choco-batch-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(dict(commands=argvs, signature=_signature(key, argvs)), file)
+            self._batch_launch(path, key)
+            with open(path, encoding="utf-8") as file:
+                batch = json.load(file)
+        finally:
+            os.remove(path)
+        replies = batch.get("results", [])
+        if not hmac.compare_digest(str(batch.get("results_signature", "")),
+                                   _signature(key, replies)):
+            replies = []
+        replies += [None] * (len(argvs) - len(replies))
+        return [None if reply is None else
+                subprocess.CompletedProcess(argv, reply["returncode"],
+                                            reply["stdout"], reply["stderr"])
+                for argv, reply in zip(argvs, replies)]
+
+    def _command_line(self, command: str, *args: Any, **kwargs: Any) -> builtins.list[str]:
+        # The (longest - launched) command line of the command, not run.
+        recorder = copy.copy(self)
+        recorder._cmd = recorder._elevated_runner = partial(  # type: ignore[method-assign]
+            self._run_wrapper, _argv, self._LAUNCHER_EXE, self._CHOCOLATEY_EXE)
+        return typing.cast(builtins.list[str], getattr(recorder, command)(*args, **kwargs))
+
+    def _batch_argv(self, *args: Any, **kwargs: Any) -> builtins.list[str]:
+        # The command line run by _cmd for the same arguments.
+        return typing.cast(builtins.list[str],
+                           self._run_wrapper(_argv, self._CHOCOLATEY_EXE, *args, **kwargs))
+
+    def _batch_launch(self, path: str, key: str) -> None:
+        # Not checked: the results not written by the helper are None.
+        _command("batch", _run, self._batch_helper(path, key), dict(check=False),
+                 elevated=True, source=None)
+
+    def _batch_helper(self, path: str, key: str) -> builtins.list[Any]:
+        return [self._LAUNCHER_EXE, *_python_module(f"{__package__}._batch"),
+                path, "--key", key]
 
     _cmd = typing.cast(CompletedProcessCallable,
-                       partialmethod(_run_wrapper, run, _CHOCOLATEY_EXE))
+                       partialmethod(_run_wrapper, _run, _CHOCOLATEY_EXE))
     _cmd_launched = typing.cast(CompletedProcessCallable,
-                       partialmethod(_run_wrapper, run, _LAUNCHER_EXE, _CHOCOLATEY_EXE))
+                       partialmethod(_run_wrapper, _run, _LAUNCHER_EXE, _CHOCOLATEY_EXE,
+                                     _elevated_run=True))
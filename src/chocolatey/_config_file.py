@@ -0,0 +1,92 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Chocolatey configuration file (chocolatey.config) reader"""
+
+from typing import TypeAlias
+from typing_extensions import Self
+from os import PathLike
+from pathlib import Path
+import threading
+import os
+import xml.etree.ElementTree as ET
+
+StrPath: TypeAlias = str | PathLike[str]
+Sections: TypeAlias = dict[str, list[dict[str, str]]]
+
+
+class _ConfigFile:
+    """Reader of the config, sources and features sections of chocolatey.config.
+
+    The sections are read with a streaming XML parser as lists of the
+    attributes of their items, and kept until the mtime or size of the
+    file changes.
+    """
+
+    # section: (item element, required item attributes)
+    _SECTIONS: dict[str, tuple[str, tuple[str, ...]]] = {
+        "config":   ("add",     ("key", "value")),
+        "sources":  ("source",  ("id", "value")),
+        "features": ("feature", ("name", "enabled")),
+    }
+
+    path: Path
+    _stamp: tuple[int, int] | None
+    _sections: Sections | None
+    _lock: threading.Lock
+
+    def __new__(cls, path: StrPath) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.path = Path(path)
+        self._stamp = None
+        self._sections = None
+        self._lock = threading.Lock()
+        return self
+
+    def read(self) -> Sections | None:
+        """The sections of the file, or None if it is missing or not recognized."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._sections = self._parse()
+                except (OSError, ValueError, ET.ParseError):
+                    self._sections = None
+                self._stamp = stamp
+            return self._sections
+
+    def _parse(self) -> Sections:
+        # Raises ValueError if the file has an unknown schema.
+        sections: Sections = {}
+        section: str | None = None
+        depth = 0
+        for event, element in ET.iterparse(self.path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1 and element.tag != "chocolatey":
+                    raise ValueError(f"Unknown root element: {element.tag}")
+                elif depth == 2 and element.tag in self._SECTIONS:
+                    section = element.tag
+                    sections[section] = []
+                elif depth == 3 and section is not None:
+                    item_tag, required = self._SECTIONS[section]
+                    if element.tag != item_tag or not all(name in element.attrib
+                                                          for name in required):
+                        raise ValueError(f"Unknown {section} item: {element.tag}")
+                    sections[section].append(dict(element.attrib))
+            else:
+                if depth == 2:
+                    section = None
+                    element.clear()
+                depth -= 1
+        if sections.keys() != self._SECTIONS.keys():
+            raise ValueError("Missing sections: "
+                             f"{', '.join(self._SECTIONS.keys() - sections.keys())}")
+        return sections
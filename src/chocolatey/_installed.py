@@ -0,0 +1,150 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Incremental index of the installed Chocolatey packages"""
+
+from typing import TypeAlias
+from typing_extensions import Self
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from os import PathLike
+from pathlib import Path
+import threading
+import os
+
+from utlx import public
+
+from ._chocolatey import Chocolatey, PackageInfo
+
+StrPath: TypeAlias = str | PathLike[str]
+Fingerprint: TypeAlias = tuple[int, int, int]
+
+
+@public
+@dataclass(slots=True)
+class InstalledDelta:
+    """Changes of the installed packages found by InstalledIndex.refresh()."""
+    added: list[PackageInfo] = field(default_factory=list)
+    removed: list[PackageInfo] = field(default_factory=list)
+    # (old, new) packages
+    changed: list[tuple[PackageInfo, PackageInfo]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Whether anything has changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+@public
+class InstalledIndex:
+    """Installed packages of a Chocolatey lib directory, refreshed incrementally.
+
+    Every package directory (lib/<id>) is fingerprinted by its (mtime, size,
+    inode). refresh() rescans the lib directory and re-reads the manifest
+    (.nuspec) only of the directories whose fingerprint has changed - choco
+    recreates the directory of a package on its install or upgrade. It
+    returns the added, removed and version-changed packages. The scan itself
+    is skipped while the fingerprint of the lib directory is unchanged (no
+    package directory added, removed or replaced).
+
+    Packages are looked up by id case-insensitively.
+    """
+
+    lib_dir: Path
+    _lib_fingerprint: Fingerprint | None
+    _entries: dict[str, tuple[Fingerprint, PackageInfo | None]]
+    _packages: dict[str, PackageInfo]
+    _lock: threading.Lock
+
+    def __new__(cls, install_root: StrPath | None = None) -> Self:
+        """Constructor
+
+        install_root is the Chocolatey installation directory
+        (%ChocolateyInstall% by default). The index is empty until
+        the first refresh().
+        """
+        self = super().__new__(cls)
+        self.lib_dir = (Path(install_root) if install_root is not None
+                        else Chocolatey._default_install_root())/"lib"
+        self._lib_fingerprint = None
+        self._entries  = {}
+        self._packages = {}
+        self._lock = threading.Lock()
+        return self
+
+    def refresh(self, *, full: bool = False) -> InstalledDelta:
+        """Rescans the lib directory and returns the changes since the last scan.
+
+        full=True rescans it even if its fingerprint is unchanged (to find
+        the packages changed in place, not by choco).
+        """
+        with self._lock:
+            delta = InstalledDelta()
+            try:
+                stat = os.stat(self.lib_dir)
+                lib_fingerprint: Fingerprint | None = (stat.st_mtime_ns, stat.st_size,
+                                                       stat.st_ino)
+            except FileNotFoundError:
+                lib_fingerprint = None
+            if (not full and lib_fingerprint is not None
+                    and lib_fingerprint == self._lib_fingerprint):
+                return delta
+            entries: dict[str, tuple[Fingerprint, PackageInfo | None]] = {}
+            try:
+                dir_entries = list(os.scandir(self.lib_dir))
+            except FileNotFoundError:
+                dir_entries = []
+            for dir_entry in dir_entries:
+                try:
+                    if not dir_entry.is_dir(): continue
+                    stat = dir_entry.stat()
+                    # not stat.st_ino, 0 on Windows (from the directory listing)
+                    inode = dir_entry.inode()
+                except OSError:  # pragma: no cover
+                    continue
+                fingerprint = (stat.st_mtime_ns, stat.st_size, inode)
+                entry = self._entries.get(dir_entry.name)
+                if entry is None or entry[0] != fingerprint:
+                    entry = (fingerprint, Chocolatey._lib_nuspec(Path(dir_entry.path)))
+                entries[dir_entry.name] = entry
+            self._lib_fingerprint = lib_fingerprint
+            if entries.keys() == self._entries.keys() and all(
+                    entry is self._entries[name] for name, entry in entries.items()):
+                return delta
+            packages = {pkg_info.id.casefold(): pkg_info
+                        for _, pkg_info in entries.values() if pkg_info is not None}
+            for key, pkg_info in packages.items():
+                old = self._packages.get(key)
+                if old is None:
+                    delta.added.append(pkg_info)
+                elif old.version != pkg_info.version:
+                    delta.changed.append((old, pkg_info))
+            delta.removed = [pkg_info for key, pkg_info in self._packages.items()
+                             if key not in packages]
+            for packages_list in (delta.added, delta.removed):
+                packages_list.sort(key=lambda pkg_info: pkg_info.id.casefold())
+            delta.changed.sort(key=lambda change: change[1].id.casefold())
+            self._entries  = entries
+            self._packages = dict(sorted(packages.items()))
+            return delta
+
+    def __len__(self) -> int:
+        """Number of installed packages."""
+        return len(self._packages)
+
+    def __contains__(self, pkg_id: object) -> bool:
+        """Whether the package of pkg_id (case-insensitively) is installed."""
+        return isinstance(pkg_id, str) and pkg_id.casefold() in self._packages
+
+    def __getitem__(self, pkg_id: str) -> PackageInfo:
+        """Installed package of pkg_id (case-insensitively); KeyError if none."""
+        return self._packages[pkg_id.casefold()]
+
+    def get(self, pkg_id: str, default: PackageInfo | None = None) -> PackageInfo | None:
+        """Installed package of pkg_id (case-insensitively) or default if none."""
+        return self._packages.get(pkg_id.casefold(), default)
+
+    def __iter__(self) -> Iterator[PackageInfo]:
+        """Installed packages, ordered by id."""
+        return iter(list(self._packages.values()))
@@ -0,0 +1,366 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Metrics of the Chocolatey calls and of the choco runs"""
+
+from typing import Any, TypeVar
+from typing_extensions import Self
+from collections.abc import Sequence
+import threading
+import bisect
+import math
+
+from utlx import public
+
+from ._trace import Span, TraceHook, add_hook, remove_hook
+
+_M = TypeVar("_M", bound="_Metric")
+
+
+class _Metric:
+    """A metric family with its samples by the values of its labels."""
+
+    type: str = ""  # noqa: A003
+
+    name: str
+    help: str  # noqa: A003
+    labels: tuple[str, ...]
+    _values: dict[tuple[str, ...], Any]  # float, or of a Histogram [counts, sum]
+    _lock: threading.Lock
+
+    def __new__(cls, name: str, help: str = "",  # noqa: A002
+                labels: Sequence[str] = ()) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.name   = name
+        self.help   = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        return self
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"Labels of {self.name} are {list(self.labels)}, "
+                             f"not {list(labels)}")
+        return tuple("" if labels[label] is None else str(labels[label])
+                     for label in self.labels)
+
+    def _samples(self) -> list[tuple[dict[str, str], Any]]:
+        with self._lock:
+            return [(dict(zip(self.labels, key)), self._copy(value))
+                    for key, value in sorted(self._values.items())]
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+
+@public
+class Counter(_Metric):
+    """A monotonically increasing count (rendered as name_total)."""
+
+    type = "counter"  # noqa: A003
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increases the count of the labels by amount (>= 0)."""
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """The count of the labels."""
+        key = self._key(labels)
+        with self._lock:
+            value: float = self._values.get(key, 0)
+        return value
+
+
+@public
+class Gauge(_Metric):
+    """A value going up and down."""
+
+    type = "gauge"  # noqa: A003
+
+    def set(self, value: float, **labels: Any) -> None:  # noqa: A003
+        """Sets the value of the labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increases the value of the labels by amount."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        """Decreases the value of the labels by amount."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        """The value of the labels."""
+        key = self._key(labels)
+        with self._lock:
+            value: float = self._values.get(key, 0)
+        return value
+
+
+@public
+class Histogram(_Metric):
+    """Counts of the observed values in buckets, their count and sum.
+
+    buckets are the upper bounds (inclusive), +Inf is added.
+    """
+
+    type = "histogram"  # noqa: A003
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                       30.0, 60.0, 120.0, 300.0, 600.0)
+
+    buckets: tuple[float, ...]
+
+    def __new__(cls, name: str, help: str = "",  # noqa: A002
+                labels: Sequence[str] = (),
+                buckets: Sequence[float] = DEFAULT_BUCKETS) -> Self:
+        """Constructor"""
+        self = super().__new__(cls, name, help, labels)
+        bounds = {float(bound) for bound in buckets} - {math.inf}
+        self.buckets = (*sorted(bounds), math.inf)
+        return self
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Adds value to the histogram of the labels."""
+        key = self._key(labels)
+        with self._lock:
+            # [counts of the buckets (not cumulative), sum]
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * len(self.buckets), 0.0]
+            counts[0][bisect.bisect_left(self.buckets, value)] += 1
+            counts[1] += value
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return [list(value[0]), value[1]]
+
+
+@public
+class MetricsRegistry:
+    """Named metrics, rendered together.
+
+    The metrics are thread-safe. render() gives the OpenMetrics text
+    exposition of all of them, snapshot() - a dict of their values.
+    """
+
+    _metrics: dict[str, _Metric]
+    _lock: threading.Lock
+
+    def __new__(cls) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self._metrics = {}
+        self._lock = threading.Lock()
+        return self
+
+    def counter(self, name: str, help: str = "",  # noqa: A002
+                labels: Sequence[str] = ()) -> Counter:
+        """Registers a Counter (or returns the one of name)."""
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "",  # noqa: A002
+              labels: Sequence[str] = ()) -> Gauge:
+        """Registers a Gauge (or returns the one of name)."""
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = "",  # noqa: A002
+                  labels: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        """Registers a Histogram (or returns the one of name)."""
+        return self._register(Histogram, name, help, labels, buckets)
+
+    def __getitem__(self, name: str) -> Any:
+        return self._metrics[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._metrics
+
+    def render(self) -> str:
+        """The metrics in the OpenMetrics text format."""
+        lines: list[str] = []
+        for metric in self._sorted():
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            for labels, value in metric._samples():
+                if isinstance(metric, Histogram):
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, counts):
+                        cumulative += count
+                        lines.append(_sample(f"{metric.name}_bucket",
+                                             {**labels, "le": _number(bound)}, cumulative))
+                    lines.append(_sample(f"{metric.name}_count", labels, cumulative))
+                    lines.append(_sample(f"{metric.name}_sum", labels, total))
+                elif isinstance(metric, Counter):
+                    lines.append(_sample(f"{metric.name}_total", labels, value))
+                else:
+                    lines.append(_sample(metric.name, labels, value))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """The metrics as a dict: {name: {"type", "help", "samples": [...]}}.
+
+        A sample is {"labels": {...}, "value": value}, of a histogram -
+        {"labels": {...}, "buckets": {upper bound: cumulative count},
+        "count": count, "sum": sum}.
+        """
+        snapshot: dict[str, Any] = {}
+        for metric in self._sorted():
+            samples: list[dict[str, Any]] = []
+            for labels, value in metric._samples():
+                if isinstance(metric, Histogram):
+                    counts, total = value
+                    cumulative = [sum(counts[:idx + 1]) for idx in range(len(counts))]
+                    samples.append(dict(labels=labels,
+                                        buckets=dict(zip(metric.buckets, cumulative)),
+                                        count=cumulative[-1], sum=total))
+                else:
+                    samples.append(dict(labels=labels, value=value))
+            snapshot[metric.name] = dict(type=metric.type, help=metric.help,
+                                         samples=samples)
+        return snapshot
+
+    def _register(self, klass: type[_M], name: str, help: str,  # noqa: A002
+                  labels: Sequence[str], *args: Any) -> _M:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = klass(name, help, labels, *args)
+            elif type(metric) is not klass or metric.labels != tuple(labels):
+                raise ValueError(f"Metric {name} is registered as another "
+                                 f"{metric.type} or with other labels")
+            return metric
+
+    def _sorted(self) -> list[_Metric]:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value): return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value): return "NaN"
+    return repr(value)
+
+
+def _sample(name: str, labels: dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_number(value)}"
+    label_text = ",".join(f'{label}="{_escape(label_value)}"'
+                          for label, label_value in labels.items())
+    return f"{name}{{{label_text}}} {_number(value)}"
+
+
+@public
+class ChocolateyMetrics(TraceHook):
+    """Metrics of the Chocolatey calls and the choco runs, taken from their spans.
+
+    choco_command_duration_seconds - histogram of the runs of choco by
+        command (e.g. "search") and source ("" if not given),
+    choco_processes_started_total - counter of the runs by command,
+    choco_elevated_launches_total - counter of the runs through the
+        launcher or the broker, by command,
+    choco_commands_in_flight - gauge of the runs not ended yet, by command,
+    chocolatey_cache_hits_total / chocolatey_cache_misses_total - counters
+        of the lookups of the query caches by method and cache ("memory"
+        or "persistent"; a stale result counts as a hit),
+    chocolatey_parse_failures_total - counter of the choco outputs failed
+        to be parsed, by method.
+
+    Collects once added as a hook (add_hook(), or by the with statement).
+    """
+
+    registry: MetricsRegistry
+    _duration: Histogram
+    _started: Counter
+    _elevated: Counter
+    _in_flight: Gauge
+    _cache_hits: Counter
+    _cache_misses: Counter
+    _parse_failures: Counter
+
+    def __new__(cls, registry: MetricsRegistry | None = None, *,
+                buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.registry = registry = MetricsRegistry() if registry is None else registry
+        self._duration = registry.histogram("choco_command_duration_seconds",
+                                            "Duration of the runs of choco.",
+                                            ("command", "source"), buckets)
+        self._started  = registry.counter("choco_processes_started",
+                                          "Runs of choco started.", ("command",))
+        self._elevated = registry.counter("choco_elevated_launches",
+                                          "Runs of choco through the launcher or the broker.",
+                                          ("command",))
+        self._in_flight = registry.gauge("choco_commands_in_flight",
+                                         "Runs of choco not ended yet.", ("command",))
+        self._cache_hits = registry.counter("chocolatey_cache_hits",
+                                            "Lookups of the query caches found.",
+                                            ("method", "cache"))
+        self._cache_misses = registry.counter("chocolatey_cache_misses",
+                                              "Lookups of the query caches not found.",
+                                              ("method", "cache"))
+        self._parse_failures = registry.counter("chocolatey_parse_failures",
+                                                "Outputs of choco failed to be parsed.",
+                                                ("method",))
+        return self
+
+    def on_start(self, span: Span) -> None:
+        if span.kind != "command": return
+        self._started.inc(command=span.name)
+        if span.attributes.get("elevated"):
+            self._elevated.inc(command=span.name)
+        self._in_flight.inc(command=span.name)
+
+    def on_end(self, span: Span) -> None:
+        attributes = span.attributes
+        if span.kind == "command":
+            self._in_flight.dec(command=span.name)
+            self._duration.observe(span.duration or 0.0,
+                                   command=span.name, source=attributes.get("source"))
+            return
+        for cache in ("memory", "persistent"):
+            outcome = attributes.get(f"{cache}_cache")
+            if outcome is not None:
+                counter = self._cache_misses if outcome == "miss" else self._cache_hits
+                counter.inc(method=span.name, cache=cache)
+        if "parse_error" in attributes:
+            self._parse_failures.inc(method=span.name)
+
+    def render(self) -> str:
+        """The metrics in the OpenMetrics text format (see MetricsRegistry)."""
+        return self.registry.render()
+
+    def snapshot(self) -> dict[str, Any]:
+        """The metrics as a dict (see MetricsRegistry)."""
+        return self.registry.snapshot()
+
+    def close(self) -> None:
+        """Stops collecting."""
+        remove_hook(self)
+
+    def __enter__(self) -> Self:
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,247 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Index of the packages (.nupkg files) of a local folder source"""
+
+from typing import TypeAlias, Any
+from typing_extensions import Self
+from collections.abc import Iterator
+from contextlib import closing
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+import threading
+import os
+import json
+import hashlib
+import sqlite3
+import zipfile
+
+from utlx import public
+
+from ._chocolatey import Chocolatey, Package, PackageInfo
+from ._cache import PersistentCache
+from ._nuspec import _read_nuspec
+from ._table import version_key
+
+StrPath: TypeAlias = str | PathLike[str]
+
+
+@public
+@dataclass(slots=True)
+class NupkgEntry:
+    """A package file of a NupkgIndex."""
+    path: Path
+    mtime_ns: int
+    size: int
+    sha256: str
+    info: PackageInfo | None  # None if it is not a valid package
+
+
+def _read_nupkg(path: Path) -> dict[str, Any] | None:
+    """Metadata of the manifest of a .nupkg (None if it is not a valid package).
+
+    Only the .nuspec entry (in the root of the ZIP archive) is read, found
+    by the central directory of the archive.
+    """
+    try:
+        with zipfile.ZipFile(path) as nupkg:
+            name = next((name for name in nupkg.namelist()
+                         if "/" not in name and name.lower().endswith(".nuspec")), None)
+            if name is None:
+                return None
+            with nupkg.open(name) as nuspec:
+                return _read_nuspec(nuspec)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while block := file.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@public
+class NupkgIndex:
+    """Index of the packages of a folder source, queried in memory.
+
+    refresh() scans the folder (and its subdirectories) for .nupkg files
+    and reads the manifest only of the files added or changed (by their
+    mtime and size) since the last scan, also by other processes - the
+    index is kept in a SQLite database (path, by default next to the
+    queries of PersistentCache). search() and info() answer as the
+    choco commands for the folder as a source.
+
+    Packages are looked up by id case-insensitively.
+    """
+
+    DEFAULT_PATH = PersistentCache.DEFAULT_PATH.parent/"nupkg-index.sqlite"
+
+    folder: Path
+    path: Path
+    _entries: dict[str, NupkgEntry] | None
+    # casefolded id: [(info, entry)] ordered by version
+    _packages: dict[str, list[tuple[PackageInfo, NupkgEntry]]]
+    _lock: threading.Lock
+
+    def __new__(cls, folder: StrPath, *, path: StrPath | None = None) -> Self:
+        """Constructor
+
+        The index is empty until the first refresh().
+        """
+        self = super().__new__(cls)
+        self.folder = Path(folder).resolve()
+        self.path = Path(path) if path is not None else cls.DEFAULT_PATH
+        self._entries  = None
+        self._packages = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS nupkgs ("
+                       "folder TEXT NOT NULL, path TEXT NOT NULL, "
+                       "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+                       "sha256 TEXT NOT NULL, metadata TEXT, "
+                       "PRIMARY KEY (folder, path))")
+        return self
+
+    def refresh(self) -> int:
+        """Rescans the folder; returns the number of the (re)read package files."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            entries: dict[str, NupkgEntry] = {}
+            changed: dict[str, tuple[NupkgEntry, dict[str, Any] | None]] = {}
+            for rel_path, dir_entry in self._scan():
+                try:
+                    stat = dir_entry.stat()
+                except OSError:  # pragma: no cover
+                    continue
+                entry = self._entries.get(rel_path)
+                if (entry is None or entry.mtime_ns != stat.st_mtime_ns
+                        or entry.size != stat.st_size):
+                    path = Path(dir_entry.path)
+                    try:
+                        sha256 = _sha256(path)
+                    except OSError:  # pragma: no cover
+                        continue
+                    metadata = _read_nupkg(path)
+                    entry = NupkgEntry(path, stat.st_mtime_ns, stat.st_size, sha256,
+                                       None if metadata is None
+                                       else Chocolatey._nuspec_info(metadata))
+                    changed[rel_path] = (entry, metadata)
+                entries[rel_path] = entry
+            removed = self._entries.keys() - entries.keys()
+            if changed or removed:
+                self._store(changed, removed)
+            self._set_entries(entries)
+            return len(changed)
+
+    def search(self, filter: str = "", *,  # noqa: A002
+               exact: bool = False, all_versions: bool = False,
+               prerelease: bool = False) -> dict[str, list[Package]]:
+        """Packages whose ids, titles or tags contain filter (case-insensitively).
+
+        exact=True matches the ids only, exactly. The latest version of
+        every package, or all_versions, ordered by id and version. The
+        prerelease versions are included only with prerelease=True.
+        """
+        pkg_filter = filter.casefold()
+        found: dict[str, list[Package]] = {}
+        for key, pkg_entries in self._packages.items():
+            infos = [info for info, _ in pkg_entries
+                     if prerelease or "-" not in info.version]
+            if not infos: continue
+            latest = infos[-1]
+            if exact:
+                if key != pkg_filter: continue
+            elif pkg_filter and not (pkg_filter in key
+                                     or pkg_filter in latest.title.casefold()
+                                     or any(pkg_filter in tag.casefold()
+                                            for tag in latest.tags)):
+                continue
+            found[latest.id] = [Package(info.id, info.version)
+                                for info in (infos if all_versions else [latest])]
+        return found
+
+    def info(self, pkg_id: str, version: str | None = None, *,
+             prerelease: bool = False) -> PackageInfo | None:
+        """Package of pkg_id in the version (the latest by default), or None."""
+        entry = self.find(pkg_id, version, prerelease=prerelease)
+        return None if entry is None else entry.info
+
+    def find(self, pkg_id: str, version: str | None = None, *,
+             prerelease: bool = False) -> NupkgEntry | None:
+        """Package file of pkg_id in the version (the latest by default), or None."""
+        pkg_entries = self._packages.get(pkg_id.casefold(), [])
+        if version is not None:
+            key = version_key(version)
+            return next((entry for info, entry in reversed(pkg_entries)
+                         if version_key(info.version) == key), None)
+        return next((entry for info, entry in reversed(pkg_entries)
+                     if prerelease or "-" not in info.version), None)
+
+    def __len__(self) -> int:
+        """Number of the packages (ids)."""
+        return len(self._packages)
+
+    def __contains__(self, pkg_id: object) -> bool:
+        """Whether there is a package of pkg_id (case-insensitively)."""
+        return isinstance(pkg_id, str) and pkg_id.casefold() in self._packages
+
+    def __iter__(self) -> Iterator[PackageInfo]:
+        """All versions of the packages, ordered by id and version."""
+        return iter([info for pkg_entries in self._packages.values()
+                     for info, _ in pkg_entries])
+
+    # ----- internals ----- #
+
+    def _scan(self, prefix: str = "") -> Iterator[tuple[str, os.DirEntry[str]]]:
+        # (path relative to folder, dir entry) of the .nupkg files.
+        try:
+            dir_entries = list(os.scandir(self.folder/prefix))
+        except OSError:
+            return
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir():
+                yield from self._scan(f"{prefix}{dir_entry.name}/")
+            elif dir_entry.name.lower().endswith(".nupkg"):
+                yield f"{prefix}{dir_entry.name}", dir_entry
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    def _load(self) -> dict[str, NupkgEntry]:
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT path, mtime_ns, size, sha256, metadata "
+                              "FROM nupkgs WHERE folder = ?", (str(self.folder),)).fetchall()
+        return {rel_path: NupkgEntry(self.folder/rel_path, mtime_ns, size, sha256,
+                                     None if metadata is None
+                                     else Chocolatey._nuspec_info(json.loads(metadata)))
+                for rel_path, mtime_ns, size, sha256, metadata in rows}
+
+    def _store(self, changed: dict[str, tuple[NupkgEntry, dict[str, Any] | None]],
+               removed: set[str]) -> None:
+        folder = str(self.folder)
+        with closing(self._connect()) as db, db:
+            db.executemany("DELETE FROM nupkgs WHERE folder = ? AND path = ?",
+                           [(folder, rel_path) for rel_path in removed])
+            db.executemany("INSERT OR REPLACE INTO nupkgs VALUES (?, ?, ?, ?, ?, ?)",
+                           [(folder, rel_path, entry.mtime_ns, entry.size, entry.sha256,
+                             None if metadata is None else json.dumps(metadata))
+                            for rel_path, (entry, metadata) in changed.items()])
+
+    def _set_entries(self, entries: dict[str, NupkgEntry]) -> None:
+        packages: dict[str, list[tuple[PackageInfo, NupkgEntry]]] = {}
+        for entry in entries.values():
+            if entry.info is not None:
+                packages.setdefault(entry.info.id.casefold(), []).append((entry.info, entry))
+        for pkg_entries in packages.values():
+            pkg_entries.sort(key=lambda item: version_key(item[0].version))
+        self._entries  = entries
+        self._packages = dict(sorted(packages.items()))
@@ -0,0 +1,51 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Package manifest (.nuspec) reader"""
+
+from typing import Any, IO
+from os import PathLike
+import xml.etree.ElementTree as ET
+
+_TEXT_ELEMENTS = ("id", "version", "title", "summary", "description", "tags",
+                  "projectUrl", "licenseUrl", "packageSourceUrl")
+
+
+def _read_nuspec(source: str | PathLike[str] | IO[bytes]) -> dict[str, Any]:
+    """Metadata of a .nuspec (a path or a binary file).
+
+    Returns the texts of the _TEXT_ELEMENTS found ("" for the missing ones)
+    and "dependencies" - the dependency ids mapped to their version ranges.
+    Raises ValueError if it is not a package manifest.
+    """
+    try:
+        root = ET.parse(source).getroot()
+    except ET.ParseError as exc:
+        raise ValueError(f"Invalid package manifest: {exc}") from None
+    if _local_name(root.tag) != "package":
+        raise ValueError("Invalid package manifest: no <package> root element")
+    metadata: dict[str, Any] = dict.fromkeys(_TEXT_ELEMENTS, "")
+    dependencies: dict[str, str] = {}
+    for element in root:
+        if _local_name(element.tag) != "metadata": continue
+        for item in element:
+            name = _local_name(item.tag)
+            if name in metadata:
+                metadata[name] = (item.text or "").strip()
+            elif name == "dependencies":
+                # <dependency>-ies, possibly in (target framework) <group>-s.
+                for dependency in item.iter():
+                    if _local_name(dependency.tag) == "dependency" and "id" in dependency.attrib:
+                        dependencies[dependency.attrib["id"]] = \
+                            dependency.attrib.get("version", "")
+    if not metadata["id"] or not metadata["version"]:
+        raise ValueError("Invalid package manifest: no package id or version")
+    metadata["dependencies"] = dependencies
+    return metadata
+
+
+def _local_name(tag: str) -> str:
+    # The tag without its {namespace}.
+    return tag.rpartition("}")[2]
@@ -0,0 +1,190 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Columnar container of Chocolatey packages"""
+
+from typing import Any, TextIO
+from typing_extensions import Self
+from collections.abc import Callable, Iterator, Sequence
+from itertools import compress
+import operator
+import json
+import csv
+import io
+
+from utlx import public
+
+_VERSION_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "<":  operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    ">":  operator.gt,
+}
+
+
+@public
+class PackageTable:
+    """Packages (as returned by installed(), search() and outdated()) in columns.
+
+    The fields of the packages (id, version and the fields of their class)
+    are kept in parallel lists. Ids are indexed case-insensitively, so
+    `pkg_id in table` and `table[pkg_id]` (the packages of the id, all of
+    its versions) cost O(1). The filters return new tables; the rows are
+    exported as tuples, packages, JSON Lines or CSV.
+
+    truncated is True if the search was stopped by its limit or deadline
+    before reaching the end of the results.
+    """
+
+    klass: type
+    columns: dict[str, list[Any]]
+    truncated: bool = False
+    _index: dict[str, list[int]]
+
+    def __new__(cls, klass: type, columns: dict[str, list[Any]]) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self.klass   = klass
+        self.columns = columns
+        self._index  = {}
+        for row, pkg_id in enumerate(columns["id"]):
+            self._index.setdefault(pkg_id.casefold(), []).append(row)
+        return self
+
+    def __len__(self) -> int:
+        """Number of packages (rows)."""
+        return len(self.columns["id"])
+
+    def __contains__(self, pkg_id: object) -> bool:
+        """Whether there is a package of pkg_id (case-insensitively)."""
+        return isinstance(pkg_id, str) and pkg_id.casefold() in self._index
+
+    def __getitem__(self, pkg_id: str) -> list[Any]:
+        """Packages of pkg_id (case-insensitively); KeyError if none."""
+        return [self._package(row) for row in self._index[pkg_id.casefold()]]
+
+    def get(self, pkg_id: str, default: Any = None) -> Any:
+        """Packages of pkg_id (case-insensitively) or default if none."""
+        return self[pkg_id] if pkg_id in self else default
+
+    def __iter__(self) -> Iterator[Any]:
+        """Packages in row order."""
+        return map(self._package, range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackageTable):
+            return NotImplemented
+        return (self.klass is other.klass and self.columns == other.columns
+                and self.truncated == other.truncated)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.klass.__name__}, {len(self)} packages)"
+
+    @property
+    def ids(self) -> list[str]:
+        """Package ids column."""
+        return self.columns["id"]
+
+    @property
+    def versions(self) -> list[str]:
+        """Package versions column."""
+        return self.columns["version"]
+
+    # Filters
+
+    def startswith(self, prefix: str) -> PackageTable:
+        """Packages whose id starts with prefix (case-insensitively)."""
+        prefix = prefix.casefold()
+        return self._select([pkg_id.casefold().startswith(prefix)
+                             for pkg_id in self.columns["id"]])
+
+    def where(self, column: str, predicate: Callable[[Any], bool]) -> PackageTable:
+        """Packages whose value of column satisfies predicate."""
+        return self._select([bool(predicate(value)) for value in self.columns[column]])
+
+    def where_version(self, op: str, version: str, *,
+                      column: str = "version") -> PackageTable:
+        """Packages whose version (or other version column) compares to version.
+
+        op is one of <, <=, ==, !=, >=, >; versions are compared as NuGet
+        versions (numerically, a prerelease before its release).
+        """
+        compare = _VERSION_OPERATORS[op]
+        key = version_key(version)
+        return self._select([value is not None and compare(version_key(value), key)
+                             for value in self.columns[column]])
+
+    # Export
+
+    def rows(self) -> list[tuple[Any, ...]]:
+        """Rows as tuples of the column values."""
+        return list(zip(*self.columns.values()))
+
+    def packages(self) -> list[Any]:
+        """Rows as packages."""
+        return list(self)
+
+    def to_jsonl(self, file: TextIO | None = None) -> str | None:
+        """Rows as JSON Lines (objects), written to file if given."""
+        names = list(self.columns)
+        lines = (json.dumps(dict(zip(names, row))) + "\n" for row in self.rows())
+        if file is None:
+            return "".join(lines)
+        file.writelines(lines)
+        return None
+
+    def to_csv(self, file: TextIO | None = None) -> str | None:
+        """Rows as CSV (with a header row), written to file if given."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer if file is None else file, lineterminator="\n")
+        writer.writerow(self.columns)
+        writer.writerows(self.rows())
+        return buffer.getvalue() if file is None else None
+
+    # ----- internals ----- #
+
+    def _package(self, row: int) -> Any:
+        return self.klass(*(column[row] for column in self.columns.values()))
+
+    def _select(self, mask: Sequence[bool]) -> PackageTable:
+        table = type(self)(self.klass, {name: list(compress(column, mask))
+                                        for name, column in self.columns.items()})
+        table.truncated = self.truncated
+        return table
+
+
+@public
+def version_key(version: str) -> tuple[Any, ...]:
+    """Sort key of a NuGet (Chocolatey) package version.
+
+    Release parts compare numerically (missing ones as 0), a prerelease
+    sorts before its release, build metadata is ignored.
+    """
+    version, _, _ = version.partition("+")
+    release, sep, prerelease = version.partition("-")
+    parts = [int(part) if part.isdigit() else 0 for part in release.split(".")]
+    parts[len(parts):] = (4 - len(parts)) * [0]
+    if not sep:
+        return (*parts, 1)
+    labels = tuple((0, int(label), "") if label.isdigit() else (1, 0, label.casefold())
+                   for label in prerelease.split("."))
+    return (*parts, 0, labels)
+
+
+def _normalized_version(version: str) -> str:
+    # The version as choco (v2, NuGet) prints it: the release parts without
+    # leading zeros, at least three of them, the fourth only if not 0, and
+    # no build metadata, e.g. "24.09" -> "24.9.0". Kept if not a version.
+    version, _, _ = version.strip().partition("+")
+    release, sep, prerelease = version.partition("-")
+    parts = release.split(".")
+    if not 1 <= len(parts) <= 4 or not all(part.isdigit() for part in parts):
+        return version
+    numbers = [int(part) for part in parts]
+    numbers[len(numbers):] = (3 - len(numbers)) * [0]
+    if len(numbers) == 4 and numbers[3] == 0: del numbers[3]
+    return ".".join(map(str, numbers)) + sep + prerelease
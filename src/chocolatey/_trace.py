@@ -0,0 +1,325 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+from __future__ import annotations
+
+"""Tracing of the Chocolatey calls and of the choco runs"""
+
+from typing import Any, TypeVar, IO
+from typing_extensions import Self
+from collections.abc import Callable, Iterator, Awaitable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from os import PathLike
+import inspect
+import itertools
+import threading
+import warnings
+import time
+import json
+
+from utlx import public
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@public
+@dataclass(slots=True)
+class Span:
+    """A traced call of a Chocolatey method ("call") or run of choco ("command").
+
+    The attributes of a command: argv, elevated (run through the launcher
+    or the broker), source, and once ended returncode, stdout_bytes and
+    stderr_bytes (None if not captured). A span ended by an exception has
+    its type name as the error attribute.
+    """
+    name: str  # e.g. "Chocolatey.search" or the choco command, e.g. "search"
+    kind: str  # "call" or "command"
+    span_id: int
+    parent_id: int | None  # None for the root span of a trace
+    trace_id: int          # span_id of the root span
+    start_time: float      # time.time()
+    duration: float | None = None  # seconds, None until ended
+    attributes: dict[str, Any] = field(default_factory=dict)
+    _start: float = field(default=0.0, repr=False, compare=False)  # perf_counter()
+    _claimed: bool = field(default=False, repr=False, compare=False)
+
+
+@public
+class TraceHook:
+    """Receives the start and the end of every span (see add_hook()).
+
+    Called in the thread running the call or the command; an exception
+    of a hook is turned into a RuntimeWarning.
+    """
+
+    def on_start(self, span: Span) -> None:
+        """A span has started."""
+
+    def on_end(self, span: Span) -> None:
+        """A span has ended (duration and the results are set)."""
+
+
+_hooks: tuple[TraceHook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+@public
+def add_hook(hook: TraceHook) -> None:
+    """Starts passing the spans of all Chocolatey instances to hook."""
+    global _hooks
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks = (*_hooks, hook)
+
+
+@public
+def remove_hook(hook: TraceHook) -> None:
+    """Stops passing the spans to hook."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(item for item in _hooks if item is not hook)
+
+
+@public
+class JsonLinesExporter(TraceHook):
+    """Writes the ended spans to a file, one JSON object per line.
+
+    file is a path (appended to) or a text file object. Usable as
+    a context manager: added as a hook on entry, removed and closed
+    on exit.
+    """
+
+    _file: IO[str]
+    _owned: bool
+    _lock: threading.Lock
+
+    def __new__(cls, file: str | PathLike[str] | IO[str]) -> Self:
+        """Constructor"""
+        self = super().__new__(cls)
+        self._owned = isinstance(file, (str, PathLike))
+        self._file  = (open(file, "a", encoding="utf-8")
+                       if isinstance(file, (str, PathLike)) else file)
+        self._lock = threading.Lock()
+        return self
+
+    def on_end(self, span: Span) -> None:
+        record = asdict(span)
+        del record["_start"], record["_claimed"]
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Stops the export; closes the file if opened by the exporter."""
+        remove_hook(self)
+        if self._owned:
+            with self._lock:
+                self._file.close()
+
+    def __enter__(self) -> Self:
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+# The span of the current Chocolatey call, parent of the spans started.
+_current: ContextVar[Span | None] = ContextVar("_current", default=None)
+# The command span being started, to be ended by its ChocolateyProcess.
+_pending: ContextVar[Span | None] = ContextVar("_pending", default=None)
+_untraced_calls: ContextVar[bool] = ContextVar("_untraced_calls", default=False)
+_span_ids = itertools.count(1)
+
+
+def _start(name: str, kind: str, **attributes: Any) -> Span:
+    parent = _current.get()
+    span_id = next(_span_ids)
+    span = Span(name, kind, span_id,
+                None if parent is None else parent.span_id,
+                span_id if parent is None else parent.trace_id,
+                time.time(), attributes=attributes, _start=time.perf_counter())
+    _notify("on_start", span)
+    return span
+
+
+def _end(span: Span, exc: BaseException | None = None, **attributes: Any) -> None:
+    if span.duration is not None: return
+    span.duration = time.perf_counter() - span._start
+    span.attributes.update(attributes)
+    if exc is not None and not isinstance(exc, GeneratorExit):
+        span.attributes["error"] = type(exc).__name__
+        returncode = getattr(exc, "returncode", None)
+        if returncode is not None:
+            span.attributes["returncode"] = returncode
+    _notify("on_end", span)
+
+
+def _notify(event: str, span: Span) -> None:
+    for hook in _hooks:
+        try:
+            getattr(hook, event)(span)
+        except Exception as exc:
+            warnings.warn(f"Trace hook {hook!r} has failed: {exc!r}",
+                          RuntimeWarning, stacklevel=2)
+
+
+def _nbytes(output: Any) -> int | None:
+    if isinstance(output, str): return len(output.encode("utf-8", "surrogateescape"))
+    return None if output is None else len(output)
+
+
+def _outputs(result: Any) -> dict[str, Any]:
+    # The results of a command span from its run.CompletedProcess.
+    return dict(returncode=result.returncode,
+                stdout_bytes=_nbytes(result.stdout),
+                stderr_bytes=_nbytes(result.stderr))
+
+
+def _command(name: str, run_fun: Callable[..., Any], args: list[Any],
+             kwargs: dict[str, Any], *, elevated: bool, source: str | None) -> Any:
+    """Runs run_fun(*args, **kwargs), a choco run, in a command span.
+
+    A run not waited for (a ChocolateyProcess) ends its span itself, an
+    asyncio run - once awaited.
+    """
+    if not _hooks:
+        return run_fun(*args, **kwargs)
+    span = _start(name, "command", argv=[str(arg) for arg in args],
+                  elevated=elevated, source=source)
+    token = _pending.set(span)
+    try:
+        result = run_fun(*args, **kwargs)
+    except BaseException as exc:
+        _end(span, exc)
+        raise
+    finally:
+        _pending.reset(token)
+    if span._claimed:
+        return result
+    if inspect.isawaitable(result):
+        return _awaited(span, result)
+    _end(span, **_outputs(result))
+    return result
+
+
+async def _awaited(span: Span, awaitable: Awaitable[Any]) -> Any:
+    try:
+        result = await awaitable
+    except BaseException as exc:
+        _end(span, exc)
+        raise
+    _end(span, **_outputs(result))
+    return result
+
+
+def _claim() -> Span | None:
+    """Takes over the command span being started (by a ChocolateyProcess)."""
+    span = _pending.get()
+    if span is not None:
+        span._claimed = True
+        _pending.set(None)
+    return span
+
+
+def _annotate(**attributes: Any) -> None:
+    """Sets attributes of the span of the current call (if traced)."""
+    span = _current.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def _parser(method: _F) -> _F:
+    """Marks the span of the current call by the failure of an output parser."""
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return method(*args, **kwargs)
+        except Exception as exc:
+            _annotate(parse_error=type(exc).__name__)
+            raise
+    return wrapper  # type: ignore[return-value]
+
+
+@contextmanager
+def _untraced() -> Iterator[None]:
+    """The Chocolatey calls in the block open no spans (e.g. recorded ones)."""
+    token = _untraced_calls.set(True)
+    try:
+        yield
+    finally:
+        _untraced_calls.reset(token)
+
+
+def _traced(method: _F) -> _F:
+    """Runs a Chocolatey method (function, generator or coroutine) in a call span."""
+    name = method.__qualname__
+
+    def start() -> Span | None:
+        if not _hooks or _untraced_calls.get(): return None
+        return _start(name, "call")
+
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+            span = start()
+            if span is None:
+                return (yield from method(*args, **kwargs))
+            items = method(*args, **kwargs)
+            try:
+                while True:
+                    # The span is current only while the method runs.
+                    token = _current.set(span)
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        break
+                    finally:
+                        _current.reset(token)
+                    yield item
+            except BaseException as exc:
+                _end(span, exc)
+                raise
+            finally:
+                items.close()
+            _end(span)
+        return gen_wrapper  # type: ignore[return-value]
+
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            span = start()
+            if span is None:
+                return await method(*args, **kwargs)
+            token = _current.set(span)
+            try:
+                result = await method(*args, **kwargs)
+            except BaseException as exc:
+                _end(span, exc)
+                raise
+            finally:
+                _current.reset(token)
+            _end(span)
+            return result
+        return async_wrapper  # type: ignore[return-value]
+
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        span = start()
+        if span is None:
+            return method(*args, **kwargs)
+        token = _current.set(span)
+        try:
+            result = method(*args, **kwargs)
+        except BaseException as exc:
+            _end(span, exc)
+            raise
+        finally:
+            _current.reset(token)
+        _end(span)
+        return result
+    return wrapper  # type: ignore[return-value]
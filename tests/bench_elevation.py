@@ -0,0 +1,49 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of the dispatch of the commands requiring elevation.
+
+Compares resolving ChocolateyCmd._cmd_elevated with the elevation probed
+on every call (as before) and once per instance. On Windows the real probe
+(ChocolateyCmd._in_elevated) is used; elsewhere a stand-in doing the same
+imports and a ctypes call.
+
+Run as: python -m tests.bench_elevation [calls]
+"""
+
+import sys
+import timeit
+
+from chocolatey import ChocolateyCmd
+
+
+def probe_stand_in(self):
+    """Imports (as the real probe does) and a ctypes call."""
+    import sys  # noqa: F401,F811
+    from ctypes import byref, sizeof, c_ulong
+    value = c_ulong()
+    byref(value)
+    return sizeof(value) > 0
+
+
+class LegacyChocolateyCmd(ChocolateyCmd):
+    """ChocolateyCmd probing the elevation on every elevated call."""
+
+    @property
+    def _cmd_elevated(self):
+        return self._cmd if self._in_elevated else self._cmd_launched
+
+
+def main(argv=sys.argv[1:]):
+    calls = int(argv[0]) if argv else 10000
+    if sys.platform != "win32":
+        ChocolateyCmd._in_elevated = property(probe_stand_in)
+    for klass in (LegacyChocolateyCmd, ChocolateyCmd):
+        choco_cmd = klass()
+        seconds = min(timeit.repeat(lambda: choco_cmd._cmd_elevated,
+                                    number=calls, repeat=3)) / calls
+        print(f"{klass.__name__:>20}: {seconds * 1e6:8.3f} us per dispatch")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
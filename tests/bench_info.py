@@ -0,0 +1,117 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of Chocolatey._info() against the former regex-based parser.
+
+Run as: python -m tests.bench_info [description lines ...]
+"""
+
+import sys
+import timeit
+import tracemalloc
+import textwrap
+
+import regex as re
+from nocasedict import NocaseDict
+
+from chocolatey import Chocolatey, PackageInfo
+
+
+def legacy_info(out, pkg_info):
+    """The regex-based Chocolatey._info() of py-chocolatey 0.10.0."""
+    if not out.strip() or pkg_info is None:
+        return None
+
+    out = out.replace("\r\n", "\n").replace("\r", "\n")
+
+    # pre-parse
+    out = re.sub(r"[\t ]*\|", "\n", out)
+    out = re.sub(r"\n[\t ]*Package url[\t ]*\n", "\n Package url: n/a\n", out)
+    # parse
+    info_header_pattern = r"\s*Chocolatey[\t ]+v.+?([\t ]*\n)+" + \
+                          rf"\s*{pkg_info.id}[\t ]+{pkg_info.version}([\t ]+\[\w+\])?" + \
+                          r"([\t ]*\n)+"
+    info_pattern        = r"(?P<info>(.*\n)*)"
+    info_footer_pattern = r"\n(?P<pkgs_found>\d+)" + \
+                          r"[\t ]+packages[\t ]+(found|installed)[\t ]*\.([\t ]*\n)*"
+    match = re.match(info_header_pattern
+                     + info_pattern
+                     + info_footer_pattern, out)
+    if not match: return pkg_info
+    info_text = textwrap.dedent(match.captures("info")[0])
+    if not info_text.endswith("\n"): info_text += "\n"
+
+    info_key_pattern   = r"(?P<info_key>[^\t :]+([\t ]+[^\t :]+)*)"
+    info_value_pattern = r"(?P<info_value>.*(\n([\t ]+.*)?)*)"
+    info_item_pattern  = rf"{info_key_pattern}[\t ]*:[\t ]*{info_value_pattern}"
+    info_items_pattern = rf"(?P<info_items>({info_item_pattern}\n)+)"
+
+    match = re.match(info_items_pattern, info_text)
+    if not match: return pkg_info
+    info = NocaseDict(zip(match.captures("info_key"),
+                          match.captures("info_value")))
+    pkg_info.description = info.pop("Description", "")
+    pkg_info.title       = info.pop("Title", "")
+    pkg_info.summary     = info.pop("Summary", "")
+    pkg_info.published   = info.pop("Published", "")
+    return pkg_info
+
+
+def synthetic_output(description_lines, pkg_id="synthetic.package", version="1.2.3"):
+    """A verbose choco info output with a long (release notes like) description."""
+    description = []
+    for idx in range(description_lines):
+        if idx % 10 == 0:
+            description.append("  ")
+            description.append(f"  ## Release {idx // 10}.0")
+        else:
+            description.append(f"  - Fixed issue #{idx}: handling of long lines"
+                               " and nested (parenthesized) notes: see the docs.")
+    summary = " ".join(f"word{idx}" for idx in range(description_lines * 4))
+    return "\n".join([
+        "Chocolatey v2.6.0",
+        f"{pkg_id} {version} [Approved]",
+        " Title: Synthetic package | Published: 1/2/2026",
+        " Package approved as a trusted package on Jan 02 2026 10:00:00.",
+        " Number of Downloads: 123456 | Downloads for this version: 789",
+        " Package url",
+        " Chocolatey Package Source: https://example.com/synthetic",
+        " Tags: synthetic benchmark test",
+        " Software Site: https://example.com/",
+        " Software License: https://example.com/license",
+        f" Summary: {summary}",
+        " Description: Synthetic package.",
+        *description,
+        " Release Notes: https://example.com/changes",
+        "",
+        "1 packages found.",
+        "",
+    ])
+
+
+def bench(description_lines, number=3):
+    out = synthetic_output(description_lines)
+    results = []
+    for parse in (legacy_info, Chocolatey._info):
+        def run():
+            return parse(out, PackageInfo("synthetic.package", "1.2.3"))
+        seconds = min(timeit.repeat(run, number=number, repeat=3)) / number
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append((seconds, peak))
+    (legacy_time, legacy_peak), (time, peak) = results
+    print(f"{description_lines:>7} lines {len(out):>9} chars:  "
+          f"legacy {legacy_time * 1000:9.3f} ms {legacy_peak / 1024:9.1f} KiB  "
+          f"line-based {time * 1000:8.3f} ms {peak / 1024:9.1f} KiB  "
+          f"({legacy_time / time:.1f}x faster)")
+
+
+def main(argv=sys.argv[1:]):
+    for description_lines in [int(arg) for arg in argv] or [10, 100, 1000, 5000]:
+        bench(description_lines)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of InstalledIndex.refresh() on a synthetic lib directory.
+
+Run as: python -m tests.bench_installed [packages ...]
+"""
+
+import sys
+import timeit
+import tempfile
+from pathlib import Path
+
+from chocolatey import InstalledIndex
+
+NUSPEC = """\
+<?xml version="1.0" encoding="utf-8"?>
+<package xmlns="http://schemas.microsoft.com/packaging/2015/06/nuspec.xsd">
+  <metadata>
+    <id>{id}</id>
+    <version>{version}</version>
+    <title>{id}</title>
+    <description>Synthetic package {id}.</description>
+    <authors>py-chocolatey</authors>
+  </metadata>
+</package>
+"""
+
+
+def write_package(lib_dir, pkg_id, version):
+    """Writes lib_dir/<pkg_id>/<pkg_id>.nuspec."""
+    pkg_dir = Path(lib_dir)/pkg_id
+    pkg_dir.mkdir(parents=True, exist_ok=True)
+    (pkg_dir/f"{pkg_id}.nuspec").write_text(NUSPEC.format(id=pkg_id, version=version),
+                                            encoding="utf-8")
+
+
+def bench(packages, number=20):
+    with tempfile.TemporaryDirectory() as install_root:
+        lib_dir = Path(install_root)/"lib"
+        for idx in range(packages):
+            write_package(lib_dir, f"package-{idx:05d}", "1.0.0")
+        index = InstalledIndex(install_root)
+        full = min(timeit.repeat(lambda: InstalledIndex(install_root).refresh(),
+                                 number=1, repeat=3))
+        index.refresh()
+        noop = min(timeit.repeat(index.refresh, number=number, repeat=3)) / number
+        write_package(lib_dir, "package-00000.new", "1.0.0")
+        one = timeit.timeit(index.refresh, number=1)
+        rescan = min(timeit.repeat(lambda: index.refresh(full=True),
+                                   number=number, repeat=3)) / number
+        print(f"{packages:>6} packages:  full scan {full * 1000:8.2f} ms  "
+              f"no-op refresh {noop * 1000:6.3f} ms  "
+              f"one added {one * 1000:7.3f} ms  "
+              f"no-op rescan {rescan * 1000:7.3f} ms")
+
+
+def main(argv=sys.argv[1:]):
+    for packages in [int(arg) for arg in argv] or [100, 1000, 5000]:
+        bench(packages)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
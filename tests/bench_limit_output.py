@@ -0,0 +1,78 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of the parsing of --limit-output listings from bytes and from text.
+
+The text parsing is given the output as captured with text=True (decoded,
+newlines translated), the bytes parsing the raw output of choco (CRLF
+line ends, shuffled lines). Reports the throughput and the peak of the
+Python allocations (tracemalloc) of both.
+
+Run as: python -m tests.bench_limit_output [lines ...]
+"""
+
+import sys
+import random
+import timeit
+import tracemalloc
+
+from chocolatey import Chocolatey, Package, PackageOutdated, Source
+
+
+def synthetic_output(lines, klass):
+    """A raw (CRLF, unordered) --limit-output listing of lines lines for klass."""
+    if issubclass(klass, Source):
+        line = "source-{:06}|https://example.com/{:06}|false|||{}|false|false|false"
+        rows = [line.format(idx, idx, idx % 10) for idx in range(lines)]
+    elif issubclass(klass, PackageOutdated):
+        line = "Package-{:06}|1.0.{}|1.1.{}|false"
+        rows = [line.format(idx, idx, idx) for idx in range(lines)]
+    else:
+        line = "package-{:06}|1.0.{}"
+        rows = [line.format(idx, idx) for idx in range(lines)]
+    random.Random(lines).shuffle(rows)
+    return "".join(row + "\r\n" for row in rows).encode("ascii")
+
+
+def bench(lines, number=1, repeat=7):
+    for klass in (Package, PackageOutdated, Source):
+        data = synthetic_output(lines, klass)
+        if issubclass(klass, Source):
+            def parse(out):
+                return Chocolatey._config(out, klass=klass)
+        elif issubclass(klass, PackageOutdated):
+            parse = Chocolatey._outdated
+        else:
+            parse = Chocolatey._packages
+        runs = (("text",  lambda: parse(Chocolatey._decode(data))),
+                ("bytes", lambda: parse(data)))
+        # Interleaved, not to favour either by the load of the machine.
+        timings = [[], []]
+        for _ in range(repeat):
+            for timing, (_, run) in zip(timings, runs):
+                timing.append(timeit.timeit(run, number=number) / number)
+        results = []
+        for timing, (name, run) in zip(timings, runs):
+            seconds = min(timing)
+            tracemalloc.start()
+            packages = run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del packages
+            results.append((name, seconds, peak))
+        (_, text_time, text_peak), (_, bytes_time, bytes_peak) = results
+        for name, seconds, peak in results:
+            print(f"{klass.__name__:>15} {lines:>7} lines  {name:<5} "
+                  f"{seconds * 1000:8.1f} ms {lines / seconds / 1e6:6.2f} Mlines/s "
+                  f"{len(data) / seconds / 2**20:7.1f} MiB/s  peak {peak / 2**20:6.1f} MiB")
+        print(f"{'':>15} {'':>7}        bytes: {text_time / bytes_time:.2f}x the throughput, "
+              f"{bytes_peak / text_peak:.2f}x the peak of text")
+
+
+def main(argv=sys.argv[1:]):
+    for lines in [int(arg) for arg in argv] or [1000, 100_000]:
+        bench(lines)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
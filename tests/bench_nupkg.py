@@ -0,0 +1,72 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of NupkgIndex on a synthetic folder source.
+
+Compares reading the manifests through the ZIP central directory with
+extracting the whole packages.
+
+Run as: python -m tests.bench_nupkg [packages ...]
+"""
+
+import sys
+import os
+import timeit
+import tempfile
+import zipfile
+from pathlib import Path
+
+from chocolatey import NupkgIndex
+from chocolatey._nuspec import _read_nuspec
+
+from .bench_installed import NUSPEC
+
+
+def write_nupkg(folder, pkg_id, version, payload=1 << 16):
+    """Writes folder/<pkg_id>.<version>.nupkg with payload bytes of tools."""
+    path = Path(folder)/f"{pkg_id}.{version}.nupkg"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as nupkg:
+        nupkg.writestr(f"{pkg_id}.nuspec", NUSPEC.format(id=pkg_id, version=version))
+        nupkg.writestr("tools/chocolateyInstall.ps1", "Write-Host 'installed'\n")
+        nupkg.writestr("tools/payload.bin", os.urandom(payload))
+    return path
+
+
+def extract_all(folder):
+    # The naive way - every package extracted to read its manifest.
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for path in Path(folder).glob("*.nupkg"):
+            with zipfile.ZipFile(path) as nupkg:
+                nupkg.extractall(Path(temp_dir)/path.stem)
+            _read_nuspec(next((Path(temp_dir)/path.stem).glob("*.nuspec")))
+
+
+def bench(packages, number=10):
+    with tempfile.TemporaryDirectory() as folder:
+        for idx in range(packages):
+            write_nupkg(folder, f"package-{idx:05d}", "1.0.0")
+        db = Path(folder)/"index.sqlite"
+        extract = min(timeit.repeat(lambda: extract_all(folder), number=1, repeat=3))
+        full = min(timeit.repeat(lambda: (db.unlink(missing_ok=True),
+                                          NupkgIndex(folder, path=db).refresh()),
+                                 number=1, repeat=3))
+        index = NupkgIndex(folder, path=db)
+        reload = timeit.timeit(index.refresh, number=1)
+        noop = min(timeit.repeat(index.refresh, number=number, repeat=3)) / number
+        write_nupkg(folder, "package-00000", "1.0.1")
+        one = timeit.timeit(index.refresh, number=1)
+        query = min(timeit.repeat(lambda: index.search("package-0001"),
+                                  number=number, repeat=3)) / number
+        print(f"{packages:>6} packages:  extracted {extract * 1000:8.1f} ms  "
+              f"indexed {full * 1000:8.1f} ms  reloaded {reload * 1000:7.1f} ms  "
+              f"no-op refresh {noop * 1000:6.2f} ms  one added {one * 1000:6.2f} ms  "
+              f"search {query * 1000:6.3f} ms")
+
+
+def main(argv=sys.argv[1:]):
+    for packages in [int(arg) for arg in argv] or [100, 1000]:
+        bench(packages)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
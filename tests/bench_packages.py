@@ -0,0 +1,102 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of the slotted result classes against the former dict-backed ones.
+
+Run as: python -m tests.bench_packages [rows ...]
+"""
+
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+
+from chocolatey import Chocolatey, Package, PackageOutdated, Source
+from chocolatey._chocolatey import _str2bool, _str2int, _str2none
+
+
+@dataclass
+class LegacyPackage:
+    """The Package of py-chocolatey 0.10.0."""
+    id: str  # noqa: A003
+    version: str
+
+
+@dataclass
+class LegacyPackageOutdated(LegacyPackage):
+    """The PackageOutdated of py-chocolatey 0.10.0."""
+    available_version: str | None = None
+    pinned: bool = False
+
+    def __post_init__(self):
+        self.pinned = _str2bool("pinned", self.pinned)
+
+
+@dataclass
+class LegacySource:
+    """The Source of py-chocolatey 0.10.0."""
+    name: str
+    value: str = ""
+    disabled: bool = False
+    user: str | None = None
+    password: str | None = None
+    priority: int = 0
+    bypass_proxy: bool = False
+    self_service: bool = False
+    admin_only: bool = False
+
+    def __post_init__(self):
+        self.disabled     = _str2bool("disabled", self.disabled)
+        self.user         = _str2none("user", self.user)
+        self.password     = _str2none("password", self.password)
+        self.priority     = _str2int("priority", self.priority)
+        self.bypass_proxy = _str2bool("bypass_proxy", self.bypass_proxy)
+        self.self_service = _str2bool("self_service", self.self_service)
+        self.admin_only   = _str2bool("admin_only", self.admin_only)
+
+
+def synthetic_output(rows, klass):
+    """A --limit-output listing of rows lines for klass."""
+    if issubclass(klass, (Source, LegacySource)):
+        line = "source-{:06}|https://example.com/{:06}|false|||{}|false|false|false"
+        return "\n".join(line.format(idx, idx, idx % 10) for idx in range(rows)) + "\n"
+    if issubclass(klass, (PackageOutdated, LegacyPackageOutdated)):
+        line = "package-{:06}|1.0.{}|1.1.{}|false"
+        return "\n".join(line.format(idx, idx, idx) for idx in range(rows)) + "\n"
+    line = "package-{:06}|1.0.{}"
+    return "\n".join(line.format(idx, idx) for idx in range(rows)) + "\n"
+
+
+def bench(rows, number=1):
+    for legacy_klass, klass in ((LegacyPackage, Package),
+                                (LegacyPackageOutdated, PackageOutdated),
+                                (LegacySource, Source)):
+        out = synthetic_output(rows, klass)
+        results = []
+        for parse_klass in (legacy_klass, klass):
+            def run():
+                if issubclass(parse_klass, (Source, LegacySource)):
+                    return Chocolatey._config(out, klass=parse_klass)
+                return Chocolatey._packages(out, klass=parse_klass,
+                                            allow_multiple=True)
+            seconds = min(timeit.repeat(run, number=number, repeat=3)) / number
+            tracemalloc.start()
+            packages = run()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del packages
+            results.append((seconds, size))
+        (legacy_time, legacy_size), (time, size) = results
+        print(f"{klass.__name__:>15} {rows:>7} rows:  "
+              f"legacy {legacy_time * 1000:8.1f} ms {legacy_size / 2**20:7.1f} MiB  "
+              f"slotted {time * 1000:8.1f} ms {size / 2**20:7.1f} MiB  "
+              f"({legacy_time / time:.1f}x faster, {legacy_size / size:.1f}x smaller)")
+
+
+def main(argv=sys.argv[1:]):
+    for rows in [int(arg) for arg in argv] or [1000, 100_000]:
+        bench(rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Benchmark of installed() against the streaming installed_iter().
+
+Lists synthetic installed packages with the choco stand-in and reports
+the time, the time to the first package and the peak of the Python
+allocations (tracemalloc) of both.
+
+Run as: python -m tests.bench_stream [packages ...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd
+
+
+def measure(fun):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first, count = fun(start)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first, count, peak
+
+
+def bench(packages):
+    choco = Chocolatey()
+    choco.cmd = StubChocolateyCmd()
+
+    def buffered(start):
+        result = choco.installed(synthetic=packages)
+        return time.perf_counter() - start, len(result)
+
+    def streamed(start):
+        first, count = None, 0
+        for _ in choco.installed_iter(synthetic=packages):
+            if first is None: first = time.perf_counter() - start
+            count += 1
+        return first, count
+
+    for name, fun in (("installed()", buffered), ("installed_iter()", streamed)):
+        elapsed, first, count, peak = measure(fun)
+        print(f"{packages:>7} packages  {name:<17} {elapsed * 1000:8.1f} ms  "
+              f"first after {first * 1000:8.1f} ms  peak {peak / 2**20:7.2f} MiB  ({count})")
+
+
+def main(argv=sys.argv[1:]):
+    for packages in [int(arg) for arg in argv] or [10_000, 100_000]:
+        bench(packages)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
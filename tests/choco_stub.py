@@ -0,0 +1,116 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""ChocolateyCmd variants running the choco stand-in (data/choco.py), its launch log
+and a span collecting trace hook."""
+
+import sys
+import os
+import tempfile
+from functools import partialmethod
+from pathlib import Path
+
+import chocolatey
+from chocolatey import ChocolateyCmd, AsyncChocolateyCmd
+from chocolatey._chocolatey_cmd import _run
+from chocolatey._async_chocolatey_cmd import _arun
+
+here = Path(__file__).resolve().parent
+choco_stub = here/"data/choco.py"
+python_exe = Path(sys.executable)
+
+_run_wrapper = vars(ChocolateyCmd)["_run_wrapper"]
+
+
+class StubChocolateyCmd(ChocolateyCmd):
+    _in_elevated = True
+    _cmd = partialmethod(_run_wrapper, _run, python_exe, choco_stub)
+    _cmd_launched = _cmd
+
+
+class StubAsyncChocolateyCmd(AsyncChocolateyCmd):
+    _in_elevated = True
+    _cmd = partialmethod(_run_wrapper, _arun, python_exe, choco_stub)
+    _cmd_launched = _cmd
+
+
+class StubBrokerChocolateyCmd(ChocolateyCmd):
+    """Runs the commands requiring elevation in its broker (if any)."""
+    _in_elevated = False
+    _cmd = StubChocolateyCmd._cmd
+    _cmd_launched = _cmd
+
+    def _broker_run(self, choco_exe, *args, **kwargs):
+        return super()._broker_run(python_exe, choco_stub, *args, **kwargs)
+
+
+class StubBrokerAsyncChocolateyCmd(AsyncChocolateyCmd):
+    """Runs the commands requiring elevation in its broker (if any)."""
+    _in_elevated = False
+    _cmd = StubAsyncChocolateyCmd._cmd
+    _cmd_launched = _cmd
+
+    async def _broker_run(self, choco_exe, *args, **kwargs):
+        return await super()._broker_run(python_exe, choco_stub, *args, **kwargs)
+
+
+class StubLaunchedChocolateyCmd(StubBrokerChocolateyCmd):
+    """Runs the commands requiring elevation (batches) without the launcher."""
+
+    def _batch_argv(self, *args, **kwargs):
+        return [sys.executable, str(choco_stub), *super()._batch_argv(*args, **kwargs)[1:]]
+
+    def _batch_helper(self, path, key):
+        # Running the commands of the choco stand-in.
+        script = ("import sys ; from chocolatey import _batch ; "
+                  "_batch._choco_command = lambda: sys.argv[1:3] ; "
+                  "sys.exit(_batch.main(sys.argv[3:]))")
+        return [sys.executable, "-c", script, sys.executable, str(choco_stub),
+                *super()._batch_helper(path, key)[-3:]]
+
+
+class ChocoLaunchLog:
+    """Collects the argument lists of the choco stand-in launches."""
+
+    def __enter__(self):
+        fd, self.path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        self._saved = os.environ.get("CHOCO_STUB_LOG")
+        os.environ["CHOCO_STUB_LOG"] = self.path
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._saved is None:
+            del os.environ["CHOCO_STUB_LOG"]
+        else:
+            os.environ["CHOCO_STUB_LOG"] = self._saved
+        os.remove(self.path)
+
+    @property
+    def launches(self):
+        with open(self.path, encoding="utf-8") as log:
+            return [line.rstrip("\n").split("\t") for line in log]
+
+
+class SpanCollector(chocolatey.TraceHook):
+    """Collects the ended spans."""
+
+    def __init__(self):
+        self.started = []
+        self.spans = []
+
+    def on_start(self, span):
+        self.started.append(span)
+
+    def on_end(self, span):
+        self.spans.append(span)
+
+    def children(self, span):
+        return [child for child in self.spans if child.parent_id == span.span_id]
+
+    def __enter__(self):
+        chocolatey.add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        chocolatey.remove_hook(self)
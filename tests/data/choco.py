@@ -0,0 +1,186 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+"""Stand-in for choco.exe used by the tests that can run without Chocolatey.
+
+Prints recorded or synthetic --limit-output results for the subset of
+choco commands exercised by the tests. Extra options understood:
+
+  --sleep=SECONDS   sleep before printing anything
+  --fail=CODE       exit with CODE after printing
+  --max-page-size=N limit search pages to N results (as some feeds do)
+  --synthetic=N     list N synthetic installed packages instead
+  --linger=SECONDS  flush the output, then sleep before exiting
+
+If the CHOCO_STUB_LOG environment variable is set, every invocation appends
+its arguments (one line, tab separated) to that file.
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+here = Path(__file__).resolve().parent
+outputs_dir = here/"outputs"
+
+VERSION = "2.6.0"
+PAGE_SIZE = 25
+
+INSTALLED = {
+    "chocolatey": "2.6.0",
+    "7zip": "24.9.0",
+    "git": "2.47.1",
+    "Git.install": "2.47.1",
+    "python3": "3.13.1",
+}
+
+CATALOG = dict(sorted({
+    **{f"package-{idx:03d}": [f"1.{ver}.0" for ver in range(idx % 3 + 1)]
+       for idx in range(130)},
+    "chocolatey": ["2.5.1", "2.6.0"],
+    "7zip": ["23.1.0", "24.9.0"],
+    "git": ["2.46.0", "2.47.1"],
+    "Git.install": ["2.47.1"],
+}.items(), key=lambda item: item[0].casefold()))
+
+
+def parse_args(argv):
+    args, opts = [], {}
+    for arg in argv:
+        if arg.startswith("--"):
+            key, _, val = arg[2:].partition("=")
+            opts[key] = val.strip('"') if val else True
+        else:
+            args.append(arg)
+    return args, opts
+
+
+def cmd_list(args, opts):
+    if opts.get("synthetic"):
+        for idx in range(int(opts["synthetic"])):
+            print(f"package-{idx:06d}|1.{idx % 100}.{idx}")
+        return
+    for pkg_id, version in sorted(INSTALLED.items(), key=lambda item: item[0].casefold()):
+        if args and args[0].casefold() not in pkg_id.casefold(): continue
+        print(f"{pkg_id}|{version}")
+
+
+def cmd_search(args, opts):
+    filter = args[0].casefold() if args else ""  # noqa: A001
+    lines = []
+    for pkg_id, versions in CATALOG.items():
+        if opts.get("exact"):
+            if pkg_id.casefold() != filter: continue
+        elif filter not in pkg_id.casefold():
+            continue
+        for version in (versions if opts.get("all-versions") else versions[-1:]):
+            lines.append(f"{pkg_id}|{version}")
+    page_size = int(opts.get("page-size", PAGE_SIZE))
+    page = int(opts.get("page", 0))
+    take = min(page_size, int(opts.get("max-page-size", page_size)))
+    for line in lines[page * page_size:page * page_size + take]:
+        print(line)
+
+
+def cmd_outdated(args, opts):
+    print("git|2.47.1|2.48.0|false")
+    print("7zip|24.9.0|24.9.0|false")
+    print("python3|3.13.1|3.13.2|true")
+
+
+def cmd_info(args, opts):
+    pkg_id = args[0]
+    if pkg_id.startswith("broken"):
+        sys.exit(1)
+    kind = "limit" if opts.get("limit-output") else "verbose"
+    path = outputs_dir/f"info.{pkg_id.casefold()}.{kind}.txt"
+    if path.exists():
+        sys.stdout.write(path.read_text("utf-8"))
+    elif kind == "verbose":
+        print(f"Chocolatey v{VERSION}")
+        print("0 packages found.")
+
+
+def cmd_source(args, opts):
+    print("chocolatey|https://community.chocolatey.org/api/v2/|False|||0|False|False|False")
+    print("internal|https://nuget.example.com/api/v2/|True|user||10|True|False|True")
+
+
+def cmd_feature(args, opts):
+    print("checksumFiles|Enabled|Checksum files when pulled in from internet.")
+    print("autoUninstaller|Disabled|Uninstall from programs and features.")
+
+
+def cmd_config(args, opts):
+    print("cacheLocation||Cache location if not TEMP folder.")
+    print("commandExecutionTimeoutSeconds|2700|Default timeout for command execution.")
+
+
+def cmd_pin(args, opts):
+    print("python3|3.13.1")
+
+
+def cmd_template(args, opts):
+    print("built-in|0.0.0")
+
+
+def cmd_apikey(args, opts):
+    print("https://nuget.example.com/api/v2/|(Authenticated)")
+
+
+def cmd_install(args, opts):
+    # Packages with ids starting with "broken" fail.
+    failed = [pkg_id for pkg_id in args if pkg_id.startswith("broken")]
+    print(f"Chocolatey processed {len(args) - len(failed)}/{len(args)} packages. "
+          f"{len(failed)} packages failed.")
+    if not failed: return 0
+    print()
+    print("Failures")
+    for pkg_id in failed:
+        print(f" - {pkg_id} (exited 1) - Error while running the package script.")
+    return 1
+
+
+COMMANDS = {
+    "list": cmd_list,
+    "search": cmd_search,
+    "find": cmd_search,
+    "outdated": cmd_outdated,
+    "info": cmd_info,
+    "source": cmd_source,
+    "sources": cmd_source,
+    "feature": cmd_feature,
+    "features": cmd_feature,
+    "config": cmd_config,
+    "pin": cmd_pin,
+    "template": cmd_template,
+    "templates": cmd_template,
+    "apikey": cmd_apikey,
+    "install": cmd_install,
+    "upgrade": cmd_install,
+    "uninstall": cmd_install,
+}
+
+
+def main(argv=sys.argv[1:]):
+    log_file = os.environ.get("CHOCO_STUB_LOG")
+    if log_file:
+        with open(log_file, "a", encoding="utf-8") as log:
+            print("\t".join(argv), file=log)
+    args, opts = parse_args(argv)
+    if opts.get("sleep"):
+        time.sleep(float(opts["sleep"]))
+    returncode = 0
+    if opts.get("version"):
+        print(VERSION)
+    elif args and args[0] in COMMANDS:
+        returncode = COMMANDS[args[0]](args[1:], opts) or 0
+    sys.stdout.flush()
+    if opts.get("linger"):
+        time.sleep(float(opts["linger"]))
+    return int(opts.get("fail", returncode))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import asyncio
+import time
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey, AsyncChocolatey
+
+from .choco_stub import StubChocolateyCmd, StubAsyncChocolateyCmd
+
+
+class AsyncChocolateyTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.choco = AsyncChocolatey()
+        self.choco.cmd = StubAsyncChocolateyCmd()
+        self.sync_choco = Chocolatey()
+        self.sync_choco.cmd = StubChocolateyCmd()
+
+    async def test_version(self):
+        """Gets the Chocolatey version."""
+        self.assertEqual(await self.choco.version(), "2.6.0")
+
+    async def test_installed(self):
+        """Retrieves a list of locally installed packages."""
+        installed = await self.choco.installed()
+        self.assertIsInstance(installed, dict)
+        self.assertIsInstance(installed["chocolatey"], chocolatey.Package)
+        self.assertEqual(installed, self.sync_choco.installed())
+
+    async def test_outdated(self):
+        """Retrieves information about packages that are outdated."""
+        outdated = await self.choco.outdated()
+        self.assertEqual(set(outdated), {"git", "python3"})
+        self.assertIs(outdated["python3"].pinned, True)
+        self.assertEqual(outdated, self.sync_choco.outdated())
+
+    async def test_search(self):
+        """Searches remote packages."""
+        found = await self.choco.search("package")
+        self.assertEqual(len(found), 130)
+        self.assertEqual(found, self.sync_choco.search("package"))
+        found = await self.choco.search("git", exact=True, all_versions=True)
+        self.assertEqual([pkg.version for pkg in found["git"]], ["2.46.0", "2.47.1"])
+
+    async def test_info(self):
+        """Retrieves package information."""
+        pkg_info = await self.choco.info(pkg_id="chocolatey")
+        self.assertIsInstance(pkg_info, chocolatey.PackageInfo)
+        self.assertEqual(pkg_info, self.sync_choco.info(pkg_id="chocolatey"))
+        self.assertIsNone(await self.choco.info(pkg_id="no-such-package"))
+
+    async def test_config(self):
+        """Retrieve config, sources and features concurrently."""
+        configs, sources, features = await asyncio.gather(self.choco.config(),
+                                                          self.choco.sources(),
+                                                          self.choco.features())
+        self.assertIsNone(configs["cacheLocation"].value)
+        self.assertIs(sources["internal"].disabled, True)
+        self.assertIs(features["checksumFiles"].enabled, True)
+
+    async def test_same_results(self):
+        """Same results as Chocolatey, from the same argument mapping and parsing."""
+        self.assertEqual(await self.choco.pinned(), self.sync_choco.pinned())
+        self.assertEqual(await self.choco.apikeys(), self.sync_choco.apikeys())
+        self.assertEqual(await self.choco.templates(), self.sync_choco.templates())
+        self.assertEqual(await self.choco.template_info(name="built-in"),
+                         self.sync_choco.template_info(name="built-in"))
+        self.assertEqual(await self.choco.help(), self.sync_choco.help())
+        self.assertIsNone(await self.choco.apikey_remove(source="internal"))
+        self.assertIsNone(await self.choco.cache_list())
+
+    async def test_called_process_error(self):
+        with self.assertRaises(run.CalledProcessError):
+            await self.choco.installed(fail=2)
+
+    async def test_timeout(self):
+        """The timeout kills the choco process."""
+        start = time.monotonic()
+        with self.assertRaises(run.TimeoutExpired):
+            await self.choco.installed(sleep=30, timeout=0.5)
+        self.assertLess(time.monotonic() - start, 10)
+
+    async def test_cancel(self):
+        """Cancellation kills the choco process."""
+        start = time.monotonic()
+        task = asyncio.ensure_future(self.choco.installed(sleep=30))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertLess(time.monotonic() - start, 10)
+
+    async def test_required_args(self):
+        with self.assertRaises(TypeError):
+            await self.choco.install()
+        with self.assertRaises(TypeError):
+            await self.choco.upgrade()
+        with self.assertRaises(TypeError):
+            await self.choco.uninstall()
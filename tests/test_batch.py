@@ -0,0 +1,157 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import contextlib
+from unittest import mock
+
+import chocolatey
+from chocolatey import Chocolatey
+from chocolatey import _batch
+from chocolatey._chocolatey_cmd import _signature
+
+from .choco_stub import StubChocolateyCmd
+from .choco_stub import StubLaunchedChocolateyCmd
+from .choco_stub import ChocoLaunchLog
+
+
+class ChocolateyBatchTestCase(unittest.TestCase):
+    """Changes of settings queued by batch() and run together."""
+
+    def setUp(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+        self.choco = Chocolatey(cache=True)
+
+    def tearDown(self):
+        self.env.stop()
+
+    def queue(self, batch):
+        batch.config_set(name="cacheLocation", value="C:\\Temp")
+        batch.feature_enable(name="checksumFiles")
+        batch.source_add(name="internal", source="https://nuget.example.com/api/v2/")
+        batch.pin_add(pkg_id="git", fail=3)
+        batch.apikey_remove(source="https://nuget.example.com/api/v2/")
+
+    def check_results(self, results):
+        self.assertEqual([result.operation for result in results],
+                         ["config_set", "feature_enable", "source_add",
+                          "pin_add", "apikey_remove"])
+        self.assertEqual([result.returncode for result in results], [0, 0, 0, 3, 0])
+        self.assertEqual(results[3].kwargs, dict(pkg_id="git", fail=3))
+        self.assertIn("--fail=3", results[3].args)
+        self.assertEqual(results[1].args[-5:], ["feature", "enable", "--name=checksumFiles",
+                                                "--accept-license", "--no-progress"])
+
+    def test_elevated(self):
+        self.choco.cmd = StubChocolateyCmd()
+        self.choco.features() ; self.choco.pinned()
+        with mock.patch.object(self.choco.cache, "invalidate",
+                               wraps=self.choco.cache.invalidate) as invalidate:
+            with ChocoLaunchLog() as log:
+                with self.choco.batch() as batch:
+                    self.queue(batch)
+                    self.assertEqual(len(batch), 5)
+                    self.assertEqual(log.launches, [])
+                self.assertEqual(len(log.launches), 5)
+        self.check_results(batch.results)
+        self.assertEqual([result.operation for result in batch.failed], ["pin_add"])
+        invalidate.assert_called_once_with("apikeys", "config", "features", "info",
+                                           "outdated", "pinned", "search", "sources")
+        self.assertEqual(len(self.choco.cache), 0)
+
+    def test_launched(self):
+        self.choco.cmd = StubLaunchedChocolateyCmd()
+        with ChocoLaunchLog() as log:
+            with mock.patch.object(StubLaunchedChocolateyCmd, "_batch_launch", autospec=True,
+                                   side_effect=StubLaunchedChocolateyCmd._batch_launch) \
+                 as launch, self.choco.batch() as batch:
+                self.queue(batch)
+            self.assertEqual(launch.call_count, 1)
+            self.assertEqual(len(log.launches), 5)
+        self.check_results(batch.results)
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch.run(), [])
+
+    def test_helper_failure(self):
+        self.choco.cmd = StubLaunchedChocolateyCmd()
+        batch = self.choco.batch()
+        self.queue(batch)
+        with mock.patch.object(StubLaunchedChocolateyCmd, "_batch_launch"):
+            results = batch.run()
+        self.assertEqual([result.returncode for result in results], [None] * 5)
+        self.assertEqual(len(batch.failed), 5)
+
+    def test_launch_failure(self):
+        # The launcher (here the helper itself) exits with an error.
+        self.choco.cmd = StubLaunchedChocolateyCmd()
+        with mock.patch.object(StubLaunchedChocolateyCmd, "_batch_helper",
+                               return_value=[sys.executable, "-c", "raise SystemExit(1223)"]):
+            with self.choco.batch() as batch:
+                self.queue(batch)
+        self.assertEqual([result.returncode for result in batch.results], [None] * 5)
+        self.assertEqual(len(batch.failed), 5)
+
+    def test_helper_path(self):
+        cmd = chocolatey.ChocolateyCmd()
+        argv = cmd._batch_helper("batch.json", "0123")
+        self.assertEqual(argv[:2], [cmd._LAUNCHER_EXE, sys.executable])
+        self.assertIn("-P" if sys.version_info >= (3, 11) else "-c", argv)
+        self.assertEqual(argv[-3:], ["batch.json", "--key", "0123"])
+
+    def test_secrets(self):
+        """The operations passing secrets are not queued."""
+        self.choco.cmd = StubChocolateyCmd()
+        batch = self.choco.batch()
+        self.assertFalse(hasattr(batch, "apikey_add"))
+        with self.assertRaises(Chocolatey.ValueError):
+            batch.source_add(name="internal", source="https://nuget.example.com/api/v2/",
+                             user="user", password="secret")
+        self.assertEqual(len(batch), 0)
+
+    def test_changed_file(self):
+        """The helper runs no command of a changed file, nor other commands."""
+        self.choco.cmd = StubLaunchedChocolateyCmd()
+        commands = [[str(chocolatey.ChocolateyCmd._CHOCOLATEY_EXE), "install", "git"],
+                    [sys.executable, "-c", "pass"]]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "batch.json")
+            for signature, returncode in (("0" * 64, 2),
+                                          (_signature("key", commands), 0)):
+                with open(path, "w", encoding="utf-8") as file:
+                    json.dump(dict(commands=commands, signature=signature), file)
+                with contextlib.redirect_stderr(io.StringIO()):
+                    self.assertEqual(_batch.main([path, "--key", "key"]), returncode)
+                with open(path, encoding="utf-8") as file:
+                    results = json.load(file).get("results")
+            self.assertEqual([result["returncode"] for result in results], [-1, -1])
+        # Results changed (not signed with the key) are taken as not run.
+
+        def launch(self, path, key):
+            with open(path, encoding="utf-8") as file:
+                batch = json.load(file)
+            batch["results"] = [dict(returncode=0, stdout="", stderr="")]
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(batch, file)
+        with mock.patch.object(StubLaunchedChocolateyCmd, "_batch_launch", launch):
+            with self.choco.batch() as batch:
+                batch.feature_enable(name="checksumFiles")
+        self.assertEqual([result.returncode for result in batch.results], [None])
+
+    def test_not_run(self):
+        self.choco.cmd = StubChocolateyCmd()
+        with ChocoLaunchLog() as log:
+            with self.assertRaises(KeyError):
+                with self.choco.batch() as batch:
+                    self.queue(batch)
+                    raise KeyError("stop")
+            with self.assertRaises(TypeError):
+                batch.pin_add(name="git")
+            self.assertEqual(log.launches, [])
+        self.assertEqual(batch.results, [])
@@ -0,0 +1,111 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import sys
+import os
+import time
+from unittest import mock
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubBrokerChocolateyCmd, StubBrokerAsyncChocolateyCmd
+from .choco_stub import ChocoLaunchLog, SpanCollector
+
+
+class ElevatedBrokerTestCase(unittest.TestCase):
+    """Commands requiring elevation run in one (here not elevated) helper."""
+
+    def setUp(self):
+        # The helper imports chocolatey the same way as the tests.
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+        self.broker = chocolatey.ElevatedBroker([sys.executable, "-m", "chocolatey._broker"],
+                                                connect_timeout=30)
+        self.choco = Chocolatey()
+        self.choco.cmd = StubBrokerChocolateyCmd(broker=self.broker)
+
+    def tearDown(self):
+        self.choco.close()
+        self.env.stop()
+
+    def test_session(self):
+        with ChocoLaunchLog() as log:
+            self.assertFalse(self.broker.running)
+            self.choco.installed()  # not requiring elevation
+            self.assertFalse(self.broker.running)
+            self.choco.pin_add(pkg_id="git")
+            popen = self.broker._popen
+            self.assertIsNotNone(popen)
+            self.choco.install("git")
+            self.choco.config_set(name="cacheLocation", value="C:\\Temp")
+            self.assertIs(self.broker._popen, popen)
+            self.assertIsNone(popen.poll())
+            self.assertEqual([launch[0] for launch in log.launches],
+                             ["list", "pin", "install", "config"])
+        self.choco.close()
+        self.assertFalse(self.broker.running)
+        self.assertEqual(popen.returncode, 0)
+        # a new session on demand
+        self.choco.pin_add(pkg_id="git")
+        self.assertTrue(self.broker.running)
+        self.assertIsNot(self.broker._popen, popen)
+
+    def test_run(self):
+        output = self.broker.run(sys.executable, "-c",
+                                 "import sys; print(sys.stdin.read().upper(), end='')",
+                                 input="zażółć\r\n", capture_output=True, encoding="utf-8")
+        self.assertEqual(output.stdout, "ZAŻÓŁĆ\n")
+        self.assertIsNone(self.broker.run(sys.executable, "-c", "print(1)").stdout)
+        with self.assertRaises(run.CalledProcessError) as exc:
+            self.broker.run(sys.executable, "-c", "import sys; sys.exit(3)")
+        self.assertEqual(exc.exception.returncode, 3)
+        self.assertEqual(self.broker.run(sys.executable, "-c", "import sys; sys.exit(3)",
+                                         check=False).returncode, 3)
+        with self.assertRaises(run.TimeoutExpired):
+            self.broker.run(sys.executable, "-c", "import time; time.sleep(10)", timeout=0.5)
+        with self.assertRaises(OSError):
+            self.broker.run("no-such-executable-here")
+        with self.assertRaises(ValueError):
+            self.broker.run(sys.executable, "-c", "", wait=False)
+        for kwargs in (dict(env={}), dict(shell=True), dict(stream=True)):
+            with self.assertRaises(TypeError):
+                self.broker.run(sys.executable, "-c", "", **kwargs)
+        self.broker.run(sys.executable, "-c", "", env=None, stream=False)
+        self.assertTrue(self.broker.running)
+
+    def test_start_failure(self):
+        # Not waiting connect_timeout once the started command has exited.
+        start = time.monotonic()
+        for code, grace in (("raise SystemExit(1223)", 30.0), ("pass", 0.5)):
+            broker = chocolatey.ElevatedBroker([sys.executable, "-c", code],
+                                               connect_timeout=30)
+            broker._exit_grace = grace
+            with self.assertRaises(ConnectionError):
+                broker.run(sys.executable, "-c", "")
+            self.assertFalse(broker.running)
+        self.assertLess(time.monotonic() - start, 15)
+
+    def test_trace(self):
+        with SpanCollector() as collector:
+            self.choco.installed()
+            self.choco.pin_add(pkg_id="git")
+        self.assertEqual([(span.name, span.attributes.get("elevated"))
+                          for span in collector.spans],
+                         [("list", False), ("Chocolatey.installed", None),
+                          ("pin", True), ("Chocolatey.pin_add", None)])
+
+    def test_async(self):
+        import asyncio
+        cmd = StubBrokerAsyncChocolateyCmd(broker=self.broker)
+        output = asyncio.run(cmd.pin("list", limit_output=True,
+                                     capture_output=True, text=True))
+        self.assertEqual(output.stdout, "python3|3.13.1\n")
+        self.assertFalse(self.broker.running)  # "list" does not require elevation
+        output = asyncio.run(cmd.pin("add", name="git", capture_output=True, text=True))
+        self.assertEqual(output.returncode, 0)
+        self.assertTrue(self.broker.running)
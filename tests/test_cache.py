@@ -0,0 +1,234 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import sys
+import time
+import tempfile
+import shutil
+import subprocess
+from pathlib import Path
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd
+from .choco_stub import ChocoLaunchLog
+
+here = Path(__file__).resolve().parent
+
+
+class QueryCacheTestCase(unittest.TestCase):
+    """Chocolatey(cache=...) tests run against the choco stand-in."""
+
+    def setUp(self):
+        self.choco = Chocolatey(cache=True)
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_cached(self):
+        cache = self.choco.cache
+        self.assertIsInstance(cache, chocolatey.QueryCache)
+        with ChocoLaunchLog() as log:
+            installed = self.choco.installed()
+            self.assertEqual(self.choco.installed(), installed)
+            self.assertEqual(len(log.launches), 1)
+            self.choco.installed("git")  # other arguments
+            self.assertEqual(len(log.launches), 2)
+            self.assertEqual(self.choco.sources(), self.choco.sources())
+            self.assertEqual(self.choco.features(), self.choco.features())
+            self.assertEqual(len(log.launches), 4)
+        self.assertEqual((cache.hits, cache.misses), (3, 4))
+        # The cached results are not shared with the callers.
+        installed = self.choco.installed()
+        installed.clear()
+        self.assertTrue(self.choco.installed())
+        self.assertIsNone(Chocolatey().cache)
+
+    def test_invalidation(self):
+        with ChocoLaunchLog() as log:
+            self.choco.installed() ; self.choco.outdated() ; self.choco.sources()
+            self.assertEqual(len(log.launches), 3)
+            self.choco.install("git")
+            self.choco.installed() ; self.choco.outdated() ; self.choco.sources()
+            self.assertEqual(len(log.launches), 6)
+            self.choco.source_disable(name="internal")
+            self.choco.installed() ; self.choco.sources()
+            self.assertEqual(len(log.launches), 8)
+            self.choco.feature_enable(name="checksumFiles")
+            self.choco.features() ; self.choco.features()
+            self.choco.feature_disable(name="checksumFiles")
+            self.choco.features()
+            self.assertEqual(len(log.launches), 12)
+        # Also invalidated by a failing command.
+        self.choco.pinned()
+        with self.assertRaises(run.CalledProcessError):
+            self.choco.uninstall("git", fail=1)
+        with ChocoLaunchLog() as log:
+            self.choco.pinned()
+            self.assertEqual(len(log.launches), 1)
+
+    def test_ttl_and_lru(self):
+        cache = chocolatey.QueryCache(ttl=0.5, ttls=dict(installed=0.5, sources=0),
+                                      maxsize=2)
+        self.choco.cache = cache
+        with ChocoLaunchLog() as log:
+            self.choco.installed() ; self.choco.installed()
+            self.choco.sources() ; self.choco.sources()  # not cached
+            self.assertEqual(len(log.launches), 3)
+            time.sleep(0.6)
+            self.choco.installed()
+            self.assertEqual(len(log.launches), 4)
+            self.choco.features() ; self.choco.config() ; self.choco.installed()
+            self.assertEqual(len(log.launches), 7)
+            self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+
+class PersistentCacheTestCase(unittest.TestCase):
+    """Chocolatey(persistent_cache=...) tests run against the choco stand-in."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name)/"cache/queries.sqlite"
+        # The version and the sources of the stand-in, read without running it.
+        self.install_root = Path(self.temp_dir.name)/"chocolatey"
+        (self.install_root/"lib/chocolatey").mkdir(parents=True)
+        (self.install_root/"lib/chocolatey/chocolatey.nuspec").write_text(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package><metadata><id>chocolatey</id><version>2.6.0</version></metadata>'
+            '</package>\n', encoding="utf-8")
+        (self.install_root/"config").mkdir()
+        shutil.copy(here/"data/chocolatey.config", self.install_root/"config")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def new_choco(self, source=None, **kwargs):
+        choco = Chocolatey(source,
+                           persistent_cache=chocolatey.PersistentCache(self.path, **kwargs),
+                           install_root=self.install_root)
+        choco.cmd = StubChocolateyCmd(source)
+        return choco
+
+    def test_cached(self):
+        choco = self.new_choco()
+        expected = self.new_choco().search("git")
+        with ChocoLaunchLog() as log:
+            found = choco.search("git")
+            self.assertEqual(found, expected)
+            self.assertIsInstance(found, chocolatey.SearchResult)
+            launches = len(log.launches)
+            self.assertEqual(choco.search("git"), expected)
+            self.assertEqual(choco.info(pkg_id="chocolatey"),
+                             choco.info(pkg_id="chocolatey"))
+            self.assertIsNone(choco.info(pkg_id="no-such-package"))
+            self.assertIsNone(choco.info(pkg_id="no-such-package"))
+            self.assertEqual(choco.outdated(), choco.outdated())
+            self.assertEqual(len(log.launches), launches + 3)
+        cache = choco.persistent_cache
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+        # Another instance (as another process would) uses the same entries.
+        choco = self.new_choco()
+        with ChocoLaunchLog() as log:
+            self.assertEqual(choco.search("git"), expected)
+            self.assertEqual(len(log.launches), 0)
+            choco.search("git", all_versions=True)  # other arguments
+            launches = len(log.launches)
+            self.assertGreater(launches, 1)
+            choco.outdated()
+            choco.install("git")
+            choco.outdated()
+            self.assertEqual(len(log.launches), launches + 2)
+
+    def test_without_install_root(self):
+        """The version and the sources are got from choco if not installed."""
+        choco = Chocolatey(persistent_cache=chocolatey.PersistentCache(self.path),
+                           install_root=self.temp_dir.name)
+        choco.cmd = StubChocolateyCmd()
+        expected = self.new_choco().search("git")
+        with ChocoLaunchLog() as log:
+            self.assertEqual(choco.search("git"), expected)
+            self.assertEqual(len(log.launches), 2)  # --version, source list
+            self.assertIn("--version", log.launches[1])
+        self.assertEqual(choco.persistent_cache.hits, 1)
+
+    def test_sources(self):
+        """The entries are shared by the names and the feeds of the sources."""
+        expected = self.new_choco().search("git")
+        for source in ("chocolatey", "Chocolatey", "https://community.chocolatey.org/api/v2/"):
+            with ChocoLaunchLog() as log:
+                self.assertEqual(self.new_choco(source).search("git"), expected)
+                self.assertEqual(len(log.launches), 0)
+        choco = self.new_choco()
+        with ChocoLaunchLog() as log:
+            choco.search("git", source="internal")  # another feed
+            self.assertGreater(len(log.launches), 0)
+        # Changing the sources drops the entries.
+        choco.source_disable(name="internal")
+        with ChocoLaunchLog() as log:
+            self.assertEqual(choco.search("git"), expected)
+            self.assertGreater(len(log.launches), 0)
+
+    def test_local_info(self):
+        choco = self.new_choco()
+        choco.info(pkg_id="git", local_only=True)
+        choco.install("git")
+        with ChocoLaunchLog() as log:
+            choco.info(pkg_id="git", local_only=True)
+            self.assertEqual(len(log.launches), 1)
+        cache = choco.persistent_cache
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_truncated(self):
+        choco = self.new_choco()
+        choco.search("git")
+        with ChocoLaunchLog() as log:
+            self.assertTrue(choco.search("package", limit=5).truncated)
+            self.assertTrue(choco.search("package", limit=5).truncated)
+            self.assertEqual(len(log.launches), 2)
+            choco.search("package", deadline=0.5, sleep=5)
+            choco.search("package", deadline=0.5, sleep=5)
+            self.assertEqual(len(log.launches), 4)
+
+    def test_stale_while_revalidate(self):
+        choco = self.new_choco(max_age=0.5, stale_while_revalidate=60)
+        cache = choco.persistent_cache
+        expected = choco.search("git")
+        time.sleep(0.6)
+        with ChocoLaunchLog() as log:
+            self.assertEqual(choco.search("git"), expected)
+            self.assertEqual(choco.search("git"), expected)
+            cache.join()
+            refresh = len(log.launches)  # one refresh only
+            self.assertEqual(refresh, 2)  # page + empty page
+        self.assertEqual(cache.stale_hits, 2)
+        self.assertEqual(choco.search("git"), expected)
+        self.assertEqual(cache.hits, 1)
+        cache.max_age = cache.stale_while_revalidate = 0
+        with ChocoLaunchLog() as log:
+            choco.search("git")
+            self.assertEqual(len(log.launches), refresh)
+        cache.clear()
+        self.assertEqual((cache.hits, cache.stale_hits, cache.misses), (0, 0, 0))
+
+    def test_processes(self):
+        """Several processes read and write the cache at once."""
+        script = ("import sys ; sys.path.insert(0, sys.argv[1]) ; "
+                  "from chocolatey import Chocolatey, PersistentCache ; "
+                  "from tests.choco_stub import StubChocolateyCmd ; "
+                  "choco = Chocolatey(persistent_cache=PersistentCache(sys.argv[2])) ; "
+                  "choco.cmd = StubChocolateyCmd() ; "
+                  "[choco.info(pkg_id=pkg_id) for pkg_id in "
+                  "['chocolatey', 'git', '7zip', 'no-such-package'] * 3]")
+        processes = [subprocess.Popen([sys.executable, "-c", script,
+                                       str(here.parent), str(self.path)])
+                     for _ in range(4)]
+        for process in processes:
+            self.assertEqual(process.wait(60), 0)
+        choco = self.new_choco()
+        choco.info(pkg_id="git")
+        choco.info(pkg_id="no-such-package")
+        self.assertEqual(choco.persistent_cache.hits, 2)
@@ -109,6 +109,10 @@ class ChocolateyTestCase(unittest.TestCase):
         self.assertIsInstance(found, dict)
         self.assertIsInstance(list(found.values())[0], list)
         self.assertIsInstance(list(found.values())[0][0], chocolatey.Package)
+        # with concurrent page requests
+        found_prefetched = self.choco.search(pkg_id, by_id_only=True, all_versions=True,
+                                             prefetch=4)
+        self.assertEqual(found_prefetched, found)
 
     def test_info(self):
         """Retrieves package information."""
@@ -116,6 +120,14 @@ class ChocolateyTestCase(unittest.TestCase):
         pkg_info = self.choco.info(pkg_id=pkg_id)
         self.assertIsInstance(pkg_info, chocolatey.PackageInfo)
 
+    def test_info_many(self):
+        """Retrieves information of many packages concurrently."""
+        pkg_ids = ["chocolatey", "chocolatey-core.extension"]
+        pkg_infos = self.choco.info_many(pkg_ids, max_workers=2)
+        self.assertEqual(list(pkg_infos), pkg_ids)
+        for pkg_info in pkg_infos.values():
+            self.assertIsInstance(pkg_info, chocolatey.PackageInfo)
+
     def test_export(self):
         """Exports list of currently installed packages."""
         with tempfile.TemporaryDirectory() as temp_dir:
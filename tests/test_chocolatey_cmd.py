@@ -7,6 +7,7 @@ import shutil
 import tempfile
 import threading
 from functools import partial
+from unittest import mock
 from pathlib import Path
 
 from rich.pretty import pprint
@@ -103,3 +104,23 @@ class ChocolateyCmdTestCase(unittest.TestCase):
     def test_template(self):
         self.assertIs(self.choco_cmd.__class__.template,
                       self.choco_cmd.__class__.templates)
+
+    def test_elevated(self):
+        with mock.patch.object(ChocolateyCmd, "_in_elevated",
+                               new_callable=mock.PropertyMock,
+                               return_value=False) as in_elevated:
+            choco_cmd = ChocolateyCmd()
+            self.assertEqual(choco_cmd._cmd_elevated.args, choco_cmd._cmd_launched.args)
+            self.assertEqual(choco_cmd._cmd_elevated.args, choco_cmd._cmd_launched.args)
+            self.assertFalse(choco_cmd.elevated)
+            self.assertEqual(in_elevated.call_count, 1)
+            in_elevated.return_value = True
+            choco_cmd.refresh()
+            self.assertEqual(choco_cmd._cmd_elevated.args, choco_cmd._cmd.args)
+            self.assertEqual(in_elevated.call_count, 2)
+            # injected
+            choco_cmd = ChocolateyCmd(elevated=False)
+            self.assertEqual(choco_cmd._cmd_elevated.args, choco_cmd._cmd_launched.args)
+            choco_cmd.elevated = True
+            self.assertEqual(choco_cmd._cmd_elevated.args, choco_cmd._cmd.args)
+            self.assertEqual(in_elevated.call_count, 2)
@@ -0,0 +1,662 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import time
+import tempfile
+from unittest import mock
+import subprocess
+import dataclasses
+import pickle
+import copy
+from pathlib import Path
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey
+from chocolatey._table import _normalized_version
+
+from .choco_stub import StubChocolateyCmd
+from .choco_stub import ChocoLaunchLog
+from .bench_info import legacy_info, synthetic_output
+from .bench_installed import write_package
+
+here = Path(__file__).resolve().parent
+outputs_dir = here/"data/outputs"
+
+
+class ChocolateyOfflineTestCase(unittest.TestCase):
+    """Chocolatey tests run against the choco stand-in (data/choco.py)."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_info_many(self):
+        """Retrieves information of many packages concurrently."""
+        pkg_ids = ["py-chocolatey.Test1", "no-such-package", "broken-package", "chocolatey"]
+        pkg_infos = self.choco.info_many(pkg_ids, max_workers=4)
+        self.assertEqual(list(pkg_infos), pkg_ids)
+        self.assertIsNone(pkg_infos["no-such-package"])
+        self.assertIsNone(pkg_infos["broken-package"])
+        self.assertEqual(pkg_infos["chocolatey"], self.choco.info(pkg_id="chocolatey"))
+        self.assertIsInstance(pkg_infos["py-chocolatey.Test1"], chocolatey.PackageInfo)
+
+    def test_info_many_concurrency(self):
+        pkg_ids = [f"package-{idx}" for idx in range(8)]
+        start = time.monotonic()
+        pkg_infos = self.choco.info_many(pkg_ids, max_workers=8, sleep=0.5)
+        self.assertLess(time.monotonic() - start, 6)
+        self.assertEqual(list(pkg_infos), pkg_ids)
+
+    def test_info_iter(self):
+        """Retrieves information of many packages, yielding it as available."""
+        pkg_ids = ["chocolatey", "py-chocolatey.Test1", "no-such-package"]
+        results = list(self.choco.info_iter(pkg_ids, max_workers=2))
+        self.assertEqual(sorted(pkg_id for pkg_id, _ in results), sorted(pkg_ids))
+        # closing early does not wait for the lookups not started yet
+        pkg_ids = [f"package-{idx}" for idx in range(20)]
+        start = time.monotonic()
+        for pkg_id, pkg_info in self.choco.info_iter(pkg_ids, max_workers=1, sleep=0.2):
+            break
+        self.assertLess(time.monotonic() - start, 3)
+
+    def test_search(self):
+        """Searches remote packages."""
+        found = self.choco.search("package")
+        self.assertEqual(len(found), 130)
+        self.assertIsInstance(found["package-000"], chocolatey.Package)
+        found = self.choco.search("git", exact=True, all_versions=True)
+        self.assertEqual([pkg.version for pkg in found["git"]], ["2.46.0", "2.47.1"])
+
+    def test_search_prefetch(self):
+        """Searches remote packages with concurrent page requests."""
+        for all_versions in (False, True):
+            with ChocoLaunchLog() as log:
+                expected = self.choco.search("package", all_versions=all_versions)
+                sequential = len(log.launches)
+            for prefetch in (2, 3, 8, 50):
+                with self.subTest(all_versions=all_versions, prefetch=prefetch):
+                    with ChocoLaunchLog() as log:
+                        found = self.choco.search("package", all_versions=all_versions,
+                                                  prefetch=prefetch)
+                        launches = len(log.launches)
+                    self.assertEqual(found, expected)
+                    self.assertEqual(list(found), list(expected))
+                    self.assertGreaterEqual(launches, sequential)
+                    self.assertLess(launches, sequential + prefetch)
+        with ChocoLaunchLog() as log:
+            found = self.choco.search("git", exact=True, prefetch=8)
+            self.assertEqual(len(log.launches), 1)
+        self.assertEqual(found["git"].version, "2.47.1")
+
+    def test_search_limit(self):
+        """Searches remote packages, up to a limit."""
+        expected = self.choco.search("package")
+        self.assertIsInstance(expected, chocolatey.SearchResult)
+        self.assertFalse(expected.truncated)
+        for prefetch in (1, 4):
+            with ChocoLaunchLog() as log:
+                found = self.choco.search("package", limit=30, prefetch=prefetch)
+                self.assertLessEqual(len(log.launches), 1 + prefetch)
+            self.assertTrue(found.truncated)
+            self.assertEqual(list(found), list(expected)[:30])
+        found = self.choco.search("package", limit=500)
+        self.assertFalse(found.truncated)
+        self.assertEqual(found, expected)
+        # The limit reached at the end of the results (of a page) or before it.
+        found = self.choco.search("package", limit=len(expected), page_size=50)
+        self.assertFalse(found.truncated)
+        self.assertEqual(found, expected)
+        # A full page is taken as more to come, without a further page request.
+        with ChocoLaunchLog() as log:
+            found = self.choco.search("package", limit=100, page_size=50)
+            self.assertEqual(len(log.launches), 2)
+        self.assertTrue(found.truncated)
+        found = self.choco.search("package", all_versions=True, limit=10)
+        self.assertEqual(sum(len(pkgs) for pkgs in found.values()), 10)
+        found = self.choco.search("git", exact=True, limit=1)
+        self.assertFalse(found.truncated)
+        self.assertEqual(len(found), 1)
+
+    def test_search_deadline(self):
+        """Searches remote packages, within a deadline."""
+        start = time.monotonic()
+        found = self.choco.search("package", deadline=1, sleep=5)
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertTrue(found.truncated)
+        self.assertEqual(found, {})
+        found = self.choco.search("package", deadline=60)
+        self.assertFalse(found.truncated)
+        self.assertEqual(len(found), 130)
+        with self.assertRaises(run.TimeoutExpired):
+            self.choco.search("package", deadline=60, timeout=0.5, sleep=5)
+
+    def test_search_iter(self):
+        """Searches remote packages, yielding them page by page."""
+        for all_versions in (False, True):
+            expected = self.choco.search("package", all_versions=all_versions)
+            for prefetch in (1, 3):
+                with self.subTest(all_versions=all_versions, prefetch=prefetch):
+                    packages = list(self.choco.search_iter("package", sort=True,
+                                                           all_versions=all_versions,
+                                                           prefetch=prefetch))
+                    self.assertIsInstance(packages[0], chocolatey.Package)
+                    if all_versions:
+                        self.assertEqual(packages, [pkg for pkgs in expected.values()
+                                                    for pkg in pkgs])
+                    else:
+                        self.assertEqual(packages, list(expected.values()))
+
+    def test_search_iter_break(self):
+        with ChocoLaunchLog() as log:
+            for count, package in enumerate(self.choco.search_iter("package"), 1):
+                if count == 30: break
+            self.assertEqual(len(log.launches), 2)
+        with ChocoLaunchLog() as log:
+            packages = self.choco.search_iter("package", prefetch=3)
+            next(packages)
+            packages.close()
+            self.assertEqual(len(log.launches), 3)
+
+    def test_search_prefetch_speed(self):
+        start = time.monotonic()
+        found = self.choco.search("package", prefetch=7, sleep=0.5)
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertEqual(len(found), 130)
+
+    @mock.patch.dict(Chocolatey._page_size_tuners, clear=True)
+    def test_search_page_size(self):
+        """Searches remote packages with fixed and adaptive page sizes."""
+        for all_versions in (False, True):
+            with ChocoLaunchLog() as log:
+                expected = self.choco.search("package", all_versions=all_versions)
+                default = len(log.launches)
+            for page_size in (10, 40, "auto"):
+                for prefetch in (1, 3):
+                    with self.subTest(all_versions=all_versions,
+                                      page_size=page_size, prefetch=prefetch):
+                        found = self.choco.search("package", all_versions=all_versions,
+                                                  page_size=page_size, prefetch=prefetch)
+                        self.assertEqual(found, expected)
+                        self.assertEqual(list(found), list(expected))
+            Chocolatey._page_size_tuners.clear()
+            with ChocoLaunchLog() as log:
+                self.choco.search("package", all_versions=all_versions, page_size="auto")
+                self.assertLess(len(log.launches), default)
+        # The page size reached is kept for the source.
+        tuner = Chocolatey._page_size_tuners[None]
+        self.assertGreater(tuner.page_size, 25)
+        with ChocoLaunchLog() as log:
+            self.choco.search("package", page_size="auto")
+            self.assertLessEqual(len(log.launches), 3)
+        with self.assertRaises(ValueError):
+            self.choco.search("package", page_size="large")
+
+    def test_search_page_size_limit(self):
+        """Adapts the page size to a feed limiting it."""
+        expected = self.choco.search("package", all_versions=True)
+        for prefetch in (1, 3):
+            tuner = chocolatey.PageSizeTuner(50)
+            found = self.choco.search("package", all_versions=True, prefetch=prefetch,
+                                      page_size=tuner, max_page_size=30)
+            self.assertEqual(found, expected)
+            self.assertEqual(tuner.max_page_size, 30)
+            self.assertEqual(tuner.page_size, 30)
+
+    def test_page_size_tuner(self):
+        tuner = chocolatey.PageSizeTuner(25, min_page_size=10, max_page_size=100,
+                                         target_latency=1.0, max_payload=10_000)
+        self.assertEqual(tuner.size_at(0), 25)
+        self.assertEqual(tuner.size_at(50), 25)
+        self.assertEqual(tuner.size_at(30), 15)
+        tuner.update(25, 25, 0.1, 1000)
+        self.assertEqual(tuner.page_size, 50)
+        tuner.update(25, 25, 0.1, 1000)  # not of the current size
+        tuner.update(50, 20, 0.1, 1000)  # not a full page
+        self.assertEqual(tuner.page_size, 50)
+        tuner.update(50, 50, 0.7, 1000)  # within the target
+        self.assertEqual(tuner.page_size, 50)
+        tuner.update(50, 50, 0.1, 6000)  # grown payload would be too big
+        self.assertEqual(tuner.page_size, 50)
+        tuner.update(50, 50, 1.5, 1000)
+        self.assertEqual(tuner.page_size, 25)
+        tuner.update(25, 25, 0.1, 20_000)
+        self.assertEqual(tuner.page_size, 12)
+        tuner.update(12, 12, 5.0, 1000)
+        self.assertEqual(tuner.page_size, 10)
+        for _ in range(10):
+            tuner.update(tuner.page_size, tuner.page_size, 0.1, 100)
+        self.assertEqual(tuner.page_size, 100)
+        tuner.limit(30)
+        self.assertEqual((tuner.page_size, tuner.max_page_size), (30, 30))
+        with self.assertRaises(ValueError):
+            chocolatey.PageSizeTuner(min_page_size=20, max_page_size=10)
+
+
+class InfoParityTestCase(unittest.TestCase):
+    """Single-run info() against the two-run info() on recorded outputs."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    @staticmethod
+    def recorded_outputs():
+        for verbose_file in sorted(outputs_dir.glob("info.*.verbose.txt")):
+            name = verbose_file.name[len("info."):-len(".verbose.txt")]
+            limit_file = verbose_file.with_name(f"info.{name}.limit.txt")
+            yield (name, limit_file.read_text("utf-8"), verbose_file.read_text("utf-8"))
+
+    def test_parsers(self):
+        for name, limit_out, verbose_out in self.recorded_outputs():
+            pkg_info = list(Chocolatey._packages(limit_out, klass=chocolatey.PackageInfo)
+                            .values())[0]
+            expected = Chocolatey._info(verbose_out, pkg_info)
+            for requested_id in (name, name.upper()):
+                for out in (verbose_out, verbose_out.replace("\n", "\r\n")):
+                    with self.subTest(pkg_id=requested_id):
+                        header = Chocolatey._info_header(out, requested_id)
+                        self.assertEqual(header, chocolatey.PackageInfo(pkg_info.id,
+                                                                        pkg_info.version))
+                        self.assertEqual(Chocolatey._info(out, header), expected)
+
+    def test_legacy_parser(self):
+        """The line-based _info() parses as the former regex-based one."""
+        outputs = [(name, verbose_out) for name, _, verbose_out in self.recorded_outputs()
+                   if name != "git"]  # the former header pattern fails on it
+        outputs += [("synthetic.package", synthetic_output(lines))
+                    for lines in (0, 1, 10, 200)]
+        for name, out in outputs:
+            with self.subTest(pkg_id=name):
+                header = Chocolatey._info_header(out, name)
+                pkg_info = Chocolatey._info(out, dataclasses.replace(header))
+                expected = legacy_info(out, dataclasses.replace(header))
+                self.assertTrue(pkg_info.description)
+                for name in ("description", "title", "summary", "published"):
+                    self.assertEqual(getattr(pkg_info, name), getattr(expected, name))
+
+    def test_info_fields(self):
+        pkg_info = self.choco.info(pkg_id="git")
+        self.assertEqual(pkg_info.title, "Git")
+        self.assertTrue(pkg_info.description.startswith("Git for Windows focuses"))
+        self.assertEqual(pkg_info.published, "11/26/2024")
+        self.assertEqual(pkg_info.downloads, 2941571)
+        self.assertEqual(pkg_info.version_downloads, 30118)
+        self.assertEqual(pkg_info.package_url,
+                         "https://community.chocolatey.org/packages/git/2.47.1")
+        self.assertEqual(pkg_info.package_source, "https://github.com/chocolatey-community/"
+                                                  "chocolatey-packages/tree/master/automatic/git")
+        self.assertEqual(pkg_info.tags[:3], ["git", "vcs", "dvcs"])
+        self.assertEqual(pkg_info.software_site, "https://git-scm.com/")
+        self.assertEqual(pkg_info.software_license,
+                         "https://github.com/git-for-windows/git/blob/main/COPYING")
+        # Only the required metadata set.
+        pkg_info = self.choco.info(pkg_id="py-chocolatey.Test1")
+        self.assertEqual(pkg_info.downloads, None)
+        self.assertEqual(pkg_info.version_downloads, None)
+        self.assertEqual(pkg_info.package_url, "")
+        self.assertEqual(pkg_info.package_source, "")
+        self.assertEqual(pkg_info.tags, [])
+        self.assertEqual(pkg_info.software_site, "")
+        self.assertEqual(pkg_info.software_license, "")
+        # '|' in the description does not split it.
+        out = synthetic_output(3).replace("handling of long lines", "a | b: c")
+        pkg_info = Chocolatey._info(out, chocolatey.PackageInfo("synthetic.package", "1.2.3"))
+        self.assertIn("- Fixed issue #1: a | b: c and nested", pkg_info.description)
+
+    def test_info(self):
+        for name, _, _ in self.recorded_outputs():
+            with self.subTest(pkg_id=name):
+                with ChocoLaunchLog() as log:
+                    pkg_info = self.choco.info(pkg_id=name)
+                    self.assertEqual(len(log.launches), 1)
+                with ChocoLaunchLog() as log:
+                    expected = self.choco.info(pkg_id=name, single_run=False)
+                    self.assertEqual(len(log.launches), 2)
+                self.assertEqual(pkg_info, expected)
+                self.assertIsInstance(pkg_info, chocolatey.PackageInfo)
+
+    def test_info_not_found(self):
+        with ChocoLaunchLog() as log:
+            self.assertIsNone(self.choco.info(pkg_id="no-such-package"))
+            self.assertEqual(len(log.launches), 1)
+        self.assertIsNone(self.choco.info(pkg_id="no-such-package", single_run=False))
+
+
+class ResultModelTestCase(unittest.TestCase):
+    """The slotted result classes and their converted fields."""
+
+    def test_slots(self):
+        for klass in (chocolatey.Package, chocolatey.PackageOutdated,
+                      chocolatey.PackageInfo, chocolatey.Config, chocolatey.Source,
+                      chocolatey.Feature, chocolatey.ApiKey, chocolatey.Template):
+            with self.subTest(klass=klass.__name__):
+                self.assertTrue(dataclasses.is_dataclass(klass))
+                self.assertFalse(hasattr(klass(*["enabled"] * 2), "__dict__"))
+
+    def test_converted_fields(self):
+        source = chocolatey.Source("name", "url", "false", "", "", "10",
+                                   "true", "false", "false")
+        self.assertEqual(source.priority, 10)
+        self.assertIs(source.bypass_proxy, True)
+        self.assertIsNone(source.user)
+        self.assertEqual(source, chocolatey.Source("name", "url", False, None, None, 10,
+                                                   True, False, False))
+        with self.assertRaises(Chocolatey.ValueError):
+            chocolatey.Source("name", "url", "false", "", "", "10", "true", "false", "xyz")
+        self.assertEqual(chocolatey.Feature("name", "Enabled").enabled, True)
+        self.assertEqual(chocolatey.Config("name", "").value, None)
+        self.assertEqual(chocolatey.Config("name", "abc").value, "abc")
+        outdated = chocolatey.PackageOutdated("git", "2.46.0", "2.47.1", "false")
+        for copied in (pickle.loads(pickle.dumps(outdated)), copy.deepcopy(outdated),
+                       dataclasses.replace(outdated)):
+            self.assertEqual(copied, outdated)
+            self.assertIs(copied.pinned, False)
+        self.assertEqual(repr(outdated), "PackageOutdated(id='git', version='2.46.0', "
+                                         "available_version='2.47.1', pinned=False)")
+
+
+class LibDirectoryTestCase(unittest.TestCase):
+    """installed(from_lib=True) and info(from_lib=True) on a lib directory tree."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        lib_dir = Path(self.temp_dir.name)/"lib"
+        for idx in range(1, 4):
+            pkg_id = f"py-chocolatey.Test{idx}"
+            (lib_dir/pkg_id).mkdir(parents=True)
+            (lib_dir/pkg_id/f"{pkg_id}.nuspec").write_bytes(
+                (here/f"data/{pkg_id}/{pkg_id}.nuspec").read_bytes())
+        (lib_dir/"Git").mkdir()
+        (lib_dir/"Git"/"git.nuspec").write_text(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://schemas.microsoft.com/packaging/2015/06/nuspec.xsd">\n'
+            '  <metadata>\n'
+            '    <id>git</id>\n'
+            '    <version>2.47.1</version>\n'
+            '    <title>Git</title>\n'
+            '    <summary>Git (for Windows)</summary>\n'
+            '    <description>Git for Windows.</description>\n'
+            '    <tags>git vcs dvcs</tags>\n'
+            '    <projectUrl>https://git-scm.com/</projectUrl>\n'
+            '    <dependencies>\n'
+            '      <group targetFramework=".NETFramework4.0">\n'
+            '        <dependency id="git.install" version="[2.47.1]" />\n'
+            '      </group>\n'
+            '    </dependencies>\n'
+            '  </metadata>\n'
+            '</package>\n', encoding="utf-8")
+        (lib_dir/"no-manifest").mkdir()
+        (lib_dir/"broken").mkdir()
+        (lib_dir/"broken"/"broken.nuspec").write_text("<package><metadata>",
+                                                      encoding="utf-8")
+        self.choco = Chocolatey(install_root=self.temp_dir.name)
+        self.choco.cmd = StubChocolateyCmd()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_installed(self):
+        with ChocoLaunchLog() as log:
+            installed = self.choco.installed(from_lib=True)
+            self.assertEqual(log.launches, [])
+        self.assertEqual(list(installed), ["git", "py-chocolatey.Test1",
+                                           "py-chocolatey.Test2", "py-chocolatey.Test3"])
+        self.assertEqual(installed["py-chocolatey.Test2"],
+                         chocolatey.Package("py-chocolatey.Test2", "1.0.2"))
+        self.assertEqual(list(self.choco.installed("TEST2", from_lib=True)),
+                         ["py-chocolatey.Test2"])
+        self.assertEqual(self.choco.installed("test", from_lib=True, as_table=True).ids,
+                         ["py-chocolatey.Test1", "py-chocolatey.Test2",
+                          "py-chocolatey.Test3"])
+        # Other options (or no lib directory) are left to choco.
+        self.assertIn("python3", self.choco.installed(from_lib=True, exact=True))
+        self.choco.install_root = Path(self.temp_dir.name)/"nowhere"
+        self.assertIn("python3", self.choco.installed(from_lib=True))
+
+    def test_info(self):
+        with ChocoLaunchLog() as log:
+            pkg_info = self.choco.info(pkg_id="GIT", local_only=True, from_lib=True)
+            self.assertIsNone(self.choco.info(pkg_id="no-manifest",
+                                              local_only=True, from_lib=True))
+            self.assertIsNone(self.choco.info(pkg_id="broken",
+                                              local_only=True, from_lib=True))
+            self.assertEqual(log.launches, [])
+        self.assertEqual(pkg_info, chocolatey.PackageInfo(
+            "git", "2.47.1", description="Git for Windows.", title="Git",
+            summary="Git (for Windows)", tags=["git", "vcs", "dvcs"],
+            software_site="https://git-scm.com/",
+            dependencies={"git.install": "[2.47.1]"}))
+        pkg_info = self.choco.info(pkg_id="py-chocolatey.Test1",
+                                   local_only=True, from_lib=True)
+        self.assertEqual((pkg_info.version, pkg_info.dependencies), ("1.0.1", {}))
+        self.assertTrue(pkg_info.title.startswith("py-chocolatey.Test1"))
+
+    def test_normalized_version(self):
+        # As choco v2 prints the versions.
+        lib_dir = Path(self.temp_dir.name)/"lib"
+        write_package(lib_dir, "7zip", "24.09")
+        self.assertEqual(self.choco.installed("7zip", from_lib=True)["7zip"].version, "24.9.0")
+        for version, normalized in (("24.09", "24.9.0"), ("1", "1.0.0"), ("1.2.3.0", "1.2.3"),
+                                    ("01.02.03.04", "1.2.3.4"), ("1.0-beta.01", "1.0.0-beta.01"),
+                                    ("2.0.0+build.5", "2.0.0"), ("1.2.3.4.5", "1.2.3.4.5"),
+                                    ("v1.0", "v1.0")):
+            with self.subTest(version=version):
+                self.assertEqual(_normalized_version(version), normalized)
+
+
+class ChunkedInstallTestCase(unittest.TestCase):
+    """install_many(), upgrade_many() and uninstall_many() chunking."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_chunks(self):
+        pkg_ids = [f"package-{idx:03d}" for idx in range(100)]  # 12 characters each
+        self.assertEqual([len(chunk) for chunk in Chocolatey._chunks(pkg_ids, 12 * 30)],
+                         [30, 30, 30, 10])
+        self.assertEqual(list(Chocolatey._chunks(["a" * 50, "b", "c"], 10)),
+                         [["a" * 50], ["b", "c"]])
+        self.assertEqual(list(Chocolatey._chunks([], 10)), [])
+
+    def test_install_many(self):
+        pkg_ids = [f"package-{idx:03d}" for idx in range(100)]
+        pkg_ids[42] = "broken-042"
+        budget = len(subprocess.list2cmdline(
+            self.choco.cmd._command_line("install", yes=True))) + 12 * 30
+        with ChocoLaunchLog() as log:
+            results = self.choco.install_many(pkg_ids, argv_budget=budget)
+            launches = log.launches
+        self.assertEqual(len(launches), 4)
+        self.assertTrue(all(len(subprocess.list2cmdline(launch)) < budget
+                            for launch in launches))
+        self.assertEqual(list(results), pkg_ids)
+        self.assertEqual([pkg_id for pkg_id, result in results.items() if not result.ok],
+                         ["broken-042"])
+        self.assertEqual(results["broken-042"].returncode, 1)
+        self.assertIn("Error while running", results["broken-042"].message)
+        # all in one run within the default budget
+        with ChocoLaunchLog() as log:
+            results = self.choco.upgrade_many(pkg_ids)
+            self.assertEqual(len(log.launches), 1)
+        self.assertEqual(sum(result.ok for result in results.values()), 99)
+
+    def test_options(self):
+        with ChocoLaunchLog() as log:
+            results = self.choco.uninstall_many(["git", ("7zip", dict(version="24.9.0")),
+                                                 "python3", ("other", dict(fail=5))])
+            launches = log.launches
+        self.assertEqual(launches[0][:3], ["uninstall", "git", "python3"])
+        self.assertEqual(launches[1][:2], ["uninstall", "7zip"])
+        self.assertIn("--version=24.9.0", launches[1])
+        self.assertEqual(len(launches), 3)
+        self.assertEqual([result.returncode for result in results.values()], [0, 0, 0, 5])
+        self.assertEqual(list(results), ["git", "python3", "7zip", "other"])
+
+
+class SkipSatisfiedTestCase(unittest.TestCase):
+    """install() and upgrade() with skip_satisfied=True."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        lib_dir = Path(self.temp_dir.name)/"lib"
+        for pkg_id, version in (("git", "2.47.1"), ("7zip", "24.9.0"),
+                                ("chocolatey", "2.6.0")):
+            write_package(lib_dir, pkg_id, version)
+        self.choco = Chocolatey(install_root=self.temp_dir.name)
+        self.choco.cmd = StubChocolateyCmd()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_install(self):
+        with ChocoLaunchLog() as log:
+            self.assertEqual(self.choco.install("Git", "7zip", skip_satisfied=True),
+                             ["Git", "7zip"])
+            self.assertEqual(log.launches, [])
+            self.assertEqual(self.choco.install("git", "python3", skip_satisfied=True),
+                             ["git"])
+            self.assertEqual(self.choco.install("git", version="2.47.1.0",
+                                                skip_satisfied=True), ["git"])
+            self.assertEqual(self.choco.install("git", version="2.48.0",
+                                                skip_satisfied=True), [])
+            self.assertEqual(self.choco.install("git", force=True, skip_satisfied=True), [])
+            self.assertEqual(self.choco.install("git"), [])
+            self.assertEqual([launch[:2] for launch in log.launches],
+                             [["install", "python3"]] + 3 * [["install", "git"]])
+
+    def test_upgrade(self):
+        with ChocoLaunchLog() as log:
+            # git is outdated
+            self.assertEqual(self.choco.upgrade("git", "chocolatey", "python3",
+                                                skip_satisfied=True), ["chocolatey"])
+            self.assertEqual([launch[:3] for launch in log.launches],
+                             [["outdated", "--limit-output", "--ignore-pinned"],
+                              ["upgrade", "git", "python3"]])
+
+    def test_many(self):
+        with ChocoLaunchLog() as log:
+            results = self.choco.install_many(["git", ("7zip", dict(version="23.1.0")),
+                                               "python3"], skip_satisfied=True)
+            self.assertEqual([launch[:2] for launch in log.launches],
+                             [["install", "7zip"], ["install", "python3"]])
+        self.assertEqual([pkg_id for pkg_id, result in results.items() if result.skipped],
+                         ["git"])
+        self.assertTrue(all(result.ok for result in results.values()))
+
+
+class StreamingTestCase(unittest.TestCase):
+    """installed_iter() and outdated_iter() parsing the streamed output."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_parity(self):
+        self.assertEqual(sorted(self.choco.installed_iter(), key=str),
+                         sorted(self.choco.installed().values(), key=str))
+        self.assertEqual(list(self.choco.outdated_iter()),
+                         list(self.choco.outdated().values()))
+        packages = list(self.choco.installed_iter(synthetic=10_000))
+        self.assertEqual(len(packages), 10_000)
+        self.assertEqual(packages[-1], chocolatey.Package("package-009999", "1.99.9999"))
+
+    def test_early(self):
+        start = time.monotonic()
+        packages = self.choco.installed_iter(linger=5)
+        self.assertIsInstance(next(packages), chocolatey.Package)
+        self.assertLess(time.monotonic() - start, 4)
+        packages.close()  # kills choco
+        self.assertLess(time.monotonic() - start, 4)
+
+    def test_not_iterated(self):
+        with mock.patch("subprocess.Popen") as popen:
+            lines = self.choco.cmd.list(limit_output=True, stream=True)
+            lines.close()
+            self.choco.installed_iter().close()
+        popen.assert_not_called()
+
+    def test_failure(self):
+        packages = []
+        with self.assertRaises(run.CalledProcessError) as exc:
+            for package in self.choco.installed_iter(fail=2):
+                packages.append(package)
+        self.assertEqual(len(packages), 5)
+        self.assertEqual(exc.exception.returncode, 2)
+        with self.assertRaises(run.TimeoutExpired):
+            list(self.choco.installed_iter(linger=5, timeout=0.5))
+
+
+class LimitOutputBytesTestCase(unittest.TestCase):
+    """The parsing of --limit-output listings from bytes against the parsing from text."""
+
+    outputs = [
+        b"",
+        b"\r\n",
+        b"git|2.47.1\r\n7zip|24.9.0\r\nGit.install|2.47.1\r\npython3|3.13.1\r\n",
+        b"git|2.47.1\ngit|2.46.0\nchocolatey|2.4.1",
+        b"git|2.47.1\r\n\r\n7zip|24.9.0\r\n",     # blank line
+        b"git|2.47.1\r\n  7zip|24.9.0 \r\n",     # whitespace around a line
+        b"7zip|24.9.0\t\r\ngit|2.47.1\r\n",
+        b"git|2.47.1|x\r\n7zip|24.9.0\r\n",      # ragged
+        b"g\xc3\xaft|2.47.1\r\n7zip|24.9.0\r\n",  # not ASCII
+        b"b|1\ra|2\x0bc|3\r\n",
+    ]
+
+    def assertParity(self, parse, out):
+        try:
+            expected = parse(Chocolatey._decode(out))
+        except Exception as exc:
+            with self.assertRaises(type(exc)):
+                parse(out)
+        else:
+            self.assertEqual(parse(out), expected)
+
+    def test_packages(self):
+        for out in self.outputs[:4]:
+            self.assertNotIn(None, list(Chocolatey._columns(out)))
+        for out in self.outputs[4:-1]:
+            self.assertIn(None, list(Chocolatey._columns(out)))
+        for out in self.outputs:
+            with self.subTest(out=out):
+                for allow_multiple in (False, True):
+                    self.assertParity(lambda out: Chocolatey._packages(
+                                          out, allow_multiple=allow_multiple), out)
+                self.assertParity(lambda out: Chocolatey._table(out).rows(), out)
+        out = (b"git|2.47.1|2.48.0|false\r\npython3|3.13.1|3.13.2|true\r\n"
+               b"7zip|24.9.0|24.9.0|false\r\n")
+        self.assertParity(Chocolatey._outdated, out)
+        self.assertParity(lambda out: Chocolatey._outdated_table(out).rows(), out)
+
+    def test_config(self):
+        out = (b"cacheLocation||Cache location if not TEMP folder.\r\n"
+               b"commandExecutionTimeoutSeconds|2700|Default timeout for command execution.\r\n")
+        self.assertParity(lambda out: Chocolatey._config(out, klass=chocolatey.Config), out)
+        out = (b"chocolatey|https://community.chocolatey.org/api/v2/|"
+               b"false|||0|false|false|false\r\n")
+        self.assertParity(lambda out: Chocolatey._config(out, klass=chocolatey.Source), out)
+
+    def test_blocks(self):
+        lines = [f"Package-{idx:04}|1.0.{idx}" for idx in range(1000)]
+        out = "\r\n".join(reversed(lines)).encode("ascii")
+        with mock.patch.object(Chocolatey, "_columns_block", 64):
+            for allow_multiple in (False, True):
+                self.assertParity(lambda out: Chocolatey._packages(
+                                      out, allow_multiple=allow_multiple), out)
+            self.assertParity(lambda out: Chocolatey._table(out).rows(), out)
+            # Irregular only in the last block.
+            self.assertParity(Chocolatey._packages, out + b"\r\nzzz|1.0|x")
+            self.assertParity(lambda out: Chocolatey._table(out).rows(), out + b"\r\nzzz")
+
+    def test_commands(self):
+        choco = Chocolatey()
+        choco.cmd = StubChocolateyCmd()
+        self.assertIsInstance(choco.installed()["git"], chocolatey.Package)
+        self.assertIn("chocolatey", choco.sources())
+        with self.assertRaises(run.CalledProcessError) as exc:
+            choco.installed(fail=2)
+        self.assertIsInstance(exc.exception.stdout, str)
+        self.assertIsInstance(exc.exception.stderr, str)
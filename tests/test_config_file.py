@@ -0,0 +1,81 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import os
+import time
+import tempfile
+import shutil
+from unittest import mock
+from pathlib import Path
+
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd
+from .choco_stub import ChocoLaunchLog
+
+here = Path(__file__).resolve().parent
+
+
+class ConfigFileTestCase(unittest.TestCase):
+    """config(), sources() and features() read from chocolatey.config."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name)/"config/chocolatey.config"
+        self.config_file.parent.mkdir()
+        shutil.copy2(here/"data/chocolatey.config", self.config_file)
+        self.choco = Chocolatey(install_root=self.temp_dir.name)
+        self.choco.cmd = StubChocolateyCmd()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parity(self):
+        with ChocoLaunchLog() as log:
+            configs = self.choco.config(from_file=True)
+            sources = self.choco.sources(from_file=True)
+            features = self.choco.features(from_file=True)
+            self.assertEqual(self.choco.config_get(name="CommandExecutionTimeoutSeconds",
+                                                   from_file=True), "2700")
+            self.assertIs(self.choco.feature_get(name="checksumFiles", from_file=True), True)
+            self.assertEqual(log.launches, [])
+        self.assertIsNone(sources["internal"].password)  # not the certificate
+        self.assertEqual(sources["internal"].priority, 10)
+        for from_file, from_choco in ((configs, self.choco.config()),
+                                      (sources, self.choco.sources()),
+                                      (features, self.choco.features())):
+            self.assertEqual(from_file, from_choco)
+            self.assertEqual(list(from_file), list(from_choco))
+
+    def test_mtime_cache(self):
+        self.assertEqual(len(self.choco.features(from_file=True)), 2)
+        with mock.patch("chocolatey._config_file._ConfigFile._parse",
+                        autospec=True, side_effect=chocolatey._config_file._ConfigFile._parse) \
+             as parse:
+            self.choco.features(from_file=True) ; self.choco.sources(from_file=True)
+            self.assertEqual(parse.call_count, 0)
+            text = self.config_file.read_text("utf-8")
+            self.config_file.write_text(text.replace('name="autoUninstaller" enabled="false"',
+                                                     'name="autoUninstaller" enabled="true"'),
+                                        "utf-8")
+            os.utime(self.config_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+            self.assertIs(self.choco.features(from_file=True)["autoUninstaller"].enabled,
+                          True)
+            self.assertEqual(parse.call_count, 1)
+
+    def test_fallback(self):
+        for text in (None, "<chocolatey><config/></chocolatey>",
+                     "<settings><config/><sources/><features/></settings>",
+                     "<chocolatey><config><add name='x'/></config>"
+                     "<sources/><features/></chocolatey>", "<chocolatey>"):
+            with self.subTest(text=text):
+                if text is None:
+                    self.config_file.unlink()
+                else:
+                    self.config_file.write_text(text, "utf-8")
+                with ChocoLaunchLog() as log:
+                    self.assertIn("internal", self.choco.sources(from_file=True))
+                    self.assertEqual(len(log.launches), 1)
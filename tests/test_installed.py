@@ -0,0 +1,62 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+from pathlib import Path
+
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .bench_installed import write_package
+
+
+class InstalledIndexTestCase(unittest.TestCase):
+    """InstalledIndex on a synthetic lib directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.lib_dir = Path(self.temp_dir.name)/"lib"
+        for idx in range(5):
+            write_package(self.lib_dir, f"package-{idx}", "1.0.0")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_refresh(self):
+        index = chocolatey.InstalledIndex(self.temp_dir.name)
+        self.assertEqual(len(index), 0)
+        delta = index.refresh()
+        self.assertEqual([pkg.id for pkg in delta.added], [f"package-{idx}" for idx in range(5)])
+        self.assertEqual((delta.removed, delta.changed), ([], []))
+        self.assertEqual(len(index), 5)
+        self.assertIn("PACKAGE-1", index)
+        self.assertEqual(index["Package-1"].version, "1.0.0")
+        self.assertFalse(index.refresh())
+        self.assertEqual(index._entries["package-1"][0][2],
+                         os.stat(self.lib_dir/"package-1").st_ino)
+        # An upgrade (the package directory replaced), an install, an uninstall.
+        with mock.patch("chocolatey._chocolatey.Chocolatey._lib_nuspec",
+                        wraps=Chocolatey._lib_nuspec) as lib_nuspec:
+            shutil.rmtree(self.lib_dir/"package-2")
+            write_package(self.lib_dir, "package-2", "2.0.0")
+            write_package(self.lib_dir, "Package-X", "1.0.0")
+            shutil.rmtree(self.lib_dir/"package-4")
+            delta = index.refresh()
+            self.assertEqual(sorted(call.args[0].name for call in lib_nuspec.call_args_list),
+                             ["Package-X", "package-2"])
+        self.assertEqual([pkg.id for pkg in delta.added], ["Package-X"])
+        self.assertEqual([pkg.id for pkg in delta.removed], ["package-4"])
+        self.assertEqual([(old.version, new.version) for old, new in delta.changed],
+                         [("1.0.0", "2.0.0")])
+        self.assertEqual([pkg.id for pkg in index],
+                         ["package-0", "package-1", "package-2", "package-3", "Package-X"])
+        self.assertFalse(index.refresh(full=True))
+        # A vanished lib directory.
+        shutil.rmtree(self.lib_dir)
+        self.assertEqual(len(index.refresh().removed), 5)
+        self.assertEqual(len(index), 0)
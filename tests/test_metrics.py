@@ -0,0 +1,123 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import time
+from unittest import mock
+import threading
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd
+
+
+class MetricsTestCase(unittest.TestCase):
+    """MetricsRegistry and the ChocolateyMetrics collected from the spans."""
+
+    def test_registry(self):
+        registry = chocolatey.MetricsRegistry()
+        counter = registry.counter("runs", "Runs.", ("command",))
+        gauge = registry.gauge("running")
+        histogram = registry.histogram("seconds", 'A "duration"\\n', ("command",),
+                                       buckets=(1, 0.5))
+        self.assertIs(registry.counter("runs", labels=("command",)), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("runs", labels=("command",))
+        with self.assertRaises(ValueError):
+            counter.inc(source="x")
+        with self.assertRaises(ValueError):
+            counter.inc(-1, command="list")
+        counter.inc(command="list")
+        counter.inc(2, command='a"b')
+        gauge.inc(); gauge.inc(); gauge.dec()
+        for value in (0.2, 0.5, 0.7, 3):
+            histogram.observe(value, command="list")
+        self.assertEqual(counter.value(command="list"), 1)
+        self.assertEqual(gauge.value(), 1)
+        self.assertEqual(registry.render(),
+                         '# TYPE running gauge\n'
+                         'running 1\n'
+                         '# TYPE runs counter\n'
+                         '# HELP runs Runs.\n'
+                         'runs_total{command="a\\"b"} 2\n'
+                         'runs_total{command="list"} 1\n'
+                         '# TYPE seconds histogram\n'
+                         '# HELP seconds A \\"duration\\"\\\\n\n'
+                         'seconds_bucket{command="list",le="0.5"} 2\n'
+                         'seconds_bucket{command="list",le="1.0"} 3\n'
+                         'seconds_bucket{command="list",le="+Inf"} 4\n'
+                         'seconds_count{command="list"} 4\n'
+                         'seconds_sum{command="list"} 4.4\n'
+                         '# EOF\n')
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["running"],
+                         dict(type="gauge", help="", samples=[dict(labels={}, value=1)]))
+        self.assertEqual(snapshot["seconds"]["samples"],
+                         [dict(labels={"command": "list"},
+                               buckets={0.5: 2, 1: 3, float("inf"): 4}, count=4, sum=4.4)])
+
+    def test_threads(self):
+        registry = chocolatey.MetricsRegistry()
+        counter = registry.counter("count")
+        histogram = registry.histogram("values")
+
+        def target():
+            for _ in range(1000):
+                counter.inc()
+                histogram.observe(1)
+        threads = [threading.Thread(target=target) for _ in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(counter.value(), 8000)
+        self.assertEqual(registry.snapshot()["values"]["samples"][0]["count"], 8000)
+
+    def test_chocolatey(self):
+        choco = Chocolatey(cache=True)
+        choco.cmd = StubChocolateyCmd()
+        with chocolatey.ChocolateyMetrics() as metrics:
+            choco.installed()
+            choco.installed()
+            choco.search("package", page_size=50)
+            process = choco.cmd.list(limit_output=True, capture_output=True, wait=False)
+            in_flight = metrics.snapshot()["choco_commands_in_flight"]["samples"]
+            process.result()
+            with mock.patch.object(choco.cmd, "list",
+                                   return_value=run.CompletedProcess([], 0, b"git\r\n", b"")):
+                with self.assertRaises(TypeError):
+                    choco.installed(filter="git")
+        choco.installed(filter="other")  # not collected
+        self.assertEqual(in_flight, [dict(labels={"command": "list"}, value=1),
+                                     dict(labels={"command": "search"}, value=0)])
+        registry = metrics.registry
+        started = registry["choco_processes_started"]
+        self.assertEqual(started.value(command="list"), 2)
+        self.assertGreater(started.value(command="search"), 1)
+        self.assertEqual(registry["choco_commands_in_flight"].value(command="list"), 0)
+        self.assertEqual(registry["chocolatey_cache_hits"].value(
+                         method="Chocolatey.installed", cache="memory"), 1)
+        self.assertEqual(registry["chocolatey_cache_misses"].value(
+                         method="Chocolatey.installed", cache="memory"), 2)
+        self.assertEqual(registry["chocolatey_parse_failures"].value(
+                         method="Chocolatey.installed"), 1)
+        durations = metrics.snapshot()["choco_command_duration_seconds"]["samples"]
+        self.assertEqual([(sample["labels"], sample["count"]) for sample in durations],
+                         [({"command": "list", "source": ""}, 2),
+                          ({"command": "search", "source": ""}, started.value(command="search"))])
+        text = metrics.render()
+        self.assertIn('choco_processes_started_total{command="list"} 2\n', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+    def test_elevated(self):
+        metrics = chocolatey.ChocolateyMetrics()
+        span = chocolatey.Span("install", "command", 1, None, 1, time.time(),
+                               attributes=dict(argv=[], elevated=True, source="local"))
+        metrics.on_start(span)
+        span.duration = 2.0
+        metrics.on_end(span)
+        registry = metrics.registry
+        self.assertEqual(registry["choco_elevated_launches"].value(command="install"), 1)
+        self.assertEqual(metrics.snapshot()["choco_command_duration_seconds"]["samples"][0]
+                         ["labels"], {"command": "install", "source": "local"})
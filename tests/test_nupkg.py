@@ -0,0 +1,75 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import tempfile
+from unittest import mock
+from pathlib import Path
+
+
+import chocolatey
+from chocolatey._nupkg import _read_nupkg
+
+from .bench_nupkg import write_nupkg
+
+
+class NupkgIndexTestCase(unittest.TestCase):
+    """NupkgIndex of a folder source."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)/"feed"
+        self.folder.mkdir()
+        self.db = Path(self.temp_dir.name)/"index.sqlite"
+        for pkg_id, version in (("git", "2.46.0"), ("git", "2.47.1"), ("Git", "2.48.0-rc1"),
+                                ("7zip", "24.9.0")):
+            write_nupkg(self.folder, pkg_id, version, payload=1024)
+        (self.folder/"sub").mkdir()
+        write_nupkg(self.folder/"sub", "python3", "3.13.1", payload=1024)
+        (self.folder/"broken.1.0.0.nupkg").write_bytes(b"not a zip")
+        self.index = chocolatey.NupkgIndex(self.folder, path=self.db)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_queries(self):
+        self.assertEqual(self.index.refresh(), 6)
+        self.assertEqual(len(self.index), 3)
+        self.assertIn("GIT", self.index)
+        self.assertEqual(self.index.search("git"),
+                         {"git": [chocolatey.Package("git", "2.47.1")]})
+        self.assertEqual(list(self.index.search()), ["7zip", "git", "python3"])
+        self.assertEqual([pkg.version for pkg in
+                          self.index.search("git", exact=True, all_versions=True,
+                                            prerelease=True)["Git"]],
+                         ["2.46.0", "2.47.1", "2.48.0-rc1"])
+        self.assertEqual(self.index.search("synthetic"), {})
+        self.assertEqual(list(self.index.search("python3")), ["python3"])
+        info = self.index.info("GIT")
+        self.assertEqual((info.id, info.version, info.title), ("git", "2.47.1", "git"))
+        self.assertEqual(self.index.info("git", "2.46").version, "2.46.0")
+        self.assertIsNone(self.index.info("git", "1.0"))
+        self.assertIsNone(self.index.info("no-such-package"))
+        entry = self.index.find("python3")
+        self.assertEqual(entry.path, self.folder/"sub/python3.3.13.1.nupkg")
+        self.assertEqual(len(entry.sha256), 64)
+
+    def test_incremental(self):
+        self.index.refresh()
+        with mock.patch("chocolatey._nupkg._read_nupkg",
+                        side_effect=_read_nupkg) as read_nupkg:
+            self.assertEqual(self.index.refresh(), 0)
+            # a new index reads the persistent one
+            index = chocolatey.NupkgIndex(self.folder, path=self.db)
+            self.assertEqual(index.refresh(), 0)
+            self.assertEqual(len(index), 3)
+            self.assertEqual(read_nupkg.call_count, 0)
+            write_nupkg(self.folder, "7zip", "24.9.1", payload=1024)
+            (self.folder/"sub/python3.3.13.1.nupkg").unlink()
+            self.assertEqual(index.refresh(), 1)
+            self.assertEqual(read_nupkg.call_count, 1)
+        self.assertEqual(index.info("7zip").version, "24.9.1")
+        self.assertNotIn("python3", index)
+        index = chocolatey.NupkgIndex(self.folder, path=self.db)
+        self.assertEqual(index.refresh(), 0)
+        self.assertEqual(list(index.search()), ["7zip", "git"])
@@ -0,0 +1,66 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd
+
+
+class PackageTableTestCase(unittest.TestCase):
+    """Chocolatey(...).method(as_table=True) tests run against the choco stand-in."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_installed(self):
+        table = self.choco.installed(as_table=True)
+        self.assertIsInstance(table, chocolatey.PackageTable)
+        self.assertEqual(list(table), list(self.choco.installed().values()))
+        self.assertIn("GIT", table)
+        self.assertNotIn("gi", table)
+        self.assertEqual(table["Git.Install"], [chocolatey.Package("Git.install", "2.47.1")])
+        self.assertIsNone(table.get("no-such-package"))
+        with self.assertRaises(KeyError):
+            table["no-such-package"]
+        self.assertEqual(table.startswith("GIT").ids, ["Git.install", "git"])
+        self.assertEqual(table.where_version(">=", "3").ids, ["7zip", "python3"])
+        self.assertEqual(table.where("id", lambda pkg_id: "." in pkg_id).ids, ["Git.install"])
+
+    def test_search(self):
+        table = self.choco.search("package", all_versions=True, as_table=True)
+        found = self.choco.search("package", all_versions=True)
+        self.assertEqual(len(table), sum(len(pkgs) for pkgs in found.values()))
+        self.assertEqual(table["PACKAGE-002"], found["package-002"])
+        self.assertFalse(table.truncated)
+        table = self.choco.search("package", limit=30, as_table=True)
+        self.assertEqual(len(table), 30)
+        self.assertTrue(table.truncated)
+        self.assertTrue(table.startswith("package-00").truncated)
+
+    def test_outdated(self):
+        table = self.choco.outdated(as_table=True)
+        self.assertEqual(table.ids, ["git", "python3"])
+        self.assertEqual(table.columns["pinned"], [False, True])
+        self.assertEqual(table.where_version(">", "3.13.1", column="available_version").ids,
+                         ["python3"])
+        self.assertEqual(table.rows(), [("git", "2.47.1", "2.48.0", False),
+                                        ("python3", "3.13.1", "3.13.2", True)])
+        self.assertEqual(table.packages(), [pkg for pkg in self.choco.outdated().values()])
+        self.assertEqual(table.to_csv(), "id,version,available_version,pinned\n"
+                                         "git,2.47.1,2.48.0,False\n"
+                                         "python3,3.13.1,3.13.2,True\n")
+        self.assertEqual(table.to_jsonl().splitlines()[1],
+                         '{"id": "python3", "version": "3.13.1", '
+                         '"available_version": "3.13.2", "pinned": true}')
+
+    def test_version_key(self):
+        versions = ["1.0.0", "1.0", "1.0.0-beta.2", "1.0.0-beta.10", "1.0.0-alpha",
+                    "0.9.9.9", "1.0.1+build", "10.0"]
+        self.assertEqual(sorted(versions, key=chocolatey.version_key),
+                         ["0.9.9.9", "1.0.0-alpha", "1.0.0-beta.2", "1.0.0-beta.10",
+                          "1.0.0", "1.0", "1.0.1+build", "10.0"])
@@ -0,0 +1,147 @@
+# Copyright (c) 2026 Adam Karpierz
+# SPDX-License-Identifier: Zlib
+
+import unittest
+import tempfile
+import json
+from contextlib import closing
+from pathlib import Path
+
+from utlx import run
+
+import chocolatey
+from chocolatey import Chocolatey
+
+from .choco_stub import StubChocolateyCmd, StubAsyncChocolateyCmd
+from .choco_stub import StubBrokerChocolateyCmd
+from .choco_stub import SpanCollector
+
+
+class TracingTestCase(unittest.TestCase):
+    """Call spans of the Chocolatey methods and command spans of the choco runs."""
+
+    def setUp(self):
+        self.choco = Chocolatey()
+        self.choco.cmd = StubChocolateyCmd()
+
+    def test_spans(self):
+        self.choco.cmd = StubChocolateyCmd("https://example.com/api/v2/")
+        with SpanCollector() as collector:
+            self.choco.search("package", page_size=50)
+        call = collector.spans[-1]
+        self.assertEqual((call.name, call.kind, call.parent_id),
+                         ("Chocolatey.search", "call", None))
+        commands = collector.children(call)
+        self.assertGreater(len(commands), 1)  # one per page
+        self.assertEqual(len(collector.started), len(collector.spans))
+        for span in commands:
+            self.assertEqual((span.name, span.kind, span.trace_id),
+                             ("search", "command", call.span_id))
+            self.assertFalse(span.attributes["elevated"])
+            self.assertEqual(span.attributes["source"], "https://example.com/api/v2/")
+            self.assertIn("--limit-output", span.attributes["argv"])
+            self.assertEqual(span.attributes["returncode"], 0)
+            self.assertIsNotNone(span.attributes["stderr_bytes"])
+            self.assertGreaterEqual(call.duration, span.duration)
+        self.assertGreater(sum(span.attributes["stdout_bytes"] for span in commands), 0)
+        with SpanCollector() as collector:
+            self.choco.info(pkg_id="git")
+        call = collector.spans[-1]
+        self.assertEqual(call.name, "Chocolatey.info")
+        self.assertEqual({span.name for span in collector.children(call)}, {"info"})
+
+    def test_failure(self):
+        with SpanCollector() as collector:
+            with self.assertRaises(run.CalledProcessError):
+                self.choco.installed(fail=2)
+        command, call = collector.spans
+        for span in (command, call):
+            self.assertEqual(span.attributes["error"], "CalledProcessError")
+        self.assertEqual(command.attributes["returncode"], 2)
+        self.assertEqual(command.parent_id, call.span_id)
+
+    def test_stream(self):
+        with SpanCollector() as collector:
+            packages = self.choco.installed_iter(synthetic=1000)
+            next(packages)
+            self.assertEqual(collector.spans, [])
+            self.assertEqual(len(list(packages)), 999)
+        command, call = collector.spans
+        self.assertEqual((command.name, call.name), ("list", "Chocolatey.installed_iter"))
+        self.assertEqual(command.parent_id, call.span_id)
+        self.assertEqual(command.attributes["returncode"], 0)
+        self.assertGreater(command.attributes["stdout_bytes"], 1000 * len("package-000000|"))
+        with SpanCollector() as collector:
+            with closing(self.choco.installed_iter(linger=5)) as packages:
+                next(packages)
+        command, call = collector.spans
+        self.assertNotIn("error", call.attributes)
+        self.assertIsNotNone(command.duration)
+
+    def test_concurrent(self):
+        with SpanCollector() as collector:
+            self.choco.info_many(["git", "python3"], max_workers=2)
+        many = collector.spans[-1]
+        self.assertEqual(many.name, "Chocolatey.info_many")
+        self.assertEqual({span.trace_id for span in collector.spans}, {many.span_id})
+        infos = [span for span in collector.spans if span.name == "Chocolatey.info"]
+        self.assertEqual(len(infos), 2)
+
+    def test_batch(self):
+        choco = Chocolatey()
+        choco.cmd = StubBrokerChocolateyCmd(elevated=True)
+        with SpanCollector() as collector:
+            with choco.batch() as batch:
+                batch.pin_add(pkg_id="git")
+                batch.feature_enable(name="checksumFiles")
+                self.assertEqual(collector.spans, [])
+        run_span = collector.spans[-1]
+        self.assertEqual(run_span.name, "ChocolateyBatch.run")
+        self.assertEqual([span.name for span in collector.children(run_span)],
+                         ["pin", "feature"])
+
+    def test_async(self):
+        import asyncio
+        choco = chocolatey.AsyncChocolatey()
+        choco.cmd = StubAsyncChocolateyCmd()
+        with SpanCollector() as collector:
+            asyncio.run(choco.installed())
+        command, call = collector.spans
+        self.assertEqual((command.name, call.name), ("list", "AsyncChocolatey.installed"))
+        self.assertEqual(command.parent_id, call.span_id)
+        self.assertEqual(command.attributes["returncode"], 0)
+
+    def test_hooks(self):
+        class Failing(chocolatey.TraceHook):
+            def on_end(self, span):
+                raise ValueError("failing hook")
+        hook = Failing()
+        chocolatey.add_hook(hook)
+        try:
+            with self.assertWarns(RuntimeWarning):
+                self.assertIn("git", self.choco.installed())
+        finally:
+            chocolatey.remove_hook(hook)
+        with SpanCollector() as collector:
+            pass
+        self.choco.installed()
+        self.assertEqual(collector.spans, [])
+
+    def test_exporter(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)/"trace.jsonl"
+            with chocolatey.JsonLinesExporter(path):
+                self.choco.installed()
+                self.choco.pinned()
+            self.choco.installed()  # not exported
+            with path.open(encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual([record["name"] for record in records],
+                         ["list", "Chocolatey.installed", "pin", "Chocolatey.pinned"])
+        self.assertEqual(records[0]["parent_id"], records[1]["span_id"])
+        self.assertEqual(sorted(records[0]),
+                         ["attributes", "duration", "kind", "name", "parent_id",
+                          "span_id", "start_time", "trace_id"])
+        self.assertEqual(records[0]["attributes"]["argv"][-4:],
+                         ["--limit-output", "--local-only", "--accept-license", "--no-progress"])
+        self.assertIsNone(records[0]["attributes"]["source"])